@@ -0,0 +1,56 @@
+"""
+Micro-benchmark: shared-weight Resampler vs one np.interp call per channel.
+
+Run from the project root:
+    python -m benchmarks.resample_benchmark
+"""
+import timeit
+
+import numpy as np
+
+from src.f1_data import DT, Resampler
+
+N_DRIVERS = 20
+RACE_SECONDS = 2 * 60 * 60
+SOURCE_HZ = 8  # merged car + position data is roughly 8 samples per second
+CONTINUOUS = ("x", "y", "dist", "rel_dist", "speed", "throttle", "brake")
+DISCRETE = ("lap", "tyre", "gear", "drs")
+REPEAT = 5
+
+
+def _make_driver(rng):
+    t = np.sort(rng.uniform(0, RACE_SECONDS, RACE_SECONDS * SOURCE_HZ))
+    return t, {name: rng.random(t.size) * 100 for name in CONTINUOUS + DISCRETE}
+
+
+def per_channel(drivers, timeline):
+    for t, data in drivers:
+        for name in CONTINUOUS + DISCRETE:
+            np.interp(timeline, t, data[name])
+
+
+def shared_weights(drivers, timeline):
+    for t, data in drivers:
+        resampler = Resampler(t, timeline)
+        resampler.linear(np.vstack([data[name] for name in CONTINUOUS]))
+        resampler.step(np.vstack([data[name] for name in DISCRETE]))
+
+
+def main():
+    rng = np.random.default_rng(0)
+    drivers = [_make_driver(rng) for _ in range(N_DRIVERS)]
+    timeline = np.arange(0, RACE_SECONDS, DT)
+
+    print(f"{N_DRIVERS} drivers, {len(timeline)} frames, "
+          f"{len(CONTINUOUS)} continuous + {len(DISCRETE)} discrete channels")
+
+    baseline = min(timeit.repeat(lambda: per_channel(drivers, timeline), number=1, repeat=REPEAT))
+    shared = min(timeit.repeat(lambda: shared_weights(drivers, timeline), number=1, repeat=REPEAT))
+
+    print(f"np.interp per channel: {baseline * 1000:8.1f} ms")
+    print(f"Resampler:             {shared * 1000:8.1f} ms")
+    print(f"speedup:               {baseline / shared:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
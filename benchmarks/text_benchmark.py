@@ -0,0 +1,89 @@
+"""
+Text allocation counter: arcade.Text objects constructed per frame by the race
+replay window, drawn headless with a synthetic 20-car race.
+
+Run from the project root (needs an OpenGL/EGL driver, no display):
+    python -m benchmarks.text_benchmark
+"""
+import os
+
+os.environ.setdefault("ARCADE_HEADLESS", "1")
+
+import time
+
+import arcade
+import numpy as np
+
+from src.frame_store import FrameStore
+
+N_DRIVERS = 20
+N_FRAMES = 600
+SAMPLE_RATE = 10
+WARMUP = 5
+MEASURED = 50
+
+_allocations = 0
+_text_init = arcade.Text.__init__
+
+
+def _counting_init(self, *args, **kwargs):
+    global _allocations
+    _allocations += 1
+    _text_init(self, *args, **kwargs)
+
+
+def _make_store():
+    codes = [f"D{i:02d}" for i in range(N_DRIVERS)]
+    weather = {"track_temp": 30.0, "air_temp": 20.0, "humidity": 50.0,
+               "wind_speed": 3.0, "wind_direction": 90.0, "rain_state": "DRY"}
+    frames = []
+    for k in range(N_FRAMES):
+        t = k / SAMPLE_RATE
+        drivers = {}
+        for i, code in enumerate(codes):
+            angle = t * 0.2 + i * 0.05
+            drivers[code] = {
+                "x": np.cos(angle) * 5000, "y": np.sin(angle) * 3000,
+                "dist": angle * 1000, "rel_dist": (angle % (2 * np.pi)) / (2 * np.pi),
+                "lap": int(angle // (2 * np.pi)) + 1, "tyre": 1.0, "position": i + 1,
+                "speed": 250.0, "gear": 7, "drs": 0, "throttle": 100.0, "brake": 0.0,
+            }
+        frames.append({"t": t, "drivers": drivers, "weather": weather})
+    return codes, FrameStore.from_frame_dicts(frames, fps=SAMPLE_RATE)
+
+
+def main():
+    from src.interfaces.race_replay import F1RaceReplayWindow
+
+    codes, store = _make_store()
+    angles = np.linspace(0, 2 * np.pi, 300)
+    example_lap = {"X": np.cos(angles) * 5000, "Y": np.sin(angles) * 3000}
+    window = F1RaceReplayWindow(
+        store, [], example_lap, codes, "text benchmark",
+        driver_colors={code: (255, 0, 0) for code in codes}, total_laps=5,
+    )
+    window.selected_driver = codes[0]
+    window.progress_bar_comp.toggle_visibility()
+
+    global _allocations
+    arcade.Text.__init__ = _counting_init
+    try:
+        for _ in range(WARMUP):
+            window.on_update(1 / 60)
+            window.on_draw()
+        _allocations = 0
+        start = time.perf_counter()
+        for _ in range(MEASURED):
+            window.on_update(1 / 60)
+            window.on_draw()
+        elapsed = time.perf_counter() - start
+    finally:
+        arcade.Text.__init__ = _text_init
+
+    print(f"{N_DRIVERS} drivers, {MEASURED} frames after {WARMUP} warm-up frames")
+    print(f"arcade.Text allocated per frame: {_allocations / MEASURED:8.1f}")
+    print(f"frame time:                      {elapsed / MEASURED * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,34 @@
-from src.f1_data import get_race_telemetry, enable_cache, get_circuit_rotation, load_session, get_quali_telemetry, list_rounds, list_sprints
-from src.arcade_replay import run_arcade_replay
-
-from src.interfaces.qualifying import run_qualifying_replay
+from src.telemetry_cache import cache_path, load_race_telemetry, select_laps
 import sys
 
+def parse_lap_range(value):
+  # "40-55" -> (40, 55); a single lap "40" -> (40, 40)
+  first, _, last = value.partition("-")
+  return int(first), int(last or first)
+
+def load_cached_race(year, round_number, session_type, laps=None):
+  # A complete race cache has everything the replay needs, so FastF1 isn't touched at all
+  if "--refresh-data" in sys.argv:
+    return None
+  data = load_race_telemetry(cache_path(year, round_number, session_type), laps=laps)
+  if data is None or "example_lap" not in data:
+    return None
+  print("Loaded precomputed race telemetry data.")
+  return data
+
 def main(year=None, round_number=None, playback_speed=1, session_type='R'):
   print(f"Loading F1 {year} Round {round_number} Session '{session_type}'")
-  session = load_session(year, round_number, session_type)
 
-  print(f"Loaded session: {session.event['EventName']} - {session.event['RoundNumber']} - {session_type}")
+  if session_type == 'Q' or session_type == 'SQ':
+    from src.f1_data import enable_cache, load_session, get_quali_telemetry
+    from src.interfaces.qualifying import run_qualifying_replay
+
+    # Enable cache for fastf1
+    enable_cache()
 
-  # Enable cache for fastf1
-  enable_cache()
+    session = load_session(year, round_number, session_type)
 
-  if session_type == 'Q' or session_type == 'SQ':
+    print(f"Loaded session: {session.event['EventName']} - {session.event['RoundNumber']} - {session_type}")
 
     # Get the drivers who participated and their lap times
 
@@ -30,20 +45,53 @@ def main(year=None, round_number=None, playback_speed=1, session_type='R'):
     )
 
   else:
-
-    # Get the drivers who participated in the race
-
-    race_telemetry = get_race_telemetry(session, session_type=session_type)
-
-    # Get example lap for track layout
-
-    example_lap = session.laps.pick_fastest().get_telemetry()
-
-    drivers = session.drivers
-
-    # Get circuit rotation
-
-    circuit_rotation = get_circuit_rotation(session)
+    from src.arcade_replay import run_arcade_replay
+
+    # --laps START-END replays only those leader laps
+    laps = None
+    if "--laps" in sys.argv:
+      try:
+        laps = parse_lap_range(sys.argv[sys.argv.index("--laps") + 1])
+      except (IndexError, ValueError):
+        print("Invalid --laps value, expected START-END (e.g. --laps 40-55)")
+        return
+
+    try:
+      race_telemetry = load_cached_race(year, round_number, session_type, laps=laps)
+    except ValueError as e:
+      print(f"Invalid --laps range: {e}")
+      return
+
+    if race_telemetry is None:
+      from src.f1_data import enable_cache, load_session, get_race_telemetry, get_race_telemetry_progressive
+
+      # Optional storage rate (Hz) for freshly computed telemetry
+      race_options = {}
+      if "--sample-rate" in sys.argv:
+        race_options["sample_rate"] = float(sys.argv[sys.argv.index("--sample-rate") + 1])
+
+      # Enable cache for fastf1
+      enable_cache()
+
+      session = load_session(year, round_number, session_type)
+
+      print(f"Loaded session: {session.event['EventName']} - {session.event['RoundNumber']} - {session_type}")
+
+      # Get the drivers who participated in the race, the example lap for the
+      # track layout and the circuit rotation along with the frames
+
+      # --progressive opens the replay as soon as the first frames are ready and
+      # computes the rest in the background (a lap range needs the whole race first)
+      if "--progressive" in sys.argv and laps is None:
+        race_telemetry = get_race_telemetry_progressive(session, session_type=session_type, **race_options)
+      else:
+        race_telemetry = get_race_telemetry(session, session_type=session_type, **race_options)
+        if laps is not None:
+          try:
+            race_telemetry = select_laps(race_telemetry, laps)
+          except ValueError as e:
+            print(f"Invalid --laps range: {e}")
+            return
 
     # Run the arcade replay
 
@@ -53,13 +101,13 @@ def main(year=None, round_number=None, playback_speed=1, session_type='R'):
     run_arcade_replay(
         frames=race_telemetry['frames'],
         track_statuses=race_telemetry['track_statuses'],
-        example_lap=example_lap,
-        drivers=drivers,
+        example_lap=race_telemetry['example_lap'],
+        drivers=race_telemetry['drivers'],
         playback_speed=1.0,
         driver_colors=race_telemetry['driver_colors'],
-        title=f"{session.event['EventName']} - {'Sprint' if session_type == 'S' else 'Race'}",
+        title=f"{race_telemetry['event_name']} - {'Sprint' if session_type == 'S' else 'Race'}",
         total_laps=race_telemetry['total_laps'],
-        circuit_rotation=circuit_rotation,
+        circuit_rotation=race_telemetry['circuit_rotation'],
         chart=chart,
     )
 
@@ -80,8 +128,10 @@ if __name__ == "__main__":
     round_number = 12  # Default round number
 
   if "--list-rounds" in sys.argv:
+    from src.f1_data import list_rounds
     list_rounds(year)
   elif "--list-sprints" in sys.argv:
+    from src.f1_data import list_sprints
     list_sprints(year)
 
   playback_speed = 1
@@ -21,3 +21,5 @@ def run_arcade_replay(frames, track_statuses, example_lap, drivers, title,
         circuit_rotation=circuit_rotation,
     )
     arcade.run()
+    # A progressive store waits for its background computation and frees its shared memory
+    frames.close()
@@ -2,14 +2,44 @@ import os
 import sys
 import fastf1
 import fastf1.plotting
-from multiprocessing import Pool, cpu_count
+import time
+from multiprocessing import Pool, Process, Queue, Value, cpu_count
 import numpy as np
 import json
-import pickle
 from datetime import timedelta
 
 from src.lib.tyres import get_tyre_compound_int
 from src.lib.time import parse_time_string, format_time
+from src.lib.track import ReferencePolyline
+from src.lib.drs import detect_drs_zones
+from src.lib.weather import WEATHER_COLUMNS, WeatherSeries
+from src.frame_store import (
+    CHANNEL_SCHEMA,
+    QUALI_LAP_CHANNELS,
+    STEP_CHANNELS,
+    FrameStore,
+    LapFrames,
+    StepChannel,
+    encode_channels,
+    rank_drivers,
+)
+from src.progressive import ProgressiveFrameStore, SharedArrays
+from src.telemetry_cache import (
+    CACHE_SUFFIXES,
+    cache_path,
+    convert_pickle_cache,
+    content_hash,
+    legacy_pickle_path,
+    load_race_telemetry,
+    load_quali_telemetry,
+    load_shard,
+    prune_shards,
+    save_race_session_info,
+    save_race_telemetry,
+    save_quali_telemetry,
+    save_shard,
+    shard_path,
+)
 
 import pandas as pd
 
@@ -24,90 +54,232 @@ def enable_cache():
 FPS = 25
 DT = 1 / FPS
 
-def _process_single_driver(args):
-    """Process telemetry data for a single driver - must be top-level for multiprocessing"""
-    driver_no, session, driver_code = args
-    
-    print(f"Getting telemetry for driver: {driver_code}")
+# Rate (Hz) at which race telemetry is stored. The replay window interpolates
+# car positions between samples, so this can be far below the display rate.
+RACE_SAMPLE_RATE = 10
+
+class Resampler:
+    """
+    Resample many channels that share source timestamps onto one timeline.
+
+    The binary search and interpolation weights are worked out once, then
+    `linear()` / `step()` apply them to a single channel or to a stacked
+    [n_channels, n_samples] matrix in one go. `linear()` matches np.interp
+    (values are held at the ends); `step()` forward-fills the last sample at or
+    before each target time and back-fills before the first one, which is what
+    FastF1 does for discrete channels like gear and DRS.
+    """
+
+    def __init__(self, t_src, t_dst):
+        t_src = np.asarray(t_src, dtype=float)
+        t_dst = np.asarray(t_dst, dtype=float)
+        if t_src.size == 0:
+            raise ValueError("Cannot resample from an empty time base")
+
+        last = t_src.size - 1
+        hi = np.searchsorted(t_src, t_dst, side='right')
+        lo = hi - 1
+        np.clip(lo, 0, last, out=lo)
+        np.clip(hi, 0, last, out=hi)
+
+        # Targets outside the source range get lo == hi (span 0) and keep weight 0
+        t_lo = t_src.take(lo)
+        span = t_src.take(hi)
+        span -= t_lo
+        weight = np.zeros_like(t_dst)
+        np.divide(t_dst - t_lo, span, out=weight, where=span > 0)
+
+        self.lo = lo
+        self.hi = hi
+        self.weight = weight
+
+    def linear(self, values):
+        values = np.asarray(values, dtype=float)
+        out = values.take(self.lo, axis=-1)
+        delta = values.take(self.hi, axis=-1)
+        delta -= out
+        delta *= self.weight
+        out += delta
+        return out
+
+    def step(self, values):
+        return np.asarray(values).take(self.lo, axis=-1)
+
+
+def _seconds(series):
+    return series.dt.total_seconds().to_numpy(dtype=float)
+
+def _session_weather(session):
+    """FastF1 weather columns as plain arrays ("Time" in session seconds), or None."""
+    weather_df = getattr(session, "weather_data", None)
+    if weather_df is None or weather_df.empty:
+        return None
+    weather = {"Time": _seconds(weather_df["Time"])}
+    for column in WEATHER_COLUMNS.values():
+        if column in weather_df:
+            weather[column] = weather_df[column].to_numpy()
+    return weather
+
+def _driver_raw_telemetry(session, driver_no):
+    """
+    Plain numpy copies of one driver's car and position data.
+
+    FastF1 Telemetry objects carry a reference to the whole session, so
+    pickling them for a Pool worker would ship every driver's data with it.
+    """
+    car = session.car_data.get(driver_no)
+    pos = session.pos_data.get(driver_no)
+    if car is None or pos is None or car.empty or pos.empty:
+        return None
+    return _raw_arrays(car, pos)
+
+def _raw_arrays(car, pos):
+    """Car / position DataFrames (or row slices of them) -> plain arrays in session seconds."""
+    return {
+        "car": {
+            "t": _seconds(car["SessionTime"]),
+            "speed": car["Speed"].to_numpy(dtype=float),
+            "throttle": car["Throttle"].to_numpy(dtype=float),
+            "brake": car["Brake"].to_numpy().astype(float),
+            "gear": car["nGear"].to_numpy(dtype=float),
+            "drs": car["DRS"].to_numpy(dtype=float),
+        },
+        "pos": {
+            "t": _seconds(pos["SessionTime"]),
+            "x": pos["X"].to_numpy(dtype=float),
+            "y": pos["Y"].to_numpy(dtype=float),
+        },
+    }
+
+def _padded_slice(t, start, end):
+    # Samples within [start, end] plus one either side (slice_by_lap(pad=1))
+    i0 = np.searchsorted(t, start, side='left')
+    i1 = np.searchsorted(t, end, side='right')
+    if i1 <= i0:
+        return None
+    return slice(max(i0 - 1, 0), min(i1 + 1, len(t)))
+
+def _merge_driver_telemetry(car, pos, starts, ends):
+    """
+    Merge a driver's car and position data once and split it into laps.
+
+    Equivalent of calling `Lap.get_telemetry()` for every lap, working on
+    plain arrays of session times (seconds): car and position samples are
+    merged onto their combined timestamps, each sample is assigned to the lap
+    whose [start, end] window contains it (binary search on the lap starts)
+    and distance is integrated from speed and reset at every lap start.
+
+    Returns `(lap_idx, telemetry)`, where `lap_idx` gives the position in
+    `starts`/`ends` of each merged sample, or None if no lap has data.
+    """
+    car_t = car["t"]
+    pos_t = pos["t"]
+    starts = np.asarray(starts, dtype=float)
+    ends = np.asarray(ends, dtype=float)
+
+    # Laps need a time window and at least one car and position sample inside it
+    def _has_samples(t_src):
+        return np.searchsorted(t_src, ends, side='right') > np.searchsorted(t_src, starts, side='left')
+
+    valid = np.isfinite(starts) & np.isfinite(ends) & _has_samples(car_t) & _has_samples(pos_t)
+    lap_ids = np.flatnonzero(valid)
+    if lap_ids.size == 0:
+        return None
+    lap_ids = lap_ids[np.argsort(starts[lap_ids], kind='stable')]
+    lap_starts = starts[lap_ids]
+    lap_ends = ends[lap_ids]
+
+    t = np.union1d(np.union1d(car_t, pos_t), np.concatenate([lap_starts, lap_ends]))
+    slot = np.searchsorted(lap_starts, t, side='right') - 1
+    inside = slot >= 0
+    inside[inside] = t[inside] <= lap_ends[slot[inside]]
+    t = t[inside]
+    slot = slot[inside]
+
+    # Distance driven since the lap start (Telemetry.add_distance / add_relative_distance)
+    car_dist = np.cumsum(car["speed"] / 3.6 * np.diff(car_t, prepend=car_t[0]))
+    dist_at_start = np.interp(lap_starts, car_t, car_dist)
+    lap_length = np.interp(lap_ends, car_t, car_dist) - dist_at_start
+
+    from_car = Resampler(car_t, t)
+    from_pos = Resampler(pos_t, t)
+    dist, speed, throttle = from_car.linear(np.vstack([car_dist, car["speed"], car["throttle"]]))
+    brake, gear, drs = from_car.step(np.vstack([car["brake"], car["gear"], car["drs"]]))
+    x, y = from_pos.linear(np.vstack([pos["x"], pos["y"]]))
+
+    dist = dist - dist_at_start[slot]
+    safe_length = np.where(lap_length > 0, lap_length, 1.0)
+    rel_dist = np.where(lap_length[slot] > 0, dist / safe_length[slot], 0.0)
+
+    return lap_ids[slot], {
+        "t": t,
+        "x": x,
+        "y": y,
+        "dist": dist,
+        "rel_dist": rel_dist,
+        "speed": speed,
+        "throttle": throttle,
+        "brake": brake,
+        "gear": gear,
+        "drs": drs,
+    }
+
+def _merge_lap_telemetry(car, pos, start, end):
+    """Merged telemetry for a single lap window (see _merge_driver_telemetry). None if there's no data."""
+    if not (np.isfinite(start) and np.isfinite(end)):
+        return None
+
+    car_sl = _padded_slice(car["t"], start, end)
+    pos_sl = _padded_slice(pos["t"], start, end)
+    if car_sl is None or pos_sl is None:
+        return None
 
+    merged = _merge_driver_telemetry(
+        {name: values[car_sl] for name, values in car.items()},
+        {name: values[pos_sl] for name, values in pos.items()},
+        [start], [end],
+    )
+    return merged[1] if merged is not None else None
+
+def _driver_race_inputs(session, driver_no):
+    """Everything _process_single_driver needs for one driver, sliced out of the session once."""
     laps_driver = session.laps.pick_drivers(driver_no)
     if laps_driver.empty:
         return None
 
-    driver_max_lap = laps_driver.LapNumber.max() if not laps_driver.empty else 0
-
-    t_all = []
-    x_all = []
-    y_all = []
-    race_dist_all = []
-    rel_dist_all = []
-    lap_numbers = []
-    tyre_compounds = []
-    speed_all = []
-    gear_all = []
-    drs_all = []
-    throttle_all = []
-    brake_all = []
-
-    total_dist_so_far = 0.0
-
-    # iterate laps in order
-    for _, lap in laps_driver.iterlaps():
-        # get telemetry for THIS lap only
-        lap_tel = lap.get_telemetry()
-        lap_number = lap.LapNumber
-        tyre_compund_as_int = get_tyre_compound_int(lap.Compound)
-
-        if lap_tel.empty:
-            continue
-
-        t_lap = lap_tel["SessionTime"].dt.total_seconds().to_numpy()
-        x_lap = lap_tel["X"].to_numpy()
-        y_lap = lap_tel["Y"].to_numpy()
-        d_lap = lap_tel["Distance"].to_numpy()          
-        rd_lap = lap_tel["RelativeDistance"].to_numpy()
-        speed_kph_lap = lap_tel["Speed"].to_numpy()
-        gear_lap = lap_tel["nGear"].to_numpy()
-        drs_lap = lap_tel["DRS"].to_numpy()
-        throttle_lap = lap_tel["Throttle"].to_numpy()
-        brake_lap = lap_tel["Brake"].to_numpy().astype(float)
-
-        # race distance = distance before this lap + distance within this lap
-        race_d_lap = total_dist_so_far + d_lap
-
-        t_all.append(t_lap)
-        x_all.append(x_lap)
-        y_all.append(y_lap)
-        race_dist_all.append(race_d_lap)
-        rel_dist_all.append(rd_lap)
-        lap_numbers.append(np.full_like(t_lap, lap_number))
-        tyre_compounds.append(np.full_like(t_lap, tyre_compund_as_int))
-        speed_all.append(speed_kph_lap)
-        gear_all.append(gear_lap)
-        drs_all.append(drs_lap)
-        throttle_all.append(throttle_lap)
-        brake_all.append(brake_lap)
-
-    if not t_all:
+    raw = _driver_raw_telemetry(session, driver_no)
+    if raw is None:
         return None
 
-    # Concatenate all arrays at once for better performance
-    all_arrays = [t_all, x_all, y_all, race_dist_all, rel_dist_all, 
-                  lap_numbers, tyre_compounds, speed_all, gear_all, drs_all]
-    
-    t_all, x_all, y_all, race_dist_all, rel_dist_all, lap_numbers, \
-    tyre_compounds, speed_all, gear_all, drs_all = [np.concatenate(arr) for arr in all_arrays]
+    raw["laps"] = {
+        "number": laps_driver["LapNumber"].to_numpy(dtype=float),
+        "start": _seconds(laps_driver["LapStartTime"]),
+        "end": _seconds(laps_driver["Time"]),
+        "tyre": np.array([
+            get_tyre_compound_int(compound) if isinstance(compound, str) else -1
+            for compound in laps_driver["Compound"]
+        ], dtype=float),
+    }
+    return raw
 
-    # Sort all arrays by time in one operation
-    order = np.argsort(t_all)
-    all_data = [t_all, x_all, y_all, race_dist_all, rel_dist_all, 
-                lap_numbers, tyre_compounds, speed_all, gear_all, drs_all]
+def _process_single_driver(args):
+    """Process telemetry data for a single driver - must be top-level for multiprocessing"""
+    driver_code, inputs = args
     
-    t_all, x_all, y_all, race_dist_all, rel_dist_all, lap_numbers, \
-    tyre_compounds, speed_all, gear_all, drs_all = [arr[order] for arr in all_data]
+    print(f"Getting telemetry for driver: {driver_code}")
+
+    laps = inputs["laps"]
+    driver_max_lap = np.nanmax(laps["number"]) if len(laps["number"]) else 0
+
+    # Merge the whole race once, then tag every sample with the lap it falls in
+    merged = _merge_driver_telemetry(inputs["car"], inputs["pos"], laps["start"], laps["end"])
+    if merged is None:
+        return None
+    lap_idx, tel = merged
 
-    throttle_all = np.concatenate(throttle_all)[order]
-    brake_all = np.concatenate(brake_all)[order]
+    t_all = tel["t"]
+    lap_numbers = laps["number"][lap_idx]
+    tyre_compounds = laps["tyre"][lap_idx]
 
     print(f"Completed telemetry for driver: {driver_code}")
     
@@ -115,23 +287,46 @@ def _process_single_driver(args):
         "code": driver_code,
         "data": {
             "t": t_all,
-            "x": x_all,
-            "y": y_all,
-            "dist": race_dist_all,
-            "rel_dist": rel_dist_all,                   
+            "x": tel["x"],
+            "y": tel["y"],
+            "dist": tel["dist"],   # distance within the current lap
+            "rel_dist": tel["rel_dist"],
             "lap": lap_numbers,
             "tyre": tyre_compounds,
-            "speed": speed_all,
-            "gear": gear_all,
-            "drs": drs_all,
-            "throttle": throttle_all,
-            "brake": brake_all,
+            "speed": tel["speed"],
+            "gear": tel["gear"],
+            "drs": tel["drs"],
+            "throttle": tel["throttle"],
+            "brake": tel["brake"],
         },
         "t_min": t_all.min(),
         "t_max": t_all.max(),
         "max_lap": driver_max_lap
     }
 
+def _merged_driver_shard(args):
+    """
+    Pool task for the per-driver stage: reuse the driver's merged telemetry
+    shard when its inputs are unchanged, otherwise compute and write it.
+    Returns a small summary (shard key, time range, laps) instead of the arrays.
+    """
+    driver_code, inputs, shard_dir = args
+    key = content_hash(RACE_SHARD_STAGES["merged"], inputs)
+    name = os.path.join(driver_code, "merged")
+
+    shard = load_shard(shard_dir, name, key)
+    if shard is not None:
+        print(f"Reusing telemetry for driver: {driver_code}")
+        meta = shard[1]
+    else:
+        result = _process_single_driver((driver_code, inputs))
+        if result is None:
+            return None
+        meta = {"t_min": float(result["t_min"]), "t_max": float(result["t_max"]), "max_lap": float(result["max_lap"])}
+        save_shard(shard_dir, name, key, result["data"], meta)
+
+    return {"code": driver_code, "key": key, **meta}
+
 def load_session(year, round_number, session_type='R'):
     # session_type: 'R' (Race), 'S' (Sprint) etc.
     session = fastf1.get_session(year, round_number, session_type)
@@ -155,124 +350,84 @@ def get_circuit_rotation(session):
     circuit = session.get_circuit_info()
     return circuit.rotation
 
-def get_race_telemetry(session, session_type='R'):
-
-    event_name = str(session).replace(' ', '_')
-    cache_suffix = 'sprint' if session_type == 'S' else 'race'
-
-    # Check if this data has already been computed
-
-    try:
-        if "--refresh-data" not in sys.argv:
-            with open(f"computed_data/{event_name}_{cache_suffix}_telemetry.pkl", "rb") as f:
-                frames = pickle.load(f)
-                print(f"Loaded precomputed {cache_suffix} telemetry data.")
-                print("The replay should begin in a new window shortly!")
-                return frames
-    except FileNotFoundError:
-        pass  # Need to compute from scratch
-
+def get_race_session_info(session):
+    """Everything the race replay window needs from the session apart from the frames."""
+    example_lap = session.laps.pick_fastest().get_telemetry()
+    return {
+        "event_name": session.event['EventName'],
+        "drivers": list(session.drivers),
+        "circuit_rotation": float(get_circuit_rotation(session)),
+        "example_lap": {
+            "X": example_lap["X"].to_numpy(dtype=float),
+            "Y": example_lap["Y"].to_numpy(dtype=float),
+        },
+    }
 
-    drivers = session.drivers
+def _session_cache_path(session, session_type):
+    return cache_path(session.event.year, session.event['RoundNumber'], session_type)
 
-    driver_codes = {
-        num: session.get_driver(num)["Abbreviation"]
-        for num in drivers
-    }
+def _load_cached_telemetry(session, session_type, loader):
+    """Return previously computed telemetry (None on a miss or with --refresh-data)."""
+    if "--refresh-data" in sys.argv:
+        return None
 
-    driver_data = {}
+    path = _session_cache_path(session, session_type)
+    data = loader(path)
 
-    global_t_min = None
-    global_t_max = None
-    
-    max_lap_number = 0
+    # Caches written by older versions are single pickle files; convert them once
+    pkl_path = legacy_pickle_path(str(session).replace(' ', '_'), session_type)
+    if data is None and os.path.exists(pkl_path):
+        print(f"Converting {pkl_path} to the memory-mapped cache format...")
+        convert_pickle_cache(pkl_path, path, fps=FPS)
+        data = loader(path)
 
-    # 1. Get all of the drivers telemetry data using multiprocessing
-    # Prepare arguments for parallel processing
-    print(f"Processing {len(drivers)} drivers in parallel...")
-    driver_args = [(driver_no, session, driver_codes[driver_no]) for driver_no in drivers]
-    
-    num_processes = min(cpu_count(), len(drivers))
-    
-    with Pool(processes=num_processes) as pool:
-        results = pool.map(_process_single_driver, driver_args)
-    
-    # Process results
-    for result in results:
-        if result is None:
-            continue
-        
-        code = result["code"]
-        driver_data[code] = result["data"]
-        
-        t_min = result["t_min"]
-        t_max = result["t_max"]
-        max_lap_number = max(max_lap_number, result["max_lap"])
-        
-        global_t_min = t_min if global_t_min is None else min(global_t_min, t_min)
-        global_t_max = t_max if global_t_max is None else max(global_t_max, t_max)
+    if data is not None:
+        print(f"Loaded precomputed {CACHE_SUFFIXES[session_type]} telemetry data.")
+        print("The replay should begin in a new window shortly!")
+    return data
 
-    # Ensure we have valid time bounds
-    if global_t_min is None or global_t_max is None:
-        raise ValueError("No valid telemetry data found for any driver")
+# Frames built and published per chunk of the timeline in progressive mode
+RACE_CHUNK_FRAMES = 3000
 
-    # 2. Create a timeline (start from zero)
-    timeline = np.arange(global_t_min, global_t_max, DT) - global_t_min
+# Version of each per-driver shard stage; bump one when its output changes so
+# existing shards are recomputed on the next run
+RACE_SHARD_STAGES = {"merged": 1, "frames": 2}
 
-    # 3. Resample each driver's telemetry (x, y, gap) onto the common timeline
-    resampled_data = {}
+# Driver channels resampled linearly onto the race timeline (STEP_CHANNELS are forward-filled)
+RACE_LINEAR_CHANNELS = ("x", "y", "dist", "rel_dist", "speed", "throttle", "brake")
 
-    for code, data in driver_data.items():
-        t = data["t"] - global_t_min  # Shift
+def _race_session_inputs(session):
+    """Everything the race pipeline needs from the session, as plain (picklable) values."""
+    driver_codes = {
+        num: session.get_driver(num)["Abbreviation"]
+        for num in session.drivers
+    }
 
-        # ensure sorted by time
-        order = np.argsort(t)
-        t_sorted = t[order]
-        
-        # Vectorize all resampling in one operation for speed
-        arrays_to_resample = [
-            data["x"][order],
-            data["y"][order],
-            data["dist"][order],
-            data["rel_dist"][order],
-            data["lap"][order],
-            data["tyre"][order],
-            data["speed"][order],
-            data["gear"][order],
-            data["drs"][order],
-            data["throttle"][order],
-            data["brake"][order],
-        ]
-        
-        resampled = [np.interp(timeline, t_sorted, arr) for arr in arrays_to_resample]
-        x_resampled, y_resampled, dist_resampled, rel_dist_resampled, lap_resampled, \
-        tyre_resampled, speed_resampled, gear_resampled, drs_resampled, throttle_resampled, brake_resampled = resampled
- 
-        resampled_data[code] = {
-            "t": timeline,
-            "x": x_resampled,
-            "y": y_resampled,
-            "dist": dist_resampled,   # race distance (metres since Lap 1 start)
-            "rel_dist": rel_dist_resampled,
-            "lap": lap_resampled,
-            "tyre": tyre_resampled,
-            "speed": speed_resampled,
-            "gear": gear_resampled,
-            "drs": drs_resampled,
-            "throttle": throttle_resampled,
-            "brake": brake_resampled
-        }
+    driver_args = []
+    for driver_no in session.drivers:
+        inputs = _driver_race_inputs(session, driver_no)
+        if inputs is not None:
+            driver_args.append((driver_codes[driver_no], inputs))
 
-    # 4. Incorporate track status data into the timeline (for safety car, VSC, etc.)
+    track_status = [
+        (timedelta.total_seconds(status['Time']), status['Status'])
+        for status in session.track_status.to_dict('records')
+    ]
 
-    track_status = session.track_status
+    return {
+        "driver_args": driver_args,
+        "track_status": track_status,
+        "weather": _session_weather(session),
+        "driver_colors": get_driver_colors(session),
+        "session_info": get_race_session_info(session),
+    }
 
+def _format_track_statuses(track_status, t_offset):
+    """(session seconds, status) pairs -> the replay's track status dicts on the timeline."""
     formatted_track_statuses = []
 
-    for status in track_status.to_dict('records'):
-        seconds = timedelta.total_seconds(status['Time'])
-
-        start_time = seconds - global_t_min # Shift to match timeline
+    for seconds, status in track_status:
+        start_time = seconds - t_offset # Shift to match timeline
         end_time = None
 
         # Set the end time of the previous status
@@ -281,162 +436,314 @@ def get_race_telemetry(session, session_type='R'):
             formatted_track_statuses[-1]['end_time'] = start_time
 
         formatted_track_statuses.append({
-            'status': status['Status'],
+            'status': status,
             'start_time': start_time,
             'end_time': end_time, 
         })
 
-    # 4.1. Resample weather data onto the same timeline for playback
-    weather_resampled = None
-    weather_df = getattr(session, "weather_data", None)
-    if weather_df is not None and not weather_df.empty:
-        try:
-            weather_times = weather_df["Time"].dt.total_seconds().to_numpy() - global_t_min
-            if len(weather_times) > 0:
-                order = np.argsort(weather_times)
-                weather_times = weather_times[order]
-
-                def _maybe_get(name):
-                    return weather_df[name].to_numpy()[order] if name in weather_df else None
-
-                def _resample(series):
-                    if series is None:
-                        return None
-                    return np.interp(timeline, weather_times, series)
-
-                track_temp = _resample(_maybe_get("TrackTemp"))
-                air_temp = _resample(_maybe_get("AirTemp"))
-                humidity = _resample(_maybe_get("Humidity"))
-                wind_speed = _resample(_maybe_get("WindSpeed"))
-                wind_direction = _resample(_maybe_get("WindDirection"))
-                rainfall_raw = _maybe_get("Rainfall")
-                rainfall = _resample(rainfall_raw.astype(float)) if rainfall_raw is not None else None
-
-                weather_resampled = {
-                    "track_temp": track_temp,
-                    "air_temp": air_temp,
-                    "humidity": humidity,
-                    "wind_speed": wind_speed,
-                    "wind_direction": wind_direction,
-                    "rainfall": rainfall,
-                }
-        except Exception as e:
-            print(f"Weather data could not be processed: {e}")
-
-    # 5. Build the frames + LIVE LEADERBOARD
-    frames = []
-    num_frames = len(timeline)
-    
-    # Pre-extract data references for faster access
-    driver_codes = list(resampled_data.keys())
-    driver_arrays = {code: resampled_data[code] for code in driver_codes}
-
-    for i in range(num_frames):
-        t = timeline[i]
-        snapshot = []
-        for code in driver_codes:
-            d = driver_arrays[code]
-            snapshot.append({
-                "code": code,
-                "dist": float(d["dist"][i]),
-                "x": float(d["x"][i]),
-                "y": float(d["y"][i]),
-                "lap": int(round(d["lap"][i])),
-                "rel_dist": float(d["rel_dist"][i]),
-                "tyre": float(d["tyre"][i]),
-                "speed": float(d['speed'][i]),
-                "gear": int(d['gear'][i]),
-                "drs": int(d['drs'][i]),
-                "throttle": float(d['throttle'][i]),
-                "brake": float(d['brake'][i]),
-            })
-
-        # If for some reason we have no drivers at this instant
-        if not snapshot:
-            continue
+    return formatted_track_statuses
 
-        # 5b. Sort by race distance to get POSITIONS (1–20)
-        # Leader = largest race distance covered
-        snapshot.sort(key=lambda r: r["dist"], reverse=True)
-
-        leader = snapshot[0]
-        leader_lap = leader["lap"]
-
-        # TODO: This 5c. step seems futile currently as we are not using gaps anywhere, and it doesn't even comput the gaps. I think I left this in when removing the "gaps" feature that was half-finished during the initial development.
-
-        # 5c. Compute gap to car in front in SECONDS
-        frame_data = {}
-
-        for idx, car in enumerate(snapshot):
-            code = car["code"]
-            position = idx + 1
-
-            # include speed, gear, drs_active in frame driver dict
-            frame_data[code] = {
-                "x": car["x"],
-                "y": car["y"],
-                "dist": car["dist"],    
-                "lap": car["lap"],
-                "rel_dist": round(car["rel_dist"], 4),
-                "tyre": car["tyre"],
-                "position": position,
-                "speed": car['speed'],
-                "gear": car['gear'],
-                "drs": car['drs'],
-                "throttle": car['throttle'],
-                "brake": car['brake'],
-            }
-
-        weather_snapshot = {}
-        if weather_resampled:
-            try:
-                wt = weather_resampled
-                rain_val = wt["rainfall"][i] if wt.get("rainfall") is not None else 0.0
-                weather_snapshot = {
-                    "track_temp": float(wt["track_temp"][i]) if wt.get("track_temp") is not None else None,
-                    "air_temp": float(wt["air_temp"][i]) if wt.get("air_temp") is not None else None,
-                    "humidity": float(wt["humidity"][i]) if wt.get("humidity") is not None else None,
-                    "wind_speed": float(wt["wind_speed"][i]) if wt.get("wind_speed") is not None else None,
-                    "wind_direction": float(wt["wind_direction"][i]) if wt.get("wind_direction") is not None else None,
-                    "rain_state": "RAINING" if rain_val and rain_val >= 0.5 else "DRY",
-                }
-            except Exception as e:
-                print(f"Failed to attach weather data to frame {i}: {e}")
-
-        frame_payload = {
-            "t": round(t, 3),
-            "lap": leader_lap,   # leader's lap at this time
-            "drivers": frame_data,
-        }
-        if weather_snapshot:
-            frame_payload["weather"] = weather_snapshot
+def _race_timeline(t_min, t_max, sample_rate):
+    # Timeline (starting from zero) at the storage rate
+    return np.arange(t_min, t_max, 1 / sample_rate) - t_min
+
+def _plan_race_frames(inputs, sample_rate, shard_dir):
+    """
+    Run the per-driver stage (one merged-telemetry shard per driver under
+    `shard_dir`) and lay out the frames: the timeline, track statuses, weather
+    and the reference lap. The frames themselves are built from this plan.
+    """
+    driver_args = inputs["driver_args"]
+
+    # 1. Get all of the drivers telemetry data using multiprocessing; the
+    # workers write their shards directly and only report back a summary
+    print(f"Processing {len(driver_args)} drivers in parallel...")
+    num_processes = max(1, min(cpu_count(), len(driver_args)))
+
+    with Pool(processes=num_processes) as pool:
+        results = pool.map(_merged_driver_shard, [
+            (driver_code, driver_inputs, shard_dir) for driver_code, driver_inputs in driver_args
+        ])
+    results = [result for result in results if result is not None]
+
+    # Ensure we have valid time bounds
+    if not results:
+        raise ValueError("No valid telemetry data found for any driver")
+
+    global_t_min = min(result["t_min"] for result in results)
+    global_t_max = max(result["t_max"] for result in results)
+    max_lap_number = max(result["max_lap"] for result in results)
+
+    example_lap = inputs["session_info"]["example_lap"]
+
+    return {
+        # 2. Create a timeline (start from zero) at the storage rate
+        "timeline": _race_timeline(global_t_min, global_t_max, sample_rate),
+        "t_offset": global_t_min,
+        "t_max": global_t_max,
+        "sample_rate": sample_rate,
+        "driver_codes": [result["code"] for result in results],
+        "driver_keys": {result["code"]: result["key"] for result in results},
+        "shard_dir": shard_dir,
+        "total_laps": int(max_lap_number),
+        # 4. Track status (safety car, VSC, etc.) and weather on the same timeline
+        "track_statuses": _format_track_statuses(inputs["track_status"], global_t_min),
+        # Weather stays at its native rate; the store looks it up by time during playback
+        "weather": WeatherSeries.from_session_weather(inputs["weather"], t_offset=global_t_min),
+        "example_lap": {axis: np.asarray(example_lap[axis], dtype=float) for axis in ("X", "Y")},
+        "reference": ReferencePolyline(example_lap["X"], example_lap["Y"]),
+    }
+
+def _load_driver_telemetry(plan, driver_code):
+    """A driver's merged telemetry from its shard, shifted onto the timeline and sorted by time."""
+    shard = load_shard(plan["shard_dir"], os.path.join(driver_code, "merged"), plan["driver_keys"][driver_code])
+    if shard is None:
+        raise FileNotFoundError(f"Telemetry shard for {driver_code} disappeared from {plan['shard_dir']}")
+    data = shard[0]
+
+    t = data["t"] - plan["t_offset"]
+    order = np.argsort(t, kind="stable")
+    shifted = {name: np.asarray(values)[order] for name, values in data.items()}
+    shifted["t"] = t[order]
+    return shifted
+
+def _driver_frames(data, timeline, reference):
+    """
+    One driver's channels resampled onto `timeline`, plus race progress,
+    quantised to the compact CHANNEL_SCHEMA dtypes.
+    """
+    # 3. Resample the driver's telemetry onto the common timeline; one search
+    # per driver, shared by every channel
+    resampler = Resampler(data["t"], timeline)
+    frames = dict(zip(RACE_LINEAR_CHANNELS, resampler.linear(np.vstack([data[name] for name in RACE_LINEAR_CHANNELS]))))
+    frames.update(zip(STEP_CHANNELS, resampler.step(np.vstack([data[name] for name in STEP_CHANNELS]))))
+    frames["rel_dist"] = np.round(frames["rel_dist"], 4)
+
+    # 5b. Project the car onto the reference lap once, so the replay never has to:
+    # progress = completed laps × reference length + distance along the reference (metres)
+    frames["progress_m"] = reference.progress(frames["lap"], frames["x"], frames["y"]) / 10.0
+
+    # 5d. Quantise to the storage schema here, so shards and chunks stay compact
+    return encode_channels(frames)[0]
+
+def _driver_frames_key(plan, driver_code):
+    """Key of a driver's frame shard: its merged telemetry, the timeline and the reference lap."""
+    return content_hash(
+        RACE_SHARD_STAGES["frames"], plan["driver_keys"][driver_code],
+        plan["t_offset"], plan["t_max"], plan["sample_rate"], plan["example_lap"],
+        RACE_LINEAR_CHANNELS, STEP_CHANNELS,
+    )
+
+def _driver_frames_shard(args):
+    """
+    Pool task for the frame stage: one driver's channels on the race timeline,
+    written to its shard unless the merged telemetry, timeline and reference
+    lap are all unchanged. Returns the shard key.
+    """
+    driver_code, plan = args
+    key = _driver_frames_key(plan, driver_code)
+    name = os.path.join(driver_code, "frames")
+    if load_shard(plan["shard_dir"], name, key) is None:
+        data = _load_driver_telemetry(plan, driver_code)
+        save_shard(plan["shard_dir"], name, key, _driver_frames(data, plan["timeline"], plan["reference"]))
+    return key
+
+def _stack_race_frames(driver_codes, driver_frames):
+    """Per-driver channels -> [frames, drivers] channels plus positions and the running order."""
+    # 5. Columnar channels + LIVE LEADERBOARD
+    names = driver_frames[driver_codes[0]].keys()
+    channels = {name: np.column_stack([driver_frames[code][name] for code in driver_codes]) for name in names}
+
+    # 5c. Rank by race progress to get POSITIONS (1–20)
+    # Leader = furthest along the race
+    order, position = rank_drivers(channels["progress_m"])
+    channels["position"] = position.astype(CHANNEL_SCHEMA["position"][0])
+    return channels, order.astype(np.int8)
+
+def _race_frame_chunk(plan, driver_data, start, stop):
+    """
+    Dense encoded channels ([frames, drivers]) and the running order for
+    frames `start:stop` of the planned timeline.
+    """
+    timeline = plan["timeline"][start:stop]
+    driver_frames = {code: _driver_frames(driver_data[code], timeline, plan["reference"]) for code in plan["driver_codes"]}
+    return _stack_race_frames(plan["driver_codes"], driver_frames)
+
+def _race_frame_store(plan, channels, order):
+    """Build the compact FrameStore from full-length dense encoded channels."""
+    channels = dict(channels)
+
+    # Lap, tyre, gear and DRS only change occasionally: keep just the change points
+    for name in STEP_CHANNELS:
+        channels[name] = StepChannel.from_dense(channels[name], dtype=CHANNEL_SCHEMA[name][0])
+    scales = {name: CHANNEL_SCHEMA[name][1] for name in channels if name not in STEP_CHANNELS}
+
+    return FrameStore(
+        plan["timeline"], plan["driver_codes"], channels, fps=plan["sample_rate"],
+        weather=plan["weather"], order=order, scales=scales,
+    )
+
+def _prune_race_shards(plan):
+    """After a successful build, drop every shard the plan no longer refers to."""
+    keys = {}
+    for code in plan["driver_codes"]:
+        keys[os.path.join(code, "merged")] = plan["driver_keys"][code]
+        keys[os.path.join(code, "frames")] = _driver_frames_key(plan, code)
+    prune_shards(plan["shard_dir"], keys)
+
+def _race_data(inputs, plan, frames):
+    return {
+        "frames": frames,
+        "driver_colors": inputs["driver_colors"],
+        "track_statuses": plan["track_statuses"],
+        "total_laps": plan["total_laps"],
+        **inputs["session_info"],
+    }
+
+def _cached_race_telemetry(session, session_type):
+    cached = _load_cached_telemetry(session, session_type, load_race_telemetry)
+    if cached is not None and "example_lap" not in cached:
+        # Converted caches lack the session details; store them so later runs can skip the session load
+        session_info = get_race_session_info(session)
+        save_race_session_info(_session_cache_path(session, session_type), session_info)
+        cached.update(session_info)
+    return cached
+
+def get_race_telemetry(session, session_type='R', sample_rate=RACE_SAMPLE_RATE):
+
+    # Check if this data has already been computed
+    cached = _cached_race_telemetry(session, session_type)
+    if cached is not None:
+        return cached
+
+    inputs = _race_session_inputs(session)
+    path = _session_cache_path(session, session_type)
+    plan = _plan_race_frames(inputs, sample_rate, shard_path(path))
+
+    # Per-driver frame shards are (re)computed in parallel; unchanged drivers are only read back
+    driver_codes = plan["driver_codes"]
+    with Pool(processes=max(1, min(cpu_count(), len(driver_codes)))) as pool:
+        keys = pool.map(_driver_frames_shard, [(code, plan) for code in driver_codes])
+    driver_frames = {
+        code: load_shard(plan["shard_dir"], os.path.join(code, "frames"), key)[0]
+        for code, key in zip(driver_codes, keys)
+    }
+    channels, order = _stack_race_frames(driver_codes, driver_frames)
+    frames = _race_frame_store(plan, channels, order)
 
-        frames.append(frame_payload)
     print("completed telemetry extraction...")
     print("Saving to cache file...")
-    # If computed_data/ directory doesn't exist, create it
-    if not os.path.exists("computed_data"):
-        os.makedirs("computed_data")
-
-    # Save using pickle (10-100x faster than JSON)
-    with open(f"computed_data/{event_name}_{cache_suffix}_telemetry.pkl", "wb") as f:
-        pickle.dump({
-            "frames": frames,
-            "driver_colors": get_driver_colors(session),
-            "track_statuses": formatted_track_statuses,
-            "total_laps": int(max_lap_number),
-        }, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    data = _race_data(inputs, plan, frames)
+    save_race_telemetry(path, data)
+    _prune_race_shards(plan)
 
     print("Saved Successfully!")
     print("The replay should begin in a new window shortly")
+    return data
+
+def _progressive_race_worker(inputs, path, sample_rate, messages, ready):
+    """
+    Background process for progressive startup: builds the frames chunk by chunk
+    into shared memory, advancing `ready` after each chunk, then writes the cache.
+    """
+    try:
+        plan = _plan_race_frames(inputs, sample_rate, shard_path(path))
+        driver_data = {code: _load_driver_telemetry(plan, code) for code in plan["driver_codes"]}
+        n_frames = len(plan["timeline"])
+        n_drivers = len(plan["driver_codes"])
+
+        layout = {name: ((n_frames, n_drivers), dtype) for name, (dtype, _) in CHANNEL_SCHEMA.items()}
+        layout["order"] = ((n_frames, n_drivers), np.int8)
+        shared = SharedArrays.create(layout)
+
+        messages.put({
+            "shared": shared.spec,
+            "timeline": plan["timeline"],
+            "driver_codes": plan["driver_codes"],
+            "track_statuses": plan["track_statuses"],
+            "total_laps": plan["total_laps"],
+            "weather": plan["weather"],
+        })
+
+        for start in range(0, n_frames, RACE_CHUNK_FRAMES):
+            stop = min(start + RACE_CHUNK_FRAMES, n_frames)
+            channels, order = _race_frame_chunk(plan, driver_data, start, stop)
+            for name, values in channels.items():
+                shared.arrays[name][start:stop] = values
+            shared.arrays["order"][start:stop] = order
+            with ready.get_lock():
+                ready.value = stop
+
+        print("completed telemetry extraction...")
+        print("Saving to cache file...")
+
+        # The cache holds the usual compact store (step channels as change points)
+        channels = {name: shared.arrays[name] for name in CHANNEL_SCHEMA}
+        for name in STEP_CHANNELS:
+            channels[name] = StepChannel.from_dense(channels[name], dtype=CHANNEL_SCHEMA[name][0])
+        scales = {name: CHANNEL_SCHEMA[name][1] for name in CHANNEL_SCHEMA if name not in STEP_CHANNELS}
+        frames = FrameStore(
+            plan["timeline"], plan["driver_codes"], channels, fps=sample_rate,
+            weather=plan["weather"], order=shared.arrays["order"], scales=scales,
+        )
+        save_race_telemetry(path, _race_data(inputs, plan, frames))
+        _prune_race_shards(plan)
+        shared.close()
+        print("Saved Successfully!")
+    except Exception as e:
+        messages.put({"error": repr(e)})
+        raise
+
+def get_race_telemetry_progressive(session, session_type='R', sample_rate=RACE_SAMPLE_RATE):
+    """
+    Like get_race_telemetry, but on a cache miss the frames are computed in a
+    background process and the returned store fills up while the replay runs.
+    Returns as soon as the first chunk of frames is ready.
+    """
+    cached = _cached_race_telemetry(session, session_type)
+    if cached is not None:
+        return cached
+
+    inputs = _race_session_inputs(session)
+
+    messages = Queue()
+    ready = Value("q", 0)
+    worker = Process(
+        target=_progressive_race_worker,
+        args=(inputs, _session_cache_path(session, session_type), sample_rate, messages, ready),
+    )
+    worker.start()
+
+    layout = messages.get()
+    if "error" in layout:
+        worker.join()
+        raise RuntimeError(f"Telemetry processing failed: {layout['error']}")
+
+    frames = ProgressiveFrameStore(
+        layout["timeline"], layout["driver_codes"], SharedArrays.attach(layout["shared"]), ready,
+        fps=sample_rate, weather=layout["weather"],
+        scales={name: CHANNEL_SCHEMA[name][1] for name in CHANNEL_SCHEMA if name not in STEP_CHANNELS},
+        worker=worker, messages=messages,
+    )
+
+    # Open the replay as soon as the first chunk has been published
+    while frames.ready_frames == 0:
+        error = frames.build_error()
+        if error is not None:
+            frames.close()
+            raise RuntimeError(f"Telemetry processing failed: {error}")
+        time.sleep(0.1)
+
+    print("First frames ready; the rest are computed while the replay runs")
     return {
         "frames": frames,
-        "driver_colors": get_driver_colors(session),
-        "track_statuses": formatted_track_statuses,
-        "total_laps": int(max_lap_number),
+        "driver_colors": inputs["driver_colors"],
+        "track_statuses": layout["track_statuses"],
+        "total_laps": layout["total_laps"],
+        **inputs["session_info"],
     }
 
-
 def get_qualifying_results(session):
 
     # Extract the qualifying results and return a list of the drivers, their positions and their lap times in each qualifying segment
@@ -468,66 +775,115 @@ def get_qualifying_results(session):
         })
     return qualifying_data
 
-def get_driver_quali_telemetry(session, driver_code: str, quali_segment: str):
-
-    # Split Q1/Q2/Q3 sections
-    q1, q2, q3 = session.laps.split_qualifying_sessions()
+QUALI_SEGMENTS = ("Q1", "Q2", "Q3")
+
+def _quali_fastest_laps(session):
+    """
+    Every driver's fastest lap window per segment: {code: {segment: {start, end, lap_time}}}.
+
+    The session is split into Q1/Q2/Q3 once and the fastest counted lap
+    (IsPersonalBest, like Laps.pick_fastest) of every driver and segment is
+    picked in a single grouped pass.
+    """
+    segment_laps = [
+        laps.assign(Segment=segment)
+        for segment, laps in zip(QUALI_SEGMENTS, session.laps.split_qualifying_sessions())
+        if laps is not None
+    ]
+    if not segment_laps:
+        return {}
+
+    laps = pd.concat(segment_laps)
+    laps = laps[(laps["IsPersonalBest"] == True) & laps["LapTime"].notna()]  # noqa: E712
+    # Stable sort: on equal times the first clocked lap wins, as in pick_fastest
+    fastest = laps.sort_values("LapTime", kind="stable").drop_duplicates(["Driver", "Segment"])
+
+    fastest_laps = {}
+    for row in fastest.itertuples():
+        fastest_laps.setdefault(row.Driver, {})[row.Segment] = {
+            "start": timedelta.total_seconds(row.LapStartTime) if not pd.isna(row.LapStartTime) else np.nan,
+            "end": timedelta.total_seconds(row.Time) if not pd.isna(row.Time) else np.nan,
+            "lap_time": str(row.LapTime),
+        }
+    return fastest_laps
+
+def _quali_session_inputs(session):
+    """Session-wide data (track status, weather) every qualifying worker needs, as plain values."""
+    track_status = [
+        (timedelta.total_seconds(status['Time']), status['Status'])
+        for status in session.track_status.to_dict('records')
+    ]
+
+    return {"track_status": track_status, "weather": _session_weather(session)}
+
+def _driver_quali_inputs(session, driver_no, fastest_laps):
+    """
+    One driver's fastest lap window in each segment, with just the car and
+    position samples around that lap (None when the window has no data).
+    """
+    laps = {segment: dict(lap, car=None, pos=None) for segment, lap in fastest_laps.items()}
+
+    car = session.car_data.get(driver_no)
+    pos = session.pos_data.get(driver_no)
+    if not laps or car is None or pos is None or car.empty or pos.empty:
+        return {"laps": laps}
+
+    car_t = _seconds(car["SessionTime"])
+    pos_t = _seconds(pos["SessionTime"])
+    for lap in laps.values():
+        if not (np.isfinite(lap["start"]) and np.isfinite(lap["end"])):
+            continue
+        car_sl = _padded_slice(car_t, lap["start"], lap["end"])
+        pos_sl = _padded_slice(pos_t, lap["start"], lap["end"])
+        if car_sl is None or pos_sl is None:
+            continue
+        lap.update(_raw_arrays(car.iloc[car_sl], pos.iloc[pos_sl]))
+    return {"laps": laps}
 
-    segments = {
-        "Q1": q1,
-        "Q2": q2,
-        "Q3": q3
-    }
+def get_driver_quali_telemetry(session, driver_code: str, quali_segment: str):
 
     # Validate the segment
-    if quali_segment not in segments:
+    if quali_segment not in QUALI_SEGMENTS:
         raise ValueError("quali_segment must be 'Q1', 'Q2', or 'Q3'")
 
-    segment_laps = segments[quali_segment]
-    if segment_laps is None:
-        raise ValueError(f"{quali_segment} does not exist for this session.")
+    driver_no = session.get_driver(driver_code)["DriverNumber"]
+    fastest_laps = _quali_fastest_laps(session).get(driver_code, {})
+    inputs = _driver_quali_inputs(session, driver_no, fastest_laps)
+    return _build_quali_lap_telemetry(inputs, quali_segment, _quali_session_inputs(session))
 
-    # Filter laps for the driver
-    driver_laps = segment_laps.pick_drivers(driver_code)
-    if driver_laps.empty:
-        raise ValueError(f"No laps found for driver '{driver_code}' in {quali_segment}")
+def _build_quali_lap_telemetry(inputs, quali_segment, session_inputs):
+    """Frames for one driver's fastest lap in a segment, from pre-sliced arrays (no session needed)."""
 
-    # Pick fastest lap
-    fastest_lap = driver_laps.pick_fastest()
+    fastest_lap = inputs["laps"].get(quali_segment)
+    if fastest_lap is None:
+        raise ValueError(f"No valid laps for driver in {quali_segment}")
+    if fastest_lap["car"] is None:
+        raise ValueError(f"No telemetry for driver in {quali_segment}")
 
     # Extract telemetry with xyz coordinates
 
-    if fastest_lap is None:
-        raise ValueError(f"No valid laps for driver '{driver_code}' in {quali_segment}")
-
-    telemetry = fastest_lap.get_telemetry()
+    telemetry = _merge_lap_telemetry(fastest_lap["car"], fastest_lap["pos"], fastest_lap["start"], fastest_lap["end"])
 
     # Guard: if telemetry has no time data, return empty
-    if telemetry is None or telemetry.empty or 'Time' not in telemetry or len(telemetry) == 0:
+    if telemetry is None or len(telemetry["t"]) == 0:
         return {"frames": [], "track_statuses": []}
 
-    global_t_min = telemetry["Time"].dt.total_seconds().min()
-    global_t_max = telemetry["Time"].dt.total_seconds().max()
-
-    max_speed = telemetry["Speed"].max()
-    min_speed = telemetry["Speed"].min()
-
-    # An array of objects containing the start and end disances of each time the driver used DRS during the lap
-    lap_drs_zones = []
-
-    # Build arrays directly from dataframes
-    t_arr = telemetry["Time"].dt.total_seconds().to_numpy()
-    x_arr = telemetry["X"].to_numpy()
-    y_arr = telemetry["Y"].to_numpy()
-    dist_arr = telemetry["Distance"].to_numpy()
-    rel_dist_arr = telemetry["RelativeDistance"].to_numpy()
-    speed_arr = telemetry["Speed"].to_numpy()
-    gear_arr = telemetry["nGear"].to_numpy()
-    throttle_arr = telemetry["Throttle"].to_numpy()
-    brake_arr = telemetry["Brake"].to_numpy()
-    drs_arr = telemetry["DRS"].to_numpy()
-
-    # Recompute time bounds from the (possibly modified) telemetry times
+    max_speed = float(telemetry["speed"].max())
+    min_speed = float(telemetry["speed"].min())
+
+    # Build arrays from the merged lap telemetry
+    t_arr = telemetry["t"] - fastest_lap["start"]  # lap time, like Telemetry["Time"]
+    x_arr = telemetry["x"]
+    y_arr = telemetry["y"]
+    dist_arr = telemetry["dist"]
+    rel_dist_arr = telemetry["rel_dist"]
+    speed_arr = telemetry["speed"]
+    gear_arr = telemetry["gear"]
+    throttle_arr = telemetry["throttle"]
+    brake_arr = telemetry["brake"]
+    drs_arr = telemetry["drs"]
+
+    # Time bounds of the lap telemetry
     global_t_min = float(t_arr.min())
     global_t_max = float(t_arr.max())
 
@@ -547,34 +903,24 @@ def get_driver_quali_telemetry(session, driver_code: str, quali_segment: str):
     t_sorted_unique, unique_idx = np.unique(t_sorted, return_index=True)
     idx_map = order[unique_idx]
 
-    x_sorted = x_arr[idx_map]
-    y_sorted = y_arr[idx_map]
-    dist_sorted = dist_arr[idx_map]
-    rel_dist_sorted = rel_dist_arr[idx_map]
-    speed_sorted = speed_arr[idx_map]
-    gear_sorted = gear_arr[idx_map]
-    throttle_sorted = throttle_arr[idx_map]
-    brake_sorted = brake_arr[idx_map]
-    drs_sorted = drs_arr[idx_map]
+    resampler = Resampler(t_sorted_unique, timeline)
 
     # Continuous interpolation
-    x_resampled = np.interp(timeline, t_sorted_unique, x_sorted)
-    y_resampled = np.interp(timeline, t_sorted_unique, y_sorted)
-    dist_resampled = np.interp(timeline, t_sorted_unique, dist_sorted)
-    rel_dist_resampled = np.interp(timeline, t_sorted_unique, rel_dist_sorted)
-    speed_resampled = np.round(np.interp(timeline, t_sorted_unique, speed_sorted), 1)
-    throttle_resampled = np.round(np.interp(timeline, t_sorted_unique, throttle_sorted), 1)
-    brake_resampled = np.round(np.interp(timeline, t_sorted_unique, brake_sorted), 1)
-    drs_resampled = np.interp(timeline, t_sorted_unique, drs_sorted)
+    x_resampled, y_resampled, dist_resampled, rel_dist_resampled, speed_resampled, \
+    throttle_resampled, brake_resampled = resampler.linear(np.vstack([
+        arr[idx_map] for arr in (x_arr, y_arr, dist_arr, rel_dist_arr, speed_arr, throttle_arr, brake_arr)
+    ]))
+    speed_resampled = np.round(speed_resampled, 1)
+    throttle_resampled = np.round(throttle_resampled, 1)
+    brake_resampled = np.round(brake_resampled, 1)
 
     # Make sure that braking is between 0 and 100 so that it matches the throttle scale
 
     brake_resampled = brake_resampled * 100.0
 
-    # Forward-fill / step sampling for discrete fields (gear)
-    idxs = np.searchsorted(t_sorted_unique, timeline, side='right') - 1
-    idxs = np.clip(idxs, 0, len(t_sorted_unique) - 1)
-    gear_resampled = gear_sorted[idxs].astype(int)
+    # Forward-fill / step sampling for discrete fields (gear, DRS)
+    gear_resampled, drs_resampled = resampler.step(np.vstack([gear_arr[idx_map], drs_arr[idx_map]]))
+    gear_resampled = gear_resampled.astype(int)
 
     resampled_data = {
         "t": timeline,
@@ -589,13 +935,9 @@ def get_driver_quali_telemetry(session, driver_code: str, quali_segment: str):
         "drs": drs_resampled,
     }
 
-    track_status = session.track_status
-
     formatted_track_statuses = []
 
-    for status in track_status.to_dict('records'):
-        seconds = timedelta.total_seconds(status['Time'])
-
+    for seconds, status in session_inputs["track_status"]:
         start_time = seconds - global_t_min # Shift to match timeline
         end_time = None
 
@@ -604,110 +946,27 @@ def get_driver_quali_telemetry(session, driver_code: str, quali_segment: str):
             formatted_track_statuses[-1]['end_time'] = start_time
 
         formatted_track_statuses.append({
-            'status': status['Status'],
+            'status': status,
             'start_time': start_time,
             'end_time': end_time, 
         })
 
-    # 4.1. Resample weather data onto the same timeline for playback
-    weather_resampled = None
-    weather_df = getattr(session, "weather_data", None)
-    if weather_df is not None and not weather_df.empty:
-        try:
-            weather_times = weather_df["Time"].dt.total_seconds().to_numpy() - global_t_min
-            if len(weather_times) > 0:
-                order_w = np.argsort(weather_times)
-                weather_times = weather_times[order_w]
-
-                def _maybe_get(name):
-                    return weather_df[name].to_numpy()[order_w] if name in weather_df else None
-
-                def _resample(series):
-                    if series is None:
-                        return None
-                    return np.interp(timeline, weather_times, series)
-
-                track_temp = _resample(_maybe_get("TrackTemp"))
-                air_temp = _resample(_maybe_get("AirTemp"))
-                humidity = _resample(_maybe_get("Humidity"))
-                wind_speed = _resample(_maybe_get("WindSpeed"))
-                wind_direction = _resample(_maybe_get("WindDirection"))
-                rainfall_raw = _maybe_get("Rainfall")
-                rainfall = _resample(rainfall_raw.astype(float)) if rainfall_raw is not None else None
-
-                weather_resampled = {
-                    "track_temp": track_temp,
-                    "air_temp": air_temp,
-                    "humidity": humidity,
-                    "wind_speed": wind_speed,
-                    "wind_direction": wind_direction,
-                    "rainfall": rainfall,
-                }
-        except Exception as e:
-            print(f"Weather data could not be processed: {e}")
-
-    # Build the frames
-    frames = []
-    num_frames = len(timeline)
-
-    for i in range(num_frames):
-        t = timeline[i]
-
-        weather_snapshot = {}
-        if weather_resampled:
-            try:
-                wt = weather_resampled
-                rain_val = wt["rainfall"][i] if wt.get("rainfall") is not None else 0.0
-                weather_snapshot = {
-                    "track_temp": float(wt["track_temp"][i]) if wt.get("track_temp") is not None else None,
-                    "air_temp": float(wt["air_temp"][i]) if wt.get("air_temp") is not None else None,
-                    "humidity": float(wt["humidity"][i]) if wt.get("humidity") is not None else None,
-                    "wind_speed": float(wt["wind_speed"][i]) if wt.get("wind_speed") is not None else None,
-                    "wind_direction": float(wt["wind_direction"][i]) if wt.get("wind_direction") is not None else None,
-                    "rain_state": "RAINING" if rain_val and rain_val >= 0.5 else "DRY",
-                }
-            except Exception as e:
-                print(f"Failed to attach weather data to frame {i}: {e}")
-
-        # Check if drs has changed from the previous frame
-
-        if i > 0:
-            drs_prev = resampled_data["drs"][i - 1]
-            drs_curr = resampled_data["drs"][i]
-
-            if (drs_curr >= 10) and (drs_prev < 10):
-                # DRS activated
-                lap_drs_zones.append({
-                    "zone_start": float(resampled_data["dist"][i]),
-                    "zone_end": None,
-                })
-            elif (drs_curr < 10) and (drs_prev >= 10):
-                # DRS deactivated
-                if lap_drs_zones and lap_drs_zones[-1]["zone_end"] is None:
-                    lap_drs_zones[-1]["zone_end"] = float(resampled_data["dist"][i])
-
-        frame_payload = {
-            "t": round(t, 3),
-            "telemetry": {
-                "x": float(resampled_data["x"][i]),
-                "y": float(resampled_data["y"][i]),
-                "dist": float(resampled_data["dist"][i]),
-                "rel_dist": float(resampled_data["rel_dist"][i]),
-                "speed": float(resampled_data["speed"][i]),
-                "gear": int(resampled_data["gear"][i]),
-                "throttle": float(resampled_data["throttle"][i]),
-                "brake": float(resampled_data["brake"][i]),
-                "drs": int(resampled_data["drs"][i]),
-            }
-        }
-        if weather_snapshot:
-            frame_payload["weather"] = weather_snapshot
+    # 4.1. Weather during the lap at its native rate, timed like the lap frames
+    weather = WeatherSeries.from_session_weather(
+        session_inputs["weather"], t_offset=fastest_lap["start"] + global_t_min
+    )
+
+    # DRS zones: where DRS opens and closes along the lap (one edge-detection pass)
+    lap_drs_zones = detect_drs_zones(resampled_data["drs"], resampled_data["dist"])
 
-        frames.append(frame_payload)
+    # The lap is kept as columnar arrays (indexing it still yields the per-sample frame dicts)
+    channels = {"t": np.round(timeline, 3)}
+    for name in QUALI_LAP_CHANNELS[1:]:
+        channels[name] = np.asarray(resampled_data[name], dtype=float)
 
     # Set the time of the final frame to the exact lap time
-            
-    frames[-1]["t"] = round(parse_time_string(str(fastest_lap["LapTime"])), 3)
+    channels["t"][-1] = round(parse_time_string(fastest_lap["lap_time"]), 3)
+    frames = LapFrames(channels, weather=weather)
 
     return {
         "frames": frames,
@@ -720,7 +979,7 @@ def get_driver_quali_telemetry(session, driver_code: str, quali_segment: str):
 
 def _process_quali_driver(args):
     """Process qualifying telemetry data for a single driver - must be top-level for multiprocessing"""
-    session, driver_code = args
+    driver_code, inputs, session_inputs = args
 
     print(f"Getting qualifying telemetry for driver: {driver_code}")
 
@@ -729,9 +988,9 @@ def _process_quali_driver(args):
     max_speed = 0.0
     min_speed = 0.0
 
-    for segment in ["Q1", "Q2", "Q3"]:
+    for segment in QUALI_SEGMENTS:
         try:
-            segment_telemetry = get_driver_quali_telemetry(session, driver_code, segment)
+            segment_telemetry = _build_quali_lap_telemetry(inputs, segment, session_inputs)
             driver_telemetry_data[segment] = segment_telemetry
 
             # Update global max/min speed
@@ -769,19 +1028,10 @@ def get_quali_telemetry(session, session_type='Q'):
     #   }
     # }
 
-    event_name = str(session).replace(' ', '_')
-    cache_suffix = 'sprintquali' if session_type == 'SQ' else 'quali'
-
     # Check if this data has already been computed
-    try:
-        if "--refresh-data" not in sys.argv:
-            with open(f"computed_data/{event_name}_{cache_suffix}_telemetry.pkl", "rb") as f:
-                data = pickle.load(f)
-                print(f"Loaded precomputed {cache_suffix} telemetry data.")
-                print("The replay should begin in a new window shortly!")
-                return data
-    except FileNotFoundError:
-        pass  # Need to compute from scratch
+    cached = _load_cached_telemetry(session, session_type, load_quali_telemetry)
+    if cached is not None:
+        return cached
 
     qualifying_results = get_qualifying_results(session)
 
@@ -797,7 +1047,16 @@ def get_quali_telemetry(session, session_type='Q'):
 
     telemetry_data = {}
 
-    driver_args = [(session, driver_codes[driver_no]) for driver_no in session.drivers]
+    # Split the session and pick every fastest lap once here, so each worker
+    # only receives the samples around its own driver's fastest laps
+    fastest_laps = _quali_fastest_laps(session)
+    session_inputs = _quali_session_inputs(session)
+    driver_args = [
+        (driver_codes[driver_no],
+         _driver_quali_inputs(session, driver_no, fastest_laps.get(driver_codes[driver_no], {})),
+         session_inputs)
+        for driver_no in session.drivers
+    ]
 
     print(f"Processing {len(session.drivers)} drivers in parallel...")
     
@@ -816,23 +1075,15 @@ def get_quali_telemetry(session, session_type='Q'):
 
     # Save to the compute_data directory
 
-    if not os.path.exists("computed_data"):
-        os.makedirs("computed_data")
-
-    with open(f"computed_data/{event_name}_{cache_suffix}_telemetry.pkl", "wb") as f:
-        pickle.dump({
-            "results": qualifying_results,
-            "telemetry": telemetry_data,
-            "max_speed": max_speed,
-            "min_speed": min_speed,
-        }, f, protocol=pickle.HIGHEST_PROTOCOL)
-
-    return {
+    data = {
         "results": qualifying_results,
         "telemetry": telemetry_data,
         "max_speed": max_speed,
         "min_speed": min_speed,
     }
+    save_quali_telemetry(_session_cache_path(session, session_type), data)
+
+    return data
 
 
 def list_rounds(year):
@@ -0,0 +1,616 @@
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+from src.lib.weather import WEATHER_CHANNELS, WeatherSeries
+
+# Per-driver channels held by the store. Each one is a [n_frames, n_drivers] array.
+DRIVER_CHANNELS = (
+    "x", "y", "dist", "rel_dist", "lap", "tyre",
+    "speed", "gear", "drs", "throttle", "brake", "position",
+)
+
+# Channels that are exposed to the UI as ints / floats (mirrors the old frame dicts)
+INT_CHANNELS = ("lap", "gear", "drs", "position")
+
+# Discrete channels that only change a few times per driver; stored as StepChannels
+STEP_CHANNELS = ("lap", "tyre", "gear", "drs")
+
+# Channels of a qualifying lap (LapFrames); gear and DRS are exposed as ints
+QUALI_LAP_CHANNELS = ("t", "x", "y", "dist", "rel_dist", "speed", "gear", "throttle", "brake", "drs")
+QUALI_INT_CHANNELS = ("gear", "drs")
+
+# Compact storage schema: channel -> (stored dtype, scale). Values are stored as
+# round(value / scale) in the given dtype and decoded as stored * scale when read.
+CHANNEL_SCHEMA = {
+    "x": (np.int32, 1.0),          # FastF1 position units (1/10 m)
+    "y": (np.int32, 1.0),
+    "dist": (np.int32, 0.1),       # metres, kept to 1 dm
+    "progress_m": (np.int32, 0.1), # metres along the race (laps × reference lap + projection)
+    "rel_dist": (np.uint16, 1e-4),
+    "speed": (np.uint16, 0.1),     # km/h
+    "throttle": (np.uint8, 1.0),   # %
+    "brake": (np.uint8, 0.01),     # 0-1
+    "position": (np.int8, 1),
+    "lap": (np.int16, 1),
+    "tyre": (np.int8, 1),
+    "gear": (np.int8, 1),
+    "drs": (np.int8, 1),
+}
+
+
+def encode_channel(name, values):
+    """Quantise a float channel to its CHANNEL_SCHEMA dtype (clipped to the dtype's range)."""
+    dtype, scale = CHANNEL_SCHEMA[name]
+    info = np.iinfo(dtype)
+    scaled = np.rint(np.nan_to_num(np.asarray(values, dtype=float)) / scale)
+    return np.clip(scaled, info.min, info.max).astype(dtype)
+
+
+def encode_channels(channels):
+    """
+    Encode a dict of channels with CHANNEL_SCHEMA. Returns (channels, scales),
+    where `scales` lists the scale of every encoded dense channel for FrameStore.
+    """
+    encoded = {}
+    scales = {}
+    for name, channel in channels.items():
+        if name not in CHANNEL_SCHEMA:
+            encoded[name] = channel
+        elif isinstance(channel, StepChannel):
+            encoded[name] = channel.astype(CHANNEL_SCHEMA[name][0])
+        else:
+            encoded[name] = encode_channel(name, channel)
+            scales[name] = CHANNEL_SCHEMA[name][1]
+    return encoded, scales
+
+
+
+def rank_drivers(progress):
+    """
+    Rank every driver in every frame at once.
+
+    `progress` is a [n_frames, n_drivers] array where larger means further ahead
+    (e.g. race distance). Returns `(order, position)`: `order[i]` lists driver
+    columns from P1 down, `position[i, j]` is the 1-based position of column j.
+    Ties keep driver-column order (stable sort) and NaN always ranks last.
+    """
+    keyed = np.where(np.isnan(progress), -np.inf, progress)
+    order = np.argsort(-keyed, axis=1, kind="stable").astype(np.int32)
+
+    position = np.empty(order.shape, dtype=np.int32)
+    rows = np.arange(order.shape[0])[:, None]
+    position[rows, order] = np.arange(1, order.shape[1] + 1, dtype=np.int32)
+    return order, position
+
+
+class StepChannel:
+    """
+    A discrete per-driver channel stored as change points.
+
+    Instead of a dense [n_frames, n_drivers] array, each driver column keeps
+    the frame indices where its value changes (`starts`, always beginning at
+    frame 0) and the value from that frame on (`values`). The columns are
+    packed back to back; `offsets[col]:offsets[col + 1]` selects a column.
+    Looking up a frame is a binary search, and indexing mirrors the dense
+    arrays: `channel[i]` is a row, `channel[i, col]` a single value.
+    """
+
+    def __init__(self, starts, values, offsets, n_frames):
+        self.starts = starts
+        self.values = values
+        self.offsets = offsets
+        self.n_frames = int(n_frames)
+
+        # One sorted key per change point (column-major), so a whole row is a single searchsorted
+        n_cols = len(offsets) - 1
+        self._col_base = np.arange(n_cols, dtype=np.int64) * self.n_frames
+        self._keys = np.repeat(self._col_base, np.diff(offsets)) + np.asarray(starts, dtype=np.int64)
+
+    @classmethod
+    def from_columns(cls, columns, dtype=np.int32):
+        """Build from one dense 1-D array per driver column (all the same length)."""
+        columns = [np.asarray(column) for column in columns]
+        n_frames = len(columns[0]) if columns else 0
+
+        starts, values, lengths = [], [], []
+        for column in columns:
+            change = np.flatnonzero(column[1:] != column[:-1]) + 1
+            column_starts = np.concatenate(([0], change)) if n_frames else change
+            starts.append(column_starts)
+            values.append(column[column_starts])
+            lengths.append(len(column_starts))
+
+        offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        return cls(
+            np.concatenate(starts).astype(np.int32) if starts else np.empty(0, dtype=np.int32),
+            np.concatenate(values).astype(dtype) if values else np.empty(0, dtype=dtype),
+            offsets,
+            n_frames,
+        )
+
+    @classmethod
+    def from_dense(cls, dense, dtype=np.int32):
+        return cls.from_columns(np.asarray(dense).T, dtype=dtype)
+
+    @property
+    def shape(self):
+        return (self.n_frames, len(self.offsets) - 1)
+
+    def astype(self, dtype):
+        return StepChannel(self.starts, np.asarray(self.values).astype(dtype), self.offsets, self.n_frames)
+
+    def __len__(self):
+        return self.n_frames
+
+    def row(self, index):
+        """Values of every column at a frame."""
+        pos = np.searchsorted(self._keys, self._col_base + index, side="right") - 1
+        return self.values[pos]
+
+    def at(self, index, col):
+        pos = np.searchsorted(self._keys, self._col_base[col] + index, side="right") - 1
+        return self.values[pos]
+
+    def take(self, indices, cols):
+        """Values at paired (frame, column) arrays, in one search."""
+        keys = self._col_base[np.asarray(cols)] + np.asarray(indices, dtype=np.int64)
+        pos = np.searchsorted(self._keys, keys, side="right") - 1
+        return self.values[pos]
+
+    def column(self, col):
+        """(starts, values) change points of one column."""
+        lo, hi = self.offsets[col], self.offsets[col + 1]
+        return self.starts[lo:hi], self.values[lo:hi]
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            index, col = key
+            return self.at(index, col)
+        return self.row(key)
+
+    def slice(self, start, stop):
+        """The frames [start, stop) as a new StepChannel, with starts rebased to the window."""
+        start = max(0, int(start))
+        stop = min(self.n_frames, int(stop))
+        n_cols = len(self.offsets) - 1
+
+        # Every column opens with its value at `start`, then keeps the changes inside the window
+        starts = np.asarray(self.starts)
+        col_ids = np.repeat(np.arange(n_cols), np.diff(self.offsets))
+        keep = (starts > start) & (starts < stop)
+        new_cols = np.concatenate((np.arange(n_cols), col_ids[keep]))
+        new_starts = np.concatenate((np.zeros(n_cols, dtype=np.int64), starts[keep] - start))
+        new_values = np.concatenate((self.row(start), np.asarray(self.values)[keep]))
+
+        sort = np.lexsort((new_starts, new_cols))
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(new_cols, minlength=n_cols)))).astype(np.int64)
+        return StepChannel(
+            new_starts[sort].astype(np.int32), new_values[sort], offsets, max(0, stop - start)
+        )
+
+    def dense(self):
+        """Expand back to a [n_frames, n_columns] array."""
+        out = np.empty(self.shape, dtype=self.values.dtype)
+        for col in range(self.shape[1]):
+            lo, hi = self.offsets[col], self.offsets[col + 1]
+            bounds = np.append(self.starts[lo:hi], self.n_frames)
+            out[:, col] = np.repeat(self.values[lo:hi], np.diff(bounds))
+        return out
+
+
+class FrameStore:
+    """
+    Columnar store for race telemetry.
+
+    Every driver channel is a 2-D NumPy array shaped [n_frames, n_drivers] with
+    the columns ordered like `driver_codes`, except the discrete STEP_CHANNELS
+    which are StepChannels indexed the same way. Channels listed in `scales`
+    hold the compact CHANNEL_SCHEMA encoding; `row()` and the views decode
+    them back to real units. `order` is the matching running
+    order (driver columns from P1 down per frame). Indexing the store (`store[i]`)
+    returns a lightweight FrameView that reads from those arrays on demand, so
+    code written against the old list-of-dicts frames keeps working.
+    """
+
+    def __init__(self, timeline, driver_codes, channels, fps, weather=None, order=None, scales=None):
+        self.timeline = np.asarray(timeline)
+        self.driver_codes = list(driver_codes)
+        self.channels = channels
+        # Scale factors of channels held in their compact (CHANNEL_SCHEMA) encoding
+        self.scales = scales or {}
+        if order is None:
+            order = np.argsort(channels["position"], axis=1, kind="stable").astype(np.int8)
+        self.order = order
+        self.fps = fps
+        # WeatherSeries at its native rate, looked up by timeline time (or None if unavailable)
+        self.weather = weather
+        self._driver_index = {code: i for i, code in enumerate(self.driver_codes)}
+
+    def __len__(self):
+        return len(self.timeline)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("frame index out of range")
+        return FrameView(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield FrameView(self, i)
+
+    @property
+    def n_frames(self):
+        return len(self.timeline)
+
+    @property
+    def n_drivers(self):
+        return len(self.driver_codes)
+
+    @property
+    def ready_frames(self):
+        """Frames that hold data: all of them, unless a progressive build is still running."""
+        return len(self.timeline)
+
+    def build_error(self):
+        """Why the frames stopped being built, if they did (never, for a finished store)."""
+        return None
+
+    def close(self):
+        """Release anything the store holds on to (nothing for an in-memory or mmapped store)."""
+
+    def driver_index(self, code):
+        return self._driver_index.get(code)
+
+    def decode(self, name, values):
+        """Turn stored values of a channel back into real units."""
+        scale = self.scales.get(name)
+        if scale is None or name in INT_CHANNELS:
+            return values
+        return values * scale
+
+    def row(self, name, index):
+        """All drivers' values of one channel at a frame, ordered like driver_codes."""
+        return self.decode(name, self.channels[name][index])
+
+    def row_at(self, name, position):
+        """
+        Channel values at a fractional frame position, linearly interpolated
+        between the two neighbouring stored frames. Lets the renderer move cars
+        smoothly when the store is sampled at a lower rate than the display.
+        """
+        last = len(self) - 1
+        position = min(max(float(position), 0.0), float(last))
+        index = int(position)
+        frac = position - index
+        current = self.row(name, index)
+        if frac == 0.0 or index >= last:
+            return current
+        following = self.row(name, index + 1)
+        return current + (following - current) * frac
+
+    def time_at(self, position):
+        """Session time (relative to the start of the timeline) at a fractional frame position."""
+        last = len(self) - 1
+        position = min(max(float(position), 0.0), float(last))
+        index = int(position)
+        if index >= last:
+            return float(self.timeline[last])
+        t0 = float(self.timeline[index])
+        return t0 + (float(self.timeline[index + 1]) - t0) * (position - index)
+
+    def leader_index(self, index):
+        return int(self.order[index, 0])
+
+    def running_order(self, index):
+        """Driver codes at a frame, from P1 down."""
+        return [self.driver_codes[col] for col in self.order[index]]
+
+    def leader_lap(self, index):
+        return int(self.channels["lap"][index, self.leader_index(index)])
+
+    def weather_at(self, index):
+        if not self.weather:
+            return None
+        return self.weather.at(float(self.timeline[index]))
+
+    def slice(self, start, stop, copy=False):
+        """
+        A store holding only frames [start, stop). Dense channels are views into
+        this store's arrays (so a memory-mapped cache only reads the window's
+        pages), or in-memory copies with `copy=True`. Timeline times are kept,
+        so track statuses and weather still line up.
+        """
+        window = slice(max(0, int(start)), min(len(self), int(stop)))
+        take = np.array if copy else (lambda array: array)
+        channels = {
+            name: channel.slice(window.start, window.stop) if isinstance(channel, StepChannel) else take(channel[window])
+            for name, channel in self.channels.items()
+        }
+        return FrameStore(
+            take(self.timeline[window]), self.driver_codes, channels, self.fps,
+            weather=self.weather, order=take(self.order[window]), scales=self.scales,
+        )
+
+    @classmethod
+    def from_frame_dicts(cls, frames, fps):
+        """Build a store from the legacy list-of-dicts frames (old pickle caches)."""
+        if not frames:
+            raise ValueError("Cannot build a FrameStore from an empty frame list")
+
+        driver_codes = list(frames[0]["drivers"].keys())
+        timeline = np.array([f["t"] for f in frames], dtype=float)
+
+        channels = {}
+        for name in DRIVER_CHANNELS:
+            dtype = np.int32 if name in INT_CHANNELS else float
+            channels[name] = np.array(
+                [[f["drivers"].get(code, {}).get(name, 0) for code in driver_codes] for f in frames],
+                dtype=dtype,
+            )
+        for name in STEP_CHANNELS:
+            # Old caches interpolated these, so round off any in-between values first
+            channels[name] = StepChannel.from_dense(np.rint(channels[name]), dtype=CHANNEL_SCHEMA[name][0])
+        channels, scales = encode_channels(channels)
+
+        weather = None
+        if any("weather" in f for f in frames):
+            weather_channels = {}
+            for name in WEATHER_CHANNELS:
+                if name == "rainfall":
+                    values = [1.0 if f.get("weather", {}).get("rain_state") == "RAINING" else 0.0 for f in frames]
+                else:
+                    values = [f.get("weather", {}).get(name) for f in frames]
+                    if all(v is None for v in values):
+                        continue
+                    values = [np.nan if v is None else v for v in values]
+                weather_channels[name] = values
+            # Keep one sample per second; the series interpolates in between
+            step = max(1, int(round(fps)))
+            weather = WeatherSeries(
+                timeline[::step], {name: np.asarray(v, dtype=float)[::step] for name, v in weather_channels.items()}
+            )
+
+        return cls(timeline, driver_codes, channels, fps, weather=weather, scales=scales)
+
+
+def lap_window(lap_frames, first_lap, last_lap, n_frames):
+    """
+    Frame range [start, stop) covering leader laps first_lap..last_lap, from
+    (lap, first frame) pairs as returned by SeekIndex.lap_frames().
+    """
+    if not len(lap_frames):
+        return 0, n_frames
+    laps, frames = np.asarray(lap_frames, dtype=np.int64).T
+    if last_lap < first_lap:
+        raise ValueError(f"Empty lap range {first_lap}-{last_lap}")
+    if first_lap > laps[-1] or last_lap < laps[0]:
+        raise ValueError(
+            f"Laps {first_lap}-{last_lap} are outside the race (laps {int(laps[0])}-{int(laps[-1])})"
+        )
+
+    first = np.searchsorted(laps, first_lap, side="left")
+    after = np.searchsorted(laps, last_lap, side="right")
+    start = int(frames[first]) if first_lap > laps[0] else 0
+    stop = int(frames[after]) if after < len(laps) else int(n_frames)
+    return start, stop
+
+
+class SeekIndex:
+    """
+    Frame lookups for seeking through a FrameStore.
+
+    Built once from the store: the first frame of every leader lap (from the
+    precomputed running order), the first frame of every lap of each driver
+    (straight from the lap StepChannel's change points), the timeline and the
+    sorted event frames. Every query is a binary search.
+    """
+
+    def __init__(self, timeline, leader_laps, leader_frames, driver_laps, event_frames=()):
+        self.timeline = np.asarray(timeline)
+        self.leader_laps = np.asarray(leader_laps)
+        self.leader_frames = np.asarray(leader_frames)
+        # code -> (lap numbers, first frames), both ascending
+        self.driver_laps = driver_laps
+        self.event_frames = np.unique(np.asarray(event_frames, dtype=np.int64))
+
+    @classmethod
+    def from_store(cls, store, event_frames=()):
+        # Only frames that are ready count (a progressive store fills up over time)
+        n_frames = store.ready_frames
+        lap = store.channels["lap"]
+        if not isinstance(lap, StepChannel):
+            lap = StepChannel.from_dense(lap[:n_frames])
+
+        # Leader's lap in every frame; never let it step back when the lead changes hands
+        leader_laps = lap.take(np.arange(n_frames), store.order[:n_frames, 0].astype(np.int64))
+        leader_laps = np.maximum.accumulate(leader_laps.astype(np.int32))
+        change = np.flatnonzero(np.diff(leader_laps)) + 1
+        leader_frames = np.concatenate(([0], change)).astype(np.int64)
+
+        driver_laps = {}
+        for col, code in enumerate(store.driver_codes):
+            starts, values = lap.column(col)
+            driver_laps[code] = (np.maximum.accumulate(values.astype(np.int32)), starts.astype(np.int64))
+
+        return cls(store.timeline[:n_frames], leader_laps[leader_frames], leader_frames, driver_laps, event_frames)
+
+    @property
+    def n_frames(self):
+        return len(self.timeline)
+
+    def lap_frames(self):
+        """(lap, first frame) of every leader lap, e.g. for progress bar ticks."""
+        return list(zip(self.leader_laps.tolist(), self.leader_frames.tolist()))
+
+    def frame_for_lap(self, lap, driver=None):
+        """First frame in which the leader (or `driver`) is on lap `lap` or later."""
+        laps, frames = self.driver_laps.get(driver) if driver else (self.leader_laps, self.leader_frames)
+        i = int(np.searchsorted(laps, lap, side="left"))
+        if i >= len(frames):
+            return self.n_frames - 1
+        return int(frames[i])
+
+    def lap_at(self, frame, driver=None):
+        """Leader's (or `driver`'s) lap at a frame."""
+        laps, frames = self.driver_laps.get(driver) if driver else (self.leader_laps, self.leader_frames)
+        i = int(np.searchsorted(frames, frame, side="right")) - 1
+        return int(laps[max(i, 0)])
+
+    def frame_at_time(self, t):
+        """First frame at or after timeline time `t` (seconds), clamped to the race."""
+        i = int(np.searchsorted(self.timeline, t, side="left"))
+        return min(max(i, 0), self.n_frames - 1)
+
+    def next_event(self, frame):
+        i = int(np.searchsorted(self.event_frames, frame, side="right"))
+        return int(self.event_frames[i]) if i < len(self.event_frames) else None
+
+    def previous_event(self, frame):
+        i = int(np.searchsorted(self.event_frames, frame, side="left")) - 1
+        return int(self.event_frames[i]) if i >= 0 else None
+
+
+class LapFrames(Sequence):
+    """
+    One qualifying lap as columnar arrays (QUALI_LAP_CHANNELS, each n_frames long).
+
+    The arrays can be supplied directly or by a `loader` that is only called
+    the first time they are needed, so a cache can list every lap without
+    reading any of them. The lap's `weather` (a WeatherSeries or None) works
+    the same way through `weather_loader`. Indexing returns the old per-sample
+    frame dict ({"t": ..., "telemetry": {...}}); drawing code should use `channel()`.
+    """
+
+    def __init__(self, channels=None, n_frames=None, loader=None, weather=None, weather_loader=None):
+        self._channels = channels
+        self._loader = loader
+        self._weather = weather
+        self._weather_loader = weather_loader
+        self.n_frames = len(channels["t"]) if channels is not None else int(n_frames)
+
+    @classmethod
+    def from_frame_dicts(cls, frames):
+        """Build from the legacy list of per-sample frame dicts."""
+        channels = {"t": np.array([f["t"] for f in frames], dtype=float)}
+        for name in QUALI_LAP_CHANNELS[1:]:
+            channels[name] = np.array([f["telemetry"][name] for f in frames], dtype=float)
+        return cls(channels)
+
+    @property
+    def channels(self):
+        if self._channels is None:
+            self._channels = self._loader()
+            self._loader = None
+        return self._channels
+
+    def channel(self, name):
+        return self.channels[name]
+
+    @property
+    def weather(self):
+        if self._weather_loader is not None:
+            self._weather = self._weather_loader()
+            self._weather_loader = None
+        return self._weather
+
+    def __len__(self):
+        return self.n_frames
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("frame index out of range")
+        channels = self.channels
+        return {
+            "t": float(channels["t"][index]),
+            "telemetry": {
+                name: int(channels[name][index]) if name in QUALI_INT_CHANNELS else float(channels[name][index])
+                for name in QUALI_LAP_CHANNELS[1:]
+            },
+        }
+
+
+class FrameView:
+    """Read-only view of a single frame of a FrameStore."""
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __getitem__(self, key):
+        if key == "t":
+            return round(float(self.store.timeline[self.index]), 3)
+        if key == "lap":
+            return self.store.leader_lap(self.index)
+        if key == "drivers":
+            return DriverFrames(self.store, self.index)
+        if key == "weather":
+            weather = self.store.weather_at(self.index)
+            if weather is None:
+                raise KeyError(key)
+            return weather
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        if key == "weather":
+            return bool(self.store.weather)
+        return key in ("t", "lap", "drivers")
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+class DriverFrames(Mapping):
+    """Mapping of driver code -> DriverView for one frame."""
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __getitem__(self, code):
+        col = self.store.driver_index(code)
+        if col is None:
+            raise KeyError(code)
+        return DriverView(self.store, self.index, col)
+
+    def __iter__(self):
+        return iter(self.store.driver_codes)
+
+    def __len__(self):
+        return self.store.n_drivers
+
+
+class DriverView(Mapping):
+    """One driver's values at one frame, read straight from the store's arrays."""
+
+    __slots__ = ("store", "index", "col")
+
+    def __init__(self, store, index, col):
+        self.store = store
+        self.index = index
+        self.col = col
+
+    def __getitem__(self, name):
+        if name not in self.store.channels:
+            raise KeyError(name)
+        value = self.store.decode(name, self.store.channels[name][self.index, self.col])
+        return int(value) if name in INT_CHANNELS else float(value)
+
+    def __iter__(self):
+        return iter(self.store.channels)
+
+    def __len__(self):
+        return len(self.store.channels)
@@ -2,10 +2,13 @@ import arcade
 import threading
 import time
 import numpy as np
-from src.ui_components import build_track_from_example_lap, LapTimeLeaderboardComponent, QualifyingSegmentSelectorComponent
+from src.ui_components import build_track_from_example_lap, LapTimeLeaderboardComponent, QualifyingSegmentSelectorComponent, LegendComponent
 from src.f1_data import get_driver_quali_telemetry
-from src.f1_data import FPS
+from src.f1_data import FPS, QUALI_SEGMENTS
 from src.lib.time import format_time
+from src.renderer import TrackRenderer, CarSprites, GhostMarkers, TextCache
+from src.lib.transform import ScreenTransform
+from src.lap_comparison import GhostLaps, LapComparer
 
 SCREEN_WIDTH = 1920
 SCREEN_HEIGHT = 1080
@@ -58,9 +61,6 @@ class QualifyingReplay(arcade.Window):
 
         # Rotation (degrees) to apply to the whole circuit around its centre
         self.circuit_rotation = circuit_rotation
-        self._rot_rad = float(np.deg2rad(self.circuit_rotation)) if self.circuit_rotation else 0.0
-        self._cos_rot = float(np.cos(self._rot_rad))
-        self._sin_rot = float(np.sin(self._rot_rad))
         self.left_ui_margin = left_ui_margin
         self.right_ui_margin = right_ui_margin
 
@@ -80,9 +80,9 @@ class QualifyingReplay(arcade.Window):
                 example_lap = self.session.laps.pick_drivers(res['code']).pick_fastest()
                 break
 
+        # World-to-screen mapping (identity until update_scaling fits the track)
+        self.transform = ScreenTransform()
         self.world_scale = 1.0
-        self.tx = 0
-        self.ty = 0
 
         (self.plot_x_ref, self.plot_y_ref,
          self.x_inner, self.y_inner,
@@ -91,8 +91,8 @@ class QualifyingReplay(arcade.Window):
          self.y_min, self.y_max) = build_track_from_example_lap(example_lap.get_telemetry())
          
         ref_points = self._interpolate_points(self.plot_x_ref, self.plot_y_ref, interp_points=4000)
-        self._ref_xs = np.array([p[0] for p in ref_points])
-        self._ref_ys = np.array([p[1] for p in ref_points])
+        self._ref_xs = ref_points[:, 0]
+        self._ref_ys = ref_points[:, 1]
 
         # cumulative distances along the reference polyline (metres)
         diffs = np.sqrt(np.diff(self._ref_xs)**2 + np.diff(self._ref_ys)**2)
@@ -105,13 +105,45 @@ class QualifyingReplay(arcade.Window):
         self.world_outer_points = self._interpolate_points(self.x_outer, self.y_outer)
 
         # These will hold the actual screen coordinates to draw
-        self.screen_inner_points = [self.world_to_screen(x, y) for x, y in self.world_inner_points]
-        self.screen_outer_points = [self.world_to_screen(x, y) for x, y in self.world_outer_points]
+        self.screen_inner_points = self.transform.apply_points(*self.world_inner_points.T)
+        self.screen_outer_points = self.transform.apply_points(*self.world_outer_points.T)
 
         # Qualifying segment selector modal
         self.selected_driver = None
         self.qualifying_segment_selector_modal = QualifyingSegmentSelectorComponent()
 
+        # Mini-map outline is GPU geometry rebuilt only when the map area moves;
+        # the driver marker is a sprite created when a driver is loaded
+        self.map_track_renderer = TrackRenderer(line_width=2)
+        self.map_car_sprites = None
+        self.map_transform = ScreenTransform()
+
+        # Retained labels for the chart, map and HUD; the controls legend is pre-rendered
+        self.texts = TextCache()
+        self.legend_comp = LegendComponent(x=max(12, self.left_ui_margin - 320), y=200, extra_lines=[
+            "[C]       Pin Lap To Compare",
+            "[X]       Clear Comparison",
+            "[G]       Ghost Laps (All Drivers)",
+            "[S]       Next Ghost Segment",
+        ])
+
+        # Laps pinned with [C], keyed by (driver, segment), are compared against the
+        # loaded lap on a shared distance grid; comparisons are cached per lap pair
+        self.pinned_laps = {}
+        self.lap_comparer = LapComparer()
+        self.loaded_segment = None
+
+        # Ghost mode ([G]): every fastest lap of a segment played at once on the
+        # main track map. GhostLaps are built once per segment; playback indexes them.
+        self.track_renderer = TrackRenderer(line_width=4)
+        self.ghost_laps = None
+        self.ghost_segment = None
+        self.ghost_markers = None
+        self.ghost_time = 0.0
+        self._ghost_cache = {}
+        self._ghost_marker_cache = {}
+        self._ghost_board_key = None
+
         arcade.set_background_color(arcade.color.BLACK)
 
         self.update_scaling(self.width, self.height)
@@ -121,69 +153,36 @@ class QualifyingReplay(arcade.Window):
         Recalculates the scale and translation to fit the track 
         perfectly within the new screen dimensions while maintaining aspect ratio.
         """
-        padding = 0.05
-        # If a rotation is applied, we must compute the rotated bounds
-        world_cx = (self.x_min + self.x_max) / 2
-        world_cy = (self.y_min + self.y_max) / 2
-
-        def _rotate_about_center(x, y):
-            # Translate to centre, rotate, translate back
-            tx = x - world_cx
-            ty = y - world_cy
-            rx = tx * self._cos_rot - ty * self._sin_rot
-            ry = tx * self._sin_rot + ty * self._cos_rot
-            return rx + world_cx, ry + world_cy
-
-        # Build rotated extents from inner/outer world points
-        rotated_points = []
-        for x, y in self.world_inner_points:
-            rotated_points.append(_rotate_about_center(x, y))
-        for x, y in self.world_outer_points:
-            rotated_points.append(_rotate_about_center(x, y))
-
-        xs = [p[0] for p in rotated_points]
-        ys = [p[1] for p in rotated_points]
-        world_x_min = min(xs) if xs else self.x_min
-        world_x_max = max(xs) if xs else self.x_max
-        world_y_min = min(ys) if ys else self.y_min
-        world_y_max = max(ys) if ys else self.y_max
-
-        world_w = max(1.0, world_x_max - world_x_min)
-        world_h = max(1.0, world_y_max - world_y_min)
-        
-        # Reserve left/right UI margins before applying padding so the track
-        # never overlaps side UI elements (leaderboard, telemetry, legends).
+        # Fit the rotated outlines into the area between the left/right UI margins
+        # so the track never overlaps side UI elements (leaderboard, telemetry, legends).
+        world_points = np.vstack([self.world_inner_points, self.world_outer_points])
         inner_w = max(1.0, screen_w - self.left_ui_margin - self.right_ui_margin)
-        usable_w = inner_w * (1 - 2 * padding)
-        usable_h = screen_h * (1 - 2 * padding)
-
-        # Calculate scale to fit whichever dimension is the limiting factor
-        scale_x = usable_w / world_w
-        scale_y = usable_h / world_h
-        self.world_scale = min(scale_x, scale_y)
-
-        # Center the world in the screen (rotation done about original centre)
-        # world_cx/world_cy are unchanged by rotation about centre
-        # Center within the available inner area (left_ui_margin .. screen_w - right_ui_margin)
-        screen_cx = self.left_ui_margin + inner_w / 2
-        screen_cy = screen_h / 2
-
-        self.tx = screen_cx - self.world_scale * world_cx
-        self.ty = screen_cy - self.world_scale * world_cy
+        self.transform = ScreenTransform.fit(
+            world_points[:, 0], world_points[:, 1],
+            left=self.left_ui_margin, bottom=0, width=inner_w, height=screen_h,
+            rotation=self.circuit_rotation,
+            center=((self.x_min + self.x_max) / 2, (self.y_min + self.y_max) / 2),
+            padding=0.05,
+        )
+        self.world_scale = self.transform.scale
 
         # Update the polyline screen coordinates based on new scale
-        self.screen_inner_points = [self.world_to_screen(x, y) for x, y in self.world_inner_points]
-        self.screen_outer_points = [self.world_to_screen(x, y) for x, y in self.world_outer_points]
+        self.screen_inner_points = self.transform.apply_points(*self.world_inner_points.T)
+        self.screen_outer_points = self.transform.apply_points(*self.world_outer_points.T)
+        self.track_renderer.set_polylines([self.screen_inner_points, self.screen_outer_points])
 
     def on_draw(self):
         self.clear()
 
         # Add disclaimer about experimental charting feature
 
-        arcade.Text("This feature is still in development.", 20, 40, arcade.color.RED, 12, anchor_x="left", anchor_y="top").draw()
+        self.texts.draw("disclaimer", "This feature is still in development.", 20, 40, arcade.color.RED, 12, anchor_x="left", anchor_y="top")
 
+        if self.ghost_laps is not None:
+            self._draw_ghosts()
+            self.legend_comp.draw(self)
         # Draw simple line chart if telemetry is loaded
-        if self.chart_active and self.loaded_telemetry:
+        elif self.chart_active and self.loaded_telemetry:
             frames = self.loaded_telemetry.get("frames") if isinstance(self.loaded_telemetry, dict) else None
             if frames:
                 # right-hand area (to the right of leaderboard)
@@ -207,19 +206,30 @@ class QualifyingReplay(arcade.Window):
                 # - Top 50% of the chart area: Speed
                 # - Next 25%: Gears
                 # - Bottom 25%: Brake + Throttle
+                # With pinned laps the speed chart gives up room for a delta-time chart
+
+                comparisons = self._lap_comparisons()
 
                 M = 30 # margin between charts
                 VP = 5 # vertical padding between charts
-                total_margin = 2 * M
+                total_margin = (3 if comparisons else 2) * M
                 effective_h = max(0, chart_h - total_margin)
 
-                speed_h = int(effective_h * 0.5)
-                gear_h = int(effective_h * 0.25)
-                ctrl_h = effective_h - speed_h - gear_h
+                if comparisons:
+                    speed_h = int(effective_h * 0.4)
+                    delta_h = int(effective_h * 0.2)
+                    gear_h = int(effective_h * 0.15)
+                else:
+                    speed_h = int(effective_h * 0.5)
+                    delta_h = 0
+                    gear_h = int(effective_h * 0.25)
+                ctrl_h = effective_h - speed_h - delta_h - gear_h
 
                 speed_top = chart_top
                 speed_bottom = speed_top - speed_h
-                gear_top = speed_bottom - M
+                delta_top = speed_bottom - M
+                delta_bottom = delta_top - delta_h
+                gear_top = (delta_bottom if comparisons else speed_bottom) - M
                 gear_bottom = gear_top - gear_h
                 ctrl_top = gear_bottom - M
                 ctrl_bottom = ctrl_top - ctrl_h
@@ -240,12 +250,16 @@ class QualifyingReplay(arcade.Window):
                 arcade.draw_rect_filled(speed_bg, (40, 40, 40, 230))
                 arcade.draw_rect_filled(gear_bg, (40, 40, 40, 230))
                 arcade.draw_rect_filled(ctrl_bg, (40, 40, 40, 230))
+                if comparisons:
+                    delta_bg = arcade.XYWH(chart_left + chart_w * 0.5, delta_bottom + delta_h * 0.5, chart_w, delta_h)
+                    arcade.draw_rect_filled(delta_bg, (40, 40, 40, 230))
+                    self.texts.draw("delta_title", f"Delta to {self.loaded_driver_code} {self.loaded_segment} (s)", chart_left + 10, delta_top + 10, arcade.color.ANTI_FLASH_WHITE, 14)
 
                 # Add Subtitles to the charts
 
-                arcade.Text("Speed (km/h)", chart_left + 10, speed_top + 10, arcade.color.ANTI_FLASH_WHITE, 14).draw()
-                arcade.Text("Gear", chart_left + 10, gear_top + 10, arcade.color.ANTI_FLASH_WHITE, 14).draw()
-                arcade.Text("Throttle / Brake (%)", chart_left + 10, ctrl_top + 10, arcade.color.ANTI_FLASH_WHITE, 14).draw()
+                self.texts.draw("speed_title", "Speed (km/h)", chart_left + 10, speed_top + 10, arcade.color.ANTI_FLASH_WHITE, 14)
+                self.texts.draw("gear_title", "Gear", chart_left + 10, gear_top + 10, arcade.color.ANTI_FLASH_WHITE, 14)
+                self.texts.draw("ctrl_title", "Throttle / Brake (%)", chart_left + 10, ctrl_top + 10, arcade.color.ANTI_FLASH_WHITE, 14)
 
                 # DRS key at right of the speed subtitle (green square + label)
                 key_size = 12
@@ -256,25 +270,20 @@ class QualifyingReplay(arcade.Window):
 
                 drs_key_rect = arcade.XYWH(square_x, key_y, key_size, key_size)
                 arcade.draw_rect_filled(drs_key_rect, arcade.color.GREEN)
-                arcade.Text(
+                self.texts.draw(
+                    "drs_key",
                     "DRS active",
                     square_x + (key_size * 0.5) + 6,
                     key_y,
                     arcade.color.ANTI_FLASH_WHITE,
                     12,
                     anchor_y="center"
-                ).draw()
+                )
 
-                # compute global ranges from all frames (use distance for x-axis) - Should be max of 1.0 rel_dist, but just in case
-
-                all_dists = [ self._pick_telemetry_value(f.get("telemetry", {}), "rel_dist") for f in frames ]
-                
-                # filter out None
-                all_dists = [d for d in all_dists if d is not None]
-                if not all_dists:
-                    return
-
-                full_d_min, full_d_max = min(all_dists), max(all_dists)
+                # compute global ranges from the lap's arrays (use distance for x-axis) - Should be max of 1.0 rel_dist, but just in case
+                rel_dists = frames.channel("rel_dist")
+                abs_dists = frames.channel("dist")
+                full_d_min, full_d_max = float(rel_dists.min()), float(rel_dists.max())
                 full_s_min, full_s_max = self.min_speed, self.max_speed
 
                 # avoid zero-range
@@ -283,56 +292,31 @@ class QualifyingReplay(arcade.Window):
                 if full_s_max == full_s_min:
                     full_s_max = full_s_min + 1.0
 
-                # Prepare arrays for drawing up to current frame index (animate)
+                # Everything up to the current frame is drawn (animate)
                 self.frame_index = max(0, min(self.frame_index, len(frames) - 1))
-                draw_pos = []         # along-track distance used as x-axis
-                draw_speeds = []
-                draw_throttle = []
-                draw_brake = []
-                draw_gears = []
-                
+                shown = slice(0, self.frame_index + 1)
+
                 # The speed chart background will have sections of it shaded green to indicate where DRS was active
 
                 # find the drs zones for this lap that the driver has already passed.
                 # If they have partially passed a zone, shade up to their current distance only.
+                current_dist = float(abs_dists[self.frame_index])
+                full_abs_d_min, full_abs_d_max = float(abs_dists.min()), float(abs_dists.max())
 
-                drs_zones_to_show = []
-
-                current_frame = frames[self.frame_index]
-                current_tel = current_frame.get("telemetry", {}) if isinstance(current_frame.get("telemetry", {}), dict) else {}
-                current_dist = self._pick_telemetry_value(current_tel, "dist")
-                
                 for dz in self.drs_zones:
                     zone_start = dz.get("zone_start")
                     zone_end = dz.get("zone_end")
-                    if zone_start is None or zone_end is None:
+                    if zone_start is None or zone_end is None or full_abs_d_max == full_abs_d_min:
                         continue
-                    if current_dist >= zone_start:
-                        # driver has passed at least the start of this zone
-                        shade_end = min(zone_end, current_dist)
-                        drs_zones_to_show.append({
-                            "zone_start": zone_start,
-                            "zone_end": shade_end
-                        })
-
-                for dz in drs_zones_to_show:
                     # Convert to float to handle string values
                     try:
-                        zone_start = float(dz['zone_start'])
-                        shade_end = float(dz['zone_end'])
+                        zone_start = float(zone_start)
+                        shade_end = min(float(zone_end), current_dist)
                     except (ValueError, TypeError):
                         continue  # Skip invalid zones
-                    
-                    # Get the full distance range from all frames
-                    all_abs_dists = [self._pick_telemetry_value(f.get("telemetry", {}), "dist") for f in frames]
-                    all_abs_dists = [d for d in all_abs_dists if d is not None]
-                    if not all_abs_dists:
+                    if current_dist < zone_start:
                         continue
-                    
-                    full_abs_d_min, full_abs_d_max = min(all_abs_dists), max(all_abs_dists)
-                    if full_abs_d_max == full_abs_d_min:
-                        continue
-                    
+
                     # map to screen coords using absolute distances
                     nx1 = (zone_start - full_abs_d_min) / (full_abs_d_max - full_abs_d_min)
                     nx2 = (shade_end - full_abs_d_min) / (full_abs_d_max - full_abs_d_min)
@@ -341,109 +325,62 @@ class QualifyingReplay(arcade.Window):
                     drs_rect = arcade.XYWH((x1pix + x2pix) * 0.5, speed_bottom + speed_h * 0.5, x2pix - x1pix, speed_h)
                     arcade.draw_rect_filled(drs_rect, (0, 100, 0, 100)) # semi-transparent green
 
-                # Collect values frame-by-frame (safe for mixed datasets)
-                for f in frames[: self.frame_index + 1]:
-                    tel = f.get("telemetry", {}) if isinstance(f.get("telemetry", {}), dict) else {}
-                    d = self._pick_telemetry_value(tel, "rel_dist")
-                    s = self._pick_telemetry_value(tel, "speed")
-                    if d is None or s is None:
-                        continue
-                    # throttle
-                    th = self._pick_telemetry_value(tel, "throttle")
-                    # brake
-                    br = self._pick_telemetry_value(tel, "brake")
-                    # gear
-                    gr = self._pick_telemetry_value(tel, "gear")
-
-                    draw_pos.append(float(d))
-                    draw_speeds.append(float(s))
-                    draw_throttle.append(float(th) if th is not None else None)
-                    if isinstance(br, (bool, int)):
-                        draw_brake.append(1.0 if br else 0.0)
-                    else:
-                        draw_brake.append(float(br) if br is not None else None)
-                    draw_gears.append(int(gr) if gr is not None else None)
-
-                # Draw speed in the top sub-area (x-axis = distance)
-                if draw_pos and draw_speeds:
-                    pts = []
-                    for d, s in zip(draw_pos, draw_speeds):
-                        nx = (d - full_d_min) / (full_d_max - full_d_min)
-                        ny = (s - full_s_min) / (full_s_max - full_s_min)
-                        xpix = chart_left + nx * chart_w
-                        ypix = speed_bottom + VP + ny * (speed_h - 2 * VP)
-                        pts.append((xpix, ypix))
-                    try:
-                        arcade.draw_line_strip(pts, arcade.color.ANTI_FLASH_WHITE, 2)
-                        # Show current speed in km/h
-                        current_speed = draw_speeds[-1] if draw_speeds else 0
-                        arcade.Text(f"{current_speed:.0f} km/h", pts[-1][0] + 10, pts[-1][1] + 5, arcade.color.ANTI_FLASH_WHITE, 12).draw()
-                    except Exception as e:
-                        print("Chart draw error (speed):", e)
+                # x pixel of every shown sample (x-axis = distance)
+                xpix = chart_left + (rel_dists[shown] - full_d_min) / (full_d_max - full_d_min) * chart_w
 
+                def chart_points(values, lo, hi, bottom, height):
+                    ypix = bottom + VP + (values - lo) / (hi - lo) * (height - 2 * VP)
+                    return np.column_stack([xpix, ypix]).tolist()
 
-                gear_pts = []
-                for d, g in zip(draw_pos, draw_gears):
-                    if g is None:
-                        continue
-                    nx = (d - full_d_min) / (full_d_max - full_d_min)
-                    xpix = chart_left + nx * chart_w
-                    # map gear to vertical within gear box (higher gears near top of gear area)
-                    gy = (g - self.g_min) / (self.g_max - self.g_min)
-                    ypix = gear_bottom + VP + gy * (gear_h - 2 * VP)
-                    gear_pts.append((xpix, ypix))
+                draw_speeds = frames.channel("speed")[shown]
+                draw_gears = frames.channel("gear")[shown]
+
+                # Pinned laps: their speed traces under the loaded lap's, and the delta-time lines
+                if comparisons:
+                    self._draw_comparisons(
+                        comparisons, current_dist, full_abs_d_max, full_d_min, full_d_max,
+                        full_s_min, full_s_max, chart_left, chart_w, VP,
+                        speed_bottom, speed_h, delta_bottom, delta_h,
+                    )
 
+                # Draw speed in the top sub-area
+                pts = chart_points(draw_speeds, full_s_min, full_s_max, speed_bottom, speed_h)
                 try:
-                    if gear_pts:
-                        arcade.draw_line_strip(gear_pts, arcade.color.LIGHT_GRAY, 2)
-                        
-                        # Show current gear next to the line
-
-                        current_gear = draw_gears[-1] if draw_gears else 0
-                        arcade.Text(f"Gear: {int(current_gear)}", gear_pts[-1][0] + 10, gear_pts[-1][1] + 5, arcade.color.LIGHT_GRAY, 12).draw()
-                        
+                    arcade.draw_line_strip(pts, arcade.color.ANTI_FLASH_WHITE, 2)
+                    # Show current speed in km/h
+                    current_speed = draw_speeds[-1]
+                    self.texts.draw("speed_value", f"{current_speed:.0f} km/h", pts[-1][0] + 10, pts[-1][1] + 5, arcade.color.ANTI_FLASH_WHITE, 12)
                 except Exception as e:
-                    print("Chart draw error (gear):", e)
+                    print("Chart draw error (speed):", e)
 
+                # map gear to vertical within gear box (higher gears near top of gear area)
+                gear_pts = chart_points(draw_gears.astype(int), self.g_min, self.g_max, gear_bottom, gear_h)
+                try:
+                    arcade.draw_line_strip(gear_pts, arcade.color.LIGHT_GRAY, 2)
 
-                th_min = self.th_min
-                th_max = self.th_max
-
-                br_min = self.br_min
-                br_max = self.br_max
-
-                throttle_pts = []
-                brake_pts = []
-                for d, th, br in zip(draw_pos, draw_throttle, draw_brake):
-                    nx = (d - full_d_min) / (full_d_max - full_d_min)
-                    xpix = chart_left + nx * chart_w
-                    if th is not None:
-                        ny = (th - th_min) / (th_max - th_min)
-                        ypix = ctrl_bottom + VP + ny * (ctrl_h - 2 * VP)
-                        throttle_pts.append((xpix, ypix))
-                    if br is not None:
-                        ny = (br - br_min) / (br_max - br_min)
-                        ypix = ctrl_bottom + VP + ny * (ctrl_h - 2 * VP)
-                        brake_pts.append((xpix, ypix))
+                    # Show current gear next to the line
+                    current_gear = draw_gears[-1]
+                    self.texts.draw("gear_value", f"Gear: {int(current_gear)}", gear_pts[-1][0] + 10, gear_pts[-1][1] + 5, arcade.color.LIGHT_GRAY, 12)
+                except Exception as e:
+                    print("Chart draw error (gear):", e)
 
+                throttle_pts = chart_points(frames.channel("throttle")[shown], self.th_min, self.th_max, ctrl_bottom, ctrl_h)
+                brake_pts = chart_points(frames.channel("brake")[shown], self.br_min, self.br_max, ctrl_bottom, ctrl_h)
                 try:
-                    if throttle_pts:
-                        arcade.draw_line_strip(throttle_pts, arcade.color.GREEN, 2)
-                    if brake_pts:
-                        arcade.draw_line_strip(brake_pts, arcade.color.RED, 2)
+                    arcade.draw_line_strip(throttle_pts, arcade.color.GREEN, 2)
+                    arcade.draw_line_strip(brake_pts, arcade.color.RED, 2)
                 except Exception as e:
                     print("Chart draw error (controls):", e)
                 
                 # Add lap time to the left of the track map
 
-                current_frame = frames[self.frame_index]
-                current_t = current_frame.get("t", 0.0)
-                    
+                current_t = float(self._times[self.frame_index])
+
                 formatted_time = format_time(current_t)
 
-                arcade.Text(f"Lap Time: {formatted_time}", map_left + 10, map_top - 30, arcade.color.ANTI_FLASH_WHITE, 16).draw()
+                self.texts.draw("lap_time", f"Lap Time: {formatted_time}", map_left + 10, map_top - 30, arcade.color.ANTI_FLASH_WHITE, 16)
 
-                arcade.Text(f"Playback Speed: {self.playback_speed:.1f}x", map_left + 10, map_top - 50, arcade.color.ANTI_FLASH_WHITE, 14).draw()
+                self.texts.draw("playback_speed", f"Playback Speed: {self.playback_speed:.1f}x", map_left + 10, map_top - 50, arcade.color.ANTI_FLASH_WHITE, 14)
 
                 # Legends
                 legend_x = chart_right - 100
@@ -451,104 +388,52 @@ class QualifyingReplay(arcade.Window):
 
                 # Draw circuit map in bottom half (fit inner/outer polylines into map area)
                 if getattr(self, "x_min", None) is not None and getattr(self, "x_max", None) is not None:
-                    world_x_min = float(self.x_min)
-                    world_x_max = float(self.x_max)
-                    world_y_min = float(self.y_min)
-                    world_y_max = float(self.y_max)
-
-                    world_w = max(1.0, world_x_max - world_x_min)
-                    world_h = max(1.0, world_y_max - world_y_min)
-
-                    pad = 0.06
-                    usable_w = map_w * (1 - 2 * pad)
-                    usable_h = map_h * (1 - 2 * pad)
-
-                    scale_x = usable_w / world_w
-                    scale_y = usable_h / world_h
-                    world_scale = min(scale_x, scale_y)
-
-                    world_cx = (world_x_min + world_x_max) / 2
-                    world_cy = (world_y_min + world_y_max) / 2
-
-                    screen_cx = map_left + map_w / 2
-                    screen_cy = map_bottom + map_h / 2
-
-                    tx = screen_cx - world_scale * world_cx
-                    ty = screen_cy - world_scale * world_cy
-
-                    def world_to_map(x, y):
-                        sx = world_scale * x + tx
-                        sy = world_scale * y + ty
-                        return sx, sy
-
-                    # Use the interpolated world points if available, fallback to raw arrays
-                    inner_world = getattr(self, "world_inner_points", None) or list(zip(self.x_inner, self.y_inner))
-                    outer_world = getattr(self, "world_outer_points", None) or list(zip(self.x_outer, self.y_outer))
-
-                    inner_pts = [world_to_map(x, y) for x, y in inner_world if x is not None and y is not None]
-                    outer_pts = [world_to_map(x, y) for x, y in outer_world if x is not None and y is not None]
+                    # Map transform and outline are only rebuilt when the map area changes
+                    map_key = (map_left, map_bottom, map_w, map_h)
+                    if self.map_track_renderer.key != map_key:
+                        self.map_transform = ScreenTransform.fit(
+                            [self.x_min, self.x_max], [self.y_min, self.y_max],
+                            left=map_left, bottom=map_bottom, width=map_w, height=map_h,
+                            padding=0.06,
+                        )
+                        inner_pts = self.map_transform.apply_points(*self.world_inner_points.T)
+                        outer_pts = self.map_transform.apply_points(*self.world_outer_points.T)
+                        self.map_track_renderer.set_polylines([inner_pts, outer_pts], key=map_key)
 
                     try:
-                        if len(inner_pts) > 1:
-                            arcade.draw_line_strip(inner_pts, arcade.color.GRAY, 2)
-                        if len(outer_pts) > 1:
-                            arcade.draw_line_strip(outer_pts, arcade.color.GRAY, 2)
+                        self.map_track_renderer.draw(arcade.color.GRAY)
                     except Exception as e:
                         print("Circuit draw error:", e)
 
                     # Draw current driver's position marker (sync with frame_index)
-                    current_frame = frames[self.frame_index]
-                    tel = current_frame.get("telemetry", {}) if isinstance(current_frame.get("telemetry", {}), dict) else {}
-                    px = tel.get("x")
-                    py = tel.get("y")
-                    sx, sy = world_to_map(px, py)
-                    # driver colour lookup (fallback to white)
-                    drv_color = (255, 255, 255)
-                    if getattr(self, "loaded_driver_code", None):
-                        for r in self.data.get("results", []):
-                            if r.get("code") == self.loaded_driver_code and r.get("color"):
-                                drv_color = tuple(r.get("color"))
-                                break
-                    arcade.draw_circle_filled(sx, sy, 6, drv_color)
+                    px = float(self._xs[self.frame_index])
+                    py = float(self._ys[self.frame_index])
+                    sx, sy = self.map_transform.apply_point(px, py)
+                    drv_color = self._driver_color(self.loaded_driver_code)
+                    marker_code = self.loaded_driver_code or ""
+                    if self.map_car_sprites is None or self.map_car_sprites.codes != [marker_code]:
+                        self.map_car_sprites = CarSprites([marker_code], {marker_code: drv_color}, radius=6)
+                    self.map_car_sprites.update_positions([sx], [sy])
+                    self.map_car_sprites.draw()
 
                     # Overlay current gear near the position marker on the track
-                    cur_gear = tel.get("gear") or tel.get("nGear") or tel.get("Gear")
-                    if cur_gear is None:
-                        cur_gear = draw_gears[-1] if draw_gears else None
-                    arcade.Text(self.loaded_driver_code or "", sx + 10, sy + 4, arcade.color.WHITE, 12).draw()
-                    if cur_gear is not None:
-                        arcade.Text(f"G:{int(cur_gear)}", sx + 10, sy - 10, arcade.color.LIGHT_GRAY, 12).draw()
-
-            # Controls Legend - Bottom Left (keeps small offset from left UI edge)
-            legend_x = max(12, self.left_ui_margin - 320) if hasattr(self, "left_ui_margin") else 20
-            legend_y = 150 # Height of legend block
-            legend_lines = [
-                "Controls:",
-                "[SPACE]  Pause/Resume",
-                "[←/→]    Rewind / FastForward",
-                "[↑/↓]    Speed +/- (0.5x, 1x, 2x, 4x)",
-                "[R]       Restart",
-            ]
-
-            for i, line in enumerate(legend_lines):
-                arcade.Text(
-                    line,
-                    legend_x,
-                    legend_y - (i * 25),
-                    arcade.color.LIGHT_GRAY if i > 0 else arcade.color.WHITE,
-                    14,
-                    bold=(i == 0)
-                ).draw()
+                    cur_gear = int(draw_gears[-1])
+                    self.texts.draw("map_driver", self.loaded_driver_code or "", sx + 10, sy + 4, arcade.color.WHITE, 12)
+                    self.texts.draw("map_gear", f"G:{cur_gear}", sx + 10, sy - 10, arcade.color.LIGHT_GRAY, 12)
+
+            # Controls Legend - Bottom Left (pre-rendered once, one batched draw)
+            self.legend_comp.draw(self)
         else:
             # Add "click a driver to view their qualifying lap" text in the center of the chart area
 
             info_text = "Click a driver on the left to load their qualifying lap telemetry."
-            arcade.Text(
+            self.texts.draw(
+                "info",
                 info_text,
                 self.width / 2, self.height / 2,
                 arcade.color.LIGHT_GRAY, 18,
                 anchor_x="center", anchor_y="center"
-            ).draw()
+            )
 
         self.leaderboard.draw(self)
         self.qualifying_segment_selector_modal.draw(self)
@@ -558,33 +443,147 @@ class QualifyingReplay(arcade.Window):
         t_new = np.linspace(0, 1, interp_points)
         xs_i = np.interp(t_new, t_old, xs)
         ys_i = np.interp(t_new, t_old, ys)
-        return list(zip(xs_i, ys_i))
+        return np.column_stack([xs_i, ys_i])
 
     def world_to_screen(self, x, y):
         # Rotate around the track centre (if rotation is set), then scale+translate
-        world_cx = (self.x_min + self.x_max) / 2
-        world_cy = (self.y_min + self.y_max) / 2
-
-        if self._rot_rad:
-            tx = x - world_cx
-            ty = y - world_cy
-            rx = tx * self._cos_rot - ty * self._sin_rot
-            ry = tx * self._sin_rot + ty * self._cos_rot
-            x, y = rx + world_cx, ry + world_cy
-
-        sx = self.world_scale * x + self.tx
-        sy = self.world_scale * y + self.ty
-        return sx, sy
-
-    def _pick_telemetry_value(self, tel: dict, *keys):
-        """Return the first value for keys that exists in tel and is not None.
-        Preserves falsy-but-valid values like 0.0."""
-        if not isinstance(tel, dict):
-            return None
-        for k in keys:
-            if k in tel and tel[k] is not None:
-                return tel[k]
-        return None
+        return self.transform.apply_point(x, y)
+
+    def _driver_color(self, code):
+        # driver colour lookup (fallback to white)
+        for r in self.data.get("results", []):
+            if code and r.get("code") == code and r.get("color"):
+                return tuple(r.get("color"))
+        return (255, 255, 255)
+
+    def _ghost_laps(self, segment):
+        if segment not in self._ghost_cache:
+            self._ghost_cache[segment] = GhostLaps.from_telemetry(self.data.get("telemetry") or {}, segment)
+        return self._ghost_cache[segment]
+
+    def _start_ghosts(self, segment):
+        """Switch to ghost mode for a segment (no-op if nobody set a lap in it)."""
+        ghosts = self._ghost_laps(segment)
+        if ghosts is None:
+            return False
+        self.ghost_laps = ghosts
+        self.ghost_segment = segment
+        # Marker geometry lives on the GPU; keep it per segment so toggling back is free
+        if segment not in self._ghost_marker_cache:
+            self._ghost_marker_cache[segment] = GhostMarkers([self._driver_color(code) for code in ghosts.codes], radius=6)
+        self.ghost_markers = self._ghost_marker_cache[segment]
+        self.ghost_time = 0.0
+        self.paused = False
+        self.playback_speed = 1.0
+        self._ghost_board_key = None
+        return True
+
+    def _stop_ghosts(self):
+        if self.ghost_laps is None:
+            return
+        self.ghost_laps = None
+        self.ghost_markers = None
+        self.leaderboard.set_entries(self.data.get("results", []))
+
+    def _toggle_ghosts(self):
+        if self.ghost_laps is not None:
+            self._stop_ghosts()
+            return
+        # The loaded lap's segment first, otherwise the latest segment anyone set a lap in
+        candidates = ([self.loaded_segment] if self.loaded_segment else []) + list(reversed(QUALI_SEGMENTS))
+        for segment in candidates:
+            if self._start_ghosts(segment):
+                return
+
+    def _next_ghost_segment(self):
+        if self.ghost_laps is None:
+            return
+        i = QUALI_SEGMENTS.index(self.ghost_segment)
+        for step in range(1, len(QUALI_SEGMENTS)):
+            if self._start_ghosts(QUALI_SEGMENTS[(i + step) % len(QUALI_SEGMENTS)]):
+                return
+
+    def _update_ghost_leaderboard(self, sample):
+        # The board is rebuilt only when the running order or the number of finished laps changes
+        ghosts = self.ghost_laps
+        order = ghosts.order[sample]
+        finished = int(ghosts.finished[sample])
+        board_key = (order.tobytes(), finished)
+        if board_key == self._ghost_board_key:
+            return
+        self._ghost_board_key = board_key
+        self.leaderboard.set_entries([
+            {
+                "pos": rank + 1,
+                "code": ghosts.codes[row],
+                "color": self._driver_color(ghosts.codes[row]),
+                "time": format_time(float(ghosts.lap_times[row])) if rank < finished else "",
+            }
+            for rank, row in enumerate(order)
+        ])
+
+    def _draw_ghosts(self):
+        ghosts = self.ghost_laps
+        sample = ghosts.sample_at(self.ghost_time)
+
+        self.track_renderer.draw(arcade.color.GRAY)
+        # One column of the [n_drivers, n_samples] arrays: the whole field in one transform and one draw
+        sx, sy = self.transform.apply(ghosts.x[:, sample], ghosts.y[:, sample])
+        self.ghost_markers.draw(sx, sy)
+        self._update_ghost_leaderboard(sample)
+
+        hud_x = self.left_ui_margin + 20
+        self.texts.draw("ghost_title", f"{self.ghost_segment} Fastest Laps", hud_x, self.height - TOP_MARGIN, arcade.color.ANTI_FLASH_WHITE, 20, bold=True, anchor_y="top")
+        self.texts.draw("ghost_time", f"Lap Time: {format_time(float(ghosts.t[sample]))}", hud_x, self.height - TOP_MARGIN - 34, arcade.color.ANTI_FLASH_WHITE, 16, anchor_y="top")
+        self.texts.draw("ghost_speed", f"Playback Speed: {self.playback_speed:.1f}x", hud_x, self.height - TOP_MARGIN - 58, arcade.color.ANTI_FLASH_WHITE, 14, anchor_y="top")
+
+    def _lap_comparisons(self):
+        """Cached comparisons of every pinned lap (except the loaded one) against the loaded lap."""
+        if not self.pinned_laps or not self.frames:
+            return {}
+        loaded_key = (self.loaded_driver_code, self.loaded_segment)
+        others = {key: lap for key, lap in self.pinned_laps.items() if key != loaded_key}
+        if not others:
+            return {}
+        return self.lap_comparer.compare(loaded_key, self.frames, others)
+
+    def _toggle_pinned_lap(self):
+        if not self.chart_active or not self.frames:
+            return
+        key = (self.loaded_driver_code, self.loaded_segment)
+        if key in self.pinned_laps:
+            del self.pinned_laps[key]
+        else:
+            self.pinned_laps[key] = self.frames
+
+    def _draw_comparisons(self, comparisons, current_dist, lap_length, d_min, d_max, s_min, s_max,
+                          chart_left, chart_w, VP, speed_bottom, speed_h, delta_bottom, delta_h):
+        # The chart's x-axis is the loaded lap's relative distance
+        def x_of(dist):
+            return chart_left + (dist / max(lap_length, 1.0) - d_min) / (d_max - d_min) * chart_w
+
+        # Symmetric delta scale around zero (at least ±0.1 s)
+        limit = max(0.1, max(float(np.abs(c.delta_time).max()) for c in comparisons.values()))
+        zero_y = delta_bottom + delta_h * 0.5
+        half_h = delta_h * 0.5 - VP
+        arcade.draw_line(chart_left, zero_y, chart_left + chart_w, zero_y, arcade.color.GRAY, 1)
+
+        for i, ((code, segment), comparison) in enumerate(comparisons.items()):
+            color = self._driver_color(code)
+            shown = comparison.distance <= current_dist
+            if shown.sum() < 2:
+                continue
+            xs = x_of(comparison.distance[shown])
+
+            speed_ys = speed_bottom + VP + (comparison.other["speed"][shown] - s_min) / (s_max - s_min) * (speed_h - 2 * VP)
+            arcade.draw_line_strip(np.column_stack([xs, speed_ys]).tolist(), (*color[:3], 150), 1)
+
+            delta_ys = zero_y + comparison.delta_time[shown] / limit * half_h
+            arcade.draw_line_strip(np.column_stack([xs, delta_ys]).tolist(), color, 2)
+            self.texts.draw(
+                ("delta_value", i), f"{code} {segment} {comparison.delta_time[shown][-1]:+.3f}s",
+                xs[-1] + 10, delta_ys[-1] - 6 + 14 * i, color, 12,
+            )
 
     def on_mouse_press(self, x: float, y: float, button: int, modifiers: int):
         # If the segment-selector modal is visible (a driver selected), give it first chance
@@ -604,6 +603,20 @@ class QualifyingReplay(arcade.Window):
     def on_key_press(self, symbol: int, modifiers: int):
         if symbol == arcade.key.SPACE:
             self.paused = not self.paused
+        elif symbol == arcade.key.G:
+            self._toggle_ghosts()
+        elif symbol == arcade.key.S:
+            self._next_ghost_segment()
+        elif self.ghost_laps is not None and symbol in (arcade.key.RIGHT, arcade.key.LEFT, arcade.key.R):
+            # Ghost playback steps by the same 10 frames as a single lap
+            if symbol == arcade.key.RIGHT:
+                self.ghost_time = min(self.ghost_time + 10 / FPS, float(self.ghost_laps.t[-1]))
+            elif symbol == arcade.key.LEFT:
+                self.ghost_time = max(self.ghost_time - 10 / FPS, 0.0)
+            else:
+                self.ghost_time = 0.0
+                self.playback_speed = 1.0
+                self.paused = True
         elif symbol == arcade.key.RIGHT:
             # step forward by 10 frames (keep integer)
             self.frame_index = int(min(self.frame_index + 10, max(0, self.n_frames - 1)))
@@ -622,6 +635,10 @@ class QualifyingReplay(arcade.Window):
             self.playback_speed = 2.0
         elif symbol == arcade.key.KEY_4:
             self.playback_speed = 4.0
+        elif symbol == arcade.key.C:
+            self._toggle_pinned_lap()
+        elif symbol == arcade.key.X:
+            self.pinned_laps.clear()
         elif symbol == arcade.key.R:
             self.frame_index = 0
             self.play_time = self.play_start_t
@@ -643,40 +660,7 @@ class QualifyingReplay(arcade.Window):
                 seg = driver_block.get(segment_name)
                 if seg and isinstance(seg, dict) and seg.get("frames"):
                     # Use local telemetry immediately (no background fetch required)
-                    self.loaded_telemetry = seg
-                    self.loaded_driver_code = driver_code
-                    self.chart_active = True
-                    # cache arrays for fast access and search
-                    frames = seg.get("frames", [])
-                    drs_zones = seg.get("drs_zones", [])
-                    times = [float(f.get("t")) for f in frames if f.get("t") is not None]
-                    xs = [ (f.get("telemetry") or {}).get("x") for f in frames ]
-                    ys = [ (f.get("telemetry") or {}).get("y") for f in frames ]
-                    speeds = [ (f.get("telemetry") or {}).get("speed") for f in frames ]
-                    # convert to numpy arrays (keep None if any; searchsorted expects numeric times)
-                    self._times = np.array(times) if times else None
-                    self._xs = np.array(xs) if xs else None
-                    self._ys = np.array(ys) if ys else None
-                    self._speeds = np.array([float(s) for s in speeds if s is not None]) if speeds else None
-                    # populate top-level frames/n_frames and min/max speeds for chart scaling
-                    self.frames = frames
-                    self.drs_zones = drs_zones
-                    self.n_frames = len(frames)
-                    if self._speeds is not None and self._speeds.size > 0:
-                        self.min_speed = float(np.min(self._speeds))
-                        self.max_speed = float(np.max(self._speeds))
-                    else:
-                        self.min_speed = 0.0
-                        self.max_speed = 0.0
-                     # initialize playback state based on frames' timestamps
-                    frames = seg.get("frames", [])
-                    if frames:
-                        start_t = frames[0].get("t", 0.0)
-                        self.play_start_t = float(start_t)
-                        self.play_time = float(start_t)
-                        self.frame_index = 0
-                        self.paused = False
-                        self.playback_speed = 1.0
+                    self._activate_lap(driver_code, segment_name, seg)
                     self.loading_telemetry = False
                     self.loading_message = ""
                     return
@@ -714,40 +698,11 @@ class QualifyingReplay(arcade.Window):
                 time.sleep(1.0)
                 telemetry = None
 
-            if telemetry is None:
+            if telemetry is None or not telemetry.get("frames"):
                 self.loaded_telemetry = None
                 self.chart_active = False
             else:
-                self.loaded_telemetry = telemetry
-                self.loaded_driver_code = driver_code
-                self.chart_active = True
-                # cache arrays for fast indexing/interpolation
-                frames = telemetry.get("frames", [])
-                times = [float(f.get("t")) for f in frames if f.get("t") is not None]
-                xs = [ (f.get("telemetry") or {}).get("x") for f in frames ]
-                ys = [ (f.get("telemetry") or {}).get("y") for f in frames ]
-                speeds = [ (f.get("telemetry") or {}).get("speed") for f in frames ]
-                self._times = np.array(times) if times else None
-                self._xs = np.array(xs) if xs else None
-                self._ys = np.array(ys) if ys else None
-                self._speeds = np.array([float(s) for s in speeds if s is not None]) if speeds else None
-                self.frames = frames
-                self.n_frames = len(frames)
-                if self._speeds is not None and self._speeds.size > 0:
-                    self.min_speed = float(np.min(self._speeds))
-                    self.max_speed = float(np.max(self._speeds))
-                else:
-                    self.min_speed = 0.0
-                    self.max_speed = 0.0
-                # initialize playback state for the newly loaded telemetry
-                frames = telemetry.get("frames", [])
-                if frames:
-                    start_t = frames[0].get("t", 0.0)
-                    self.play_start_t = float(start_t)
-                    self.play_time = float(start_t)
-                    self.frame_index = 0
-                    self.paused = False
-                    self.playback_speed = 1.0
+                self._activate_lap(driver_code, segment_name, telemetry)
         except Exception as e:
             print("Telemetry load failed:", e)
             self.loaded_telemetry = None
@@ -756,7 +711,39 @@ class QualifyingReplay(arcade.Window):
             self.loading_telemetry = False
             self.loading_message = ""
 
+    def _activate_lap(self, driver_code, segment_name, telemetry):
+        """Show a lap: cache its arrays for playback and chart scaling, then start playing it."""
+        self._stop_ghosts()
+        frames = telemetry["frames"]
+        # The lap's arrays are memory-mapped from the cache on first use; nothing is copied here
+        self._times = frames.channel("t")
+        self._xs = frames.channel("x")
+        self._ys = frames.channel("y")
+        self._speeds = frames.channel("speed")
+
+        self.frames = frames
+        self.n_frames = len(frames)
+        self.drs_zones = telemetry.get("drs_zones", [])
+        self.min_speed = float(self._speeds.min())
+        self.max_speed = float(self._speeds.max())
+
+        # initialize playback state based on frames' timestamps
+        self.play_start_t = float(self._times[0])
+        self.play_time = self.play_start_t
+        self.frame_index = 0
+        self.paused = False
+        self.playback_speed = 1.0
+
+        self.loaded_telemetry = telemetry
+        self.loaded_driver_code = driver_code
+        self.loaded_segment = segment_name
+        self.chart_active = True
+
     def on_update(self, delta_time: float):
+        if self.ghost_laps is not None:
+            if not self.paused:
+                self.ghost_time = min(self.ghost_time + delta_time * self.playback_speed, float(self.ghost_laps.t[-1]))
+            return
         # time-based playback synced to telemetry timestamps
         if not self.chart_active or self.loaded_telemetry is None:
             return
@@ -1,7 +1,6 @@
 import os
 import arcade
 import numpy as np
-from src.f1_data import FPS
 from src.ui_components import (
     LeaderboardComponent, 
     WeatherComponent, 
@@ -11,13 +10,25 @@ from src.ui_components import (
     extract_race_events,
     build_track_from_example_lap
 )
+from src.frame_store import SeekIndex
+from src.lib.drs import race_drs_zones
+from src.lib.time import parse_time_string
+from src.lib.track import ReferencePolyline
+from src.lib.track_status import TrackStatusIndex
+from src.lib.transform import ScreenTransform
+from src.renderer import TrackRenderer, CarSprites, TextCache
 
 
 SCREEN_WIDTH = 1920
 SCREEN_HEIGHT = 1200
 SCREEN_TITLE = "F1 Race Replay"
 
+# Replay time skipped by the arrow keys, independent of the store's frame rate
+ARROW_STEP_SECONDS = 0.4
+
 class F1RaceReplayWindow(arcade.Window):
+    DRS_ZONE_COLOR = (0, 200, 0, 170)
+
     def __init__(self, frames, track_statuses, example_lap, drivers, title,
                  playback_speed=1.0, driver_colors=None, circuit_rotation=0.0,
                  left_ui_margin=340, right_ui_margin=260, total_laps=None):
@@ -26,6 +37,8 @@ class F1RaceReplayWindow(arcade.Window):
 
         self.frames = frames
         self.track_statuses = track_statuses
+        # Sorted status intervals shared by the track colouring, HUD and progress bar
+        self.track_status_index = TrackStatusIndex.from_statuses(track_statuses)
         self.n_frames = len(frames)
         self.drivers = list(drivers)
         self.playback_speed = playback_speed
@@ -33,13 +46,10 @@ class F1RaceReplayWindow(arcade.Window):
         self.frame_index = 0.0  # use float for fractional-frame accumulation
         self.paused = False
         self.total_laps = total_laps
-        self.has_weather = any("weather" in frame for frame in frames) if frames else False
+        self.has_weather = bool(frames.weather)
 
         # Rotation (degrees) to apply to the whole circuit around its centre
         self.circuit_rotation = circuit_rotation
-        self._rot_rad = float(np.deg2rad(self.circuit_rotation)) if self.circuit_rotation else 0.0
-        self._cos_rot = float(np.cos(self._rot_rad))
-        self._sin_rot = float(np.sin(self._rot_rad))
         self.finished_drivers = []
         self.left_ui_margin = left_ui_margin
         self.right_ui_margin = right_ui_margin
@@ -47,8 +57,14 @@ class F1RaceReplayWindow(arcade.Window):
         leaderboard_x = max(20, self.width - self.right_ui_margin + 12)
         self.leaderboard_comp = LeaderboardComponent(x=leaderboard_x, width=240)
         self.weather_comp = WeatherComponent(left=20, top_offset=170)
-        self.legend_comp = LegendComponent(x=max(12, self.left_ui_margin - 320))
-        self.driver_info_comp = DriverInfoComponent(left=20, width=300)
+        self.legend_comp = LegendComponent(x=max(12, self.left_ui_margin - 320), y=250, extra_lines=[
+            "[B]       Toggle Progress Bar",
+            "[D]       Toggle DRS Zones",
+            "[ / ]     Previous / Next Lap",
+            "[, / .]   Previous / Next Event",
+            "[G]       Go To Lap / Time (Enter)",
+        ])
+        self.driver_info_comp = DriverInfoComponent(left=20, width=300, min_top=300)
         
         # Progress bar component with race event markers
         self.progress_bar_comp = RaceProgressBarComponent(
@@ -59,13 +75,20 @@ class F1RaceReplayWindow(arcade.Window):
             marker_height=16
         )
         
-        # Extract race events for the progress bar
-        race_events = extract_race_events(frames, track_statuses, total_laps or 0)
-        self.progress_bar_comp.set_race_data(
-            total_frames=len(frames),
-            total_laps=total_laps or 0,
-            events=race_events
-        )
+        # Reference lap for placing DRS zones on the track
+        self.reference = ReferencePolyline(example_lap["X"], example_lap["Y"])
+        self.drs_zones = []
+        self.show_drs_zones = True
+
+        # Race events, DRS zones and the seek index (rebuilt as a progressive store fills up)
+        self._build_race_index()
+        self.seek_input = None  # text typed after [G], or None when not entering a seek target
+        self.seek_error = None  # why the last submitted target was rejected (shown until the next submit)
+
+        # While frames are still being computed, keep the bar up so its progress is visible
+        self.frames_error = None
+        if frames.ready_frames < self.n_frames:
+            self.progress_bar_comp.visible = True
 
         # Build track geometry (Raw World Coordinates)
         (self.plot_x_ref, self.plot_y_ref,
@@ -74,30 +97,29 @@ class F1RaceReplayWindow(arcade.Window):
          self.x_min, self.x_max,
          self.y_min, self.y_max) = build_track_from_example_lap(example_lap)
 
-        # Build a dense reference polyline (used for projecting car (x,y) -> along-track distance)
-        ref_points = self._interpolate_points(self.plot_x_ref, self.plot_y_ref, interp_points=4000)
-        # store as numpy arrays for vectorized ops
-        self._ref_xs = np.array([p[0] for p in ref_points])
-        self._ref_ys = np.array([p[1] for p in ref_points])
-
-        # cumulative distances along the reference polyline (metres)
-        diffs = np.sqrt(np.diff(self._ref_xs)**2 + np.diff(self._ref_ys)**2)
-        self._ref_seg_len = diffs
-        self._ref_cumdist = np.concatenate(([0.0], np.cumsum(diffs)))
-        self._ref_total_length = float(self._ref_cumdist[-1]) if len(self._ref_cumdist) > 0 else 0.0
-
         # Pre-calculate interpolated world points ONCE (optimization)
         self.world_inner_points = self._interpolate_points(self.x_inner, self.y_inner)
         self.world_outer_points = self._interpolate_points(self.x_outer, self.y_outer)
 
         # These will hold the actual screen coordinates to draw
-        self.screen_inner_points = []
-        self.screen_outer_points = []
+        self.screen_inner_points = np.empty((0, 2))
+        self.screen_outer_points = np.empty((0, 2))
+
+        # GPU-side geometry: track outlines rebuilt only when the layout or colour
+        # changes, cars as one sprite list moved in place every frame
+        self.track_renderer = TrackRenderer(line_width=4)
+        self.drs_renderer = TrackRenderer(line_width=6)
+        self.car_sprites = CarSprites(self.frames.driver_codes, self.driver_colors, radius=6)
+
+        # HUD labels are retained and only updated when their text changes;
+        # [T] shows how many Text objects were allocated during the last frame
+        self.hud_texts = TextCache()
+        self.text_allocations_per_frame = 0
+        self.show_text_stats = False
         
-        # Scaling parameters (initialized to 0, calculated in update_scaling)
+        # World-to-screen mapping (identity until update_scaling fits the track)
+        self.transform = ScreenTransform()
         self.world_scale = 1.0
-        self.tx = 0
-        self.ty = 0
 
         # Load Background
         bg_path = os.path.join("resources", "background.png")
@@ -117,94 +139,41 @@ class F1RaceReplayWindow(arcade.Window):
         t_new = np.linspace(0, 1, interp_points)
         xs_i = np.interp(t_new, t_old, xs)
         ys_i = np.interp(t_new, t_old, ys)
-        return list(zip(xs_i, ys_i))
-
-    def _project_to_reference(self, x, y):
-        if self._ref_total_length == 0.0:
-            return 0.0
-
-        # Vectorized nearest-point to dense polyline points (sufficient for our purposes)
-        dx = self._ref_xs - x
-        dy = self._ref_ys - y
-        d2 = dx * dx + dy * dy
-        idx = int(np.argmin(d2))
-
-        # For a slightly better estimate, optionally project onto the adjacent segment
-        if idx < len(self._ref_xs) - 1:
-            x1, y1 = self._ref_xs[idx], self._ref_ys[idx]
-            x2, y2 = self._ref_xs[idx+1], self._ref_ys[idx+1]
-            vx, vy = x2 - x1, y2 - y1
-            seg_len2 = vx*vx + vy*vy
-            if seg_len2 > 0:
-                t = ((x - x1) * vx + (y - y1) * vy) / seg_len2
-                t_clamped = max(0.0, min(1.0, t))
-                proj_x = x1 + t_clamped * vx
-                proj_y = y1 + t_clamped * vy
-                # distance along segment from x1,y1
-                seg_dist = np.sqrt((proj_x - x1)**2 + (proj_y - y1)**2)
-                return float(self._ref_cumdist[idx] + seg_dist)
-
-        # Fallback: return the cumulative distance at the closest dense sample
-        return float(self._ref_cumdist[idx])
+        return np.column_stack([xs_i, ys_i])
 
     def update_scaling(self, screen_w, screen_h):
         """
         Recalculates the scale and translation to fit the track 
         perfectly within the new screen dimensions while maintaining aspect ratio.
         """
-        padding = 0.05
-        # If a rotation is applied, we must compute the rotated bounds
-        world_cx = (self.x_min + self.x_max) / 2
-        world_cy = (self.y_min + self.y_max) / 2
-
-        def _rotate_about_center(x, y):
-            # Translate to centre, rotate, translate back
-            tx = x - world_cx
-            ty = y - world_cy
-            rx = tx * self._cos_rot - ty * self._sin_rot
-            ry = tx * self._sin_rot + ty * self._cos_rot
-            return rx + world_cx, ry + world_cy
-
-        # Build rotated extents from inner/outer world points
-        rotated_points = []
-        for x, y in self.world_inner_points:
-            rotated_points.append(_rotate_about_center(x, y))
-        for x, y in self.world_outer_points:
-            rotated_points.append(_rotate_about_center(x, y))
-
-        xs = [p[0] for p in rotated_points]
-        ys = [p[1] for p in rotated_points]
-        world_x_min = min(xs) if xs else self.x_min
-        world_x_max = max(xs) if xs else self.x_max
-        world_y_min = min(ys) if ys else self.y_min
-        world_y_max = max(ys) if ys else self.y_max
-
-        world_w = max(1.0, world_x_max - world_x_min)
-        world_h = max(1.0, world_y_max - world_y_min)
-        
-        # Reserve left/right UI margins before applying padding so the track
-        # never overlaps side UI elements (leaderboard, telemetry, legends).
+        # Fit the rotated outlines into the area between the left/right UI margins
+        # so the track never overlaps side UI elements (leaderboard, telemetry, legends).
+        world_points = np.vstack([self.world_inner_points, self.world_outer_points])
         inner_w = max(1.0, screen_w - self.left_ui_margin - self.right_ui_margin)
-        usable_w = inner_w * (1 - 2 * padding)
-        usable_h = screen_h * (1 - 2 * padding)
-
-        # Calculate scale to fit whichever dimension is the limiting factor
-        scale_x = usable_w / world_w
-        scale_y = usable_h / world_h
-        self.world_scale = min(scale_x, scale_y)
-
-        # Center the world in the screen (rotation done about original centre)
-        # world_cx/world_cy are unchanged by rotation about centre
-        # Center within the available inner area (left_ui_margin .. screen_w - right_ui_margin)
-        screen_cx = self.left_ui_margin + inner_w / 2
-        screen_cy = screen_h / 2
-
-        self.tx = screen_cx - self.world_scale * world_cx
-        self.ty = screen_cy - self.world_scale * world_cy
+        self.transform = ScreenTransform.fit(
+            world_points[:, 0], world_points[:, 1],
+            left=self.left_ui_margin, bottom=0, width=inner_w, height=screen_h,
+            rotation=self.circuit_rotation,
+            center=((self.x_min + self.x_max) / 2, (self.y_min + self.y_max) / 2),
+            padding=0.05,
+        )
+        self.world_scale = self.transform.scale
 
         # Update the polyline screen coordinates based on new scale
-        self.screen_inner_points = [self.world_to_screen(x, y) for x, y in self.world_inner_points]
-        self.screen_outer_points = [self.world_to_screen(x, y) for x, y in self.world_outer_points]
+        self.screen_inner_points = self.transform.apply_points(*self.world_inner_points.T)
+        self.screen_outer_points = self.transform.apply_points(*self.world_outer_points.T)
+        self.track_renderer.set_polylines([self.screen_inner_points, self.screen_outer_points])
+        self._update_drs_geometry()
+
+    def _update_drs_geometry(self):
+        # DRS zones are drawn along the reference lap; rebuilt when the layout or the zones change
+        n_points = len(self.reference.xs)
+        polylines = []
+        for start, end in self.drs_zones:
+            # Zones that cross the line (end < start) wrap around the reference
+            idx = np.arange(start, end + (n_points if end < start else 0) + 1) % n_points
+            polylines.append(self.transform.apply_points(self.reference.xs[idx], self.reference.ys[idx]))
+        self.drs_renderer.set_polylines(polylines)
 
     def on_resize(self, width, height):
         """Called automatically by Arcade when window is resized."""
@@ -217,19 +186,7 @@ class F1RaceReplayWindow(arcade.Window):
 
     def world_to_screen(self, x, y):
         # Rotate around the track centre (if rotation is set), then scale+translate
-        world_cx = (self.x_min + self.x_max) / 2
-        world_cy = (self.y_min + self.y_max) / 2
-
-        if self._rot_rad:
-            tx = x - world_cx
-            ty = y - world_cy
-            rx = tx * self._cos_rot - ty * self._sin_rot
-            ry = tx * self._sin_rot + ty * self._cos_rot
-            x, y = rx + world_cx, ry + world_cy
-
-        sx = self.world_scale * x + self.tx
-        sy = self.world_scale * y + self.ty
-        return sx, sy
+        return self.transform.apply_point(x, y)
 
     def _format_wind_direction(self, degrees):
         if degrees is None:
@@ -243,6 +200,7 @@ class F1RaceReplayWindow(arcade.Window):
         return dirs[idx]
 
     def on_draw(self):
+        allocations_before = TextCache.allocations
         self.clear()
 
         # 1. Draw Background (stretched to fit new window size)
@@ -257,73 +215,27 @@ class F1RaceReplayWindow(arcade.Window):
         idx = min(int(self.frame_index), self.n_frames - 1)
         frame = self.frames[idx]
         current_time = frame["t"]
-        current_track_status = "GREEN"
-        for status in self.track_statuses:
-            if status['start_time'] <= current_time and (status['end_time'] is None or current_time < status['end_time']):
-                current_track_status = status['status']
-                break
-
-        # Map track status -> colour (R,G,B)
-        STATUS_COLORS = {
-            "GREEN": (150, 150, 150),    # normal grey
-            "YELLOW": (220, 180,   0),   # caution
-            "RED": (200,  30,  30),      # red-flag
-            "VSC": (200, 130,  50),      # virtual safety car / amber-brown
-            "SC": (180, 100,  30),       # safety car (darker brown)
-        }
-        track_color = STATUS_COLORS.get("GREEN", (150, 150, 150))
-
-        if current_track_status == "2":
-            track_color = STATUS_COLORS.get("YELLOW")
-        elif current_track_status == "4":
-            track_color = STATUS_COLORS.get("SC")
-        elif current_track_status == "5":
-            track_color = STATUS_COLORS.get("RED")
-        elif current_track_status == "6" or current_track_status == "7":
-            track_color = STATUS_COLORS.get("VSC")
- 
-        if len(self.screen_inner_points) > 1:
-            arcade.draw_line_strip(self.screen_inner_points, track_color, 4)
-        if len(self.screen_outer_points) > 1:
-            arcade.draw_line_strip(self.screen_outer_points, track_color, 4)
-
-        # 3. Draw Cars
-        frame = self.frames[idx]
-        for code, pos in frame["drivers"].items():
-            sx, sy = self.world_to_screen(pos["x"], pos["y"])
-            color = self.driver_colors.get(code, arcade.color.WHITE)
-            arcade.draw_circle_filled(sx, sy, 6, color)
+        track_color = self.track_status_index.track_color_at(current_time)
+        self.track_renderer.draw(track_color)
+        if self.show_drs_zones:
+            self.drs_renderer.draw(self.DRS_ZONE_COLOR)
+
+        # 3. Draw Cars (positions interpolated between stored samples for smooth motion)
+        xs = self.frames.row_at("x", self.frame_index)
+        ys = self.frames.row_at("y", self.frame_index)
+        laps = self.frames.row("lap", idx)
+        screen_xs, screen_ys = self.transform.apply(xs, ys)
+        self.car_sprites.update_positions(screen_xs, screen_ys)
+        self.car_sprites.draw()
         
         # --- UI ELEMENTS (Dynamic Positioning) ---
         
-        # Determine Leader info using projected along-track distance (more robust than dist)
-        # Use the progress metric in metres for each driver and use that to order the leaderboard.
-        driver_progress = {}
-        for code, pos in frame["drivers"].items():
-            # parse lap defensively
-            lap_raw = pos.get("lap", 1)
-            try:
-                lap = int(lap_raw)
-            except Exception:
-                lap = 1
-
-            # Project (x,y) to reference and combine with lap count
-            projected_m = self._project_to_reference(pos.get("x", 0.0), pos.get("y", 0.0))
-            # progress in metres since race start: (lap-1) * lap_length + projected_m
-            progress_m = float((max(lap, 1) - 1) * self._ref_total_length + projected_m)
-
-            driver_progress[code] = progress_m
-
-        # Leader is the one with greatest progress_m
-        if driver_progress:
-            leader_code = max(driver_progress, key=lambda c: driver_progress[c])
-            leader_lap = frame["drivers"][leader_code].get("lap", 1)
-        else:
-            leader_code = None
-            leader_lap = 1
+        # Leader info and running order come straight from the precomputed order channel
+        running_order = self.frames.order[idx]
+        leader_lap = int(laps[running_order[0]]) if len(running_order) else 1
 
         # Time Calculation
-        t = frame["t"]
+        t = self.frames.time_at(self.frame_index)
         hours = int(t // 3600)
         minutes = int((t % 3600) // 60)
         seconds = int(t % 60)
@@ -335,96 +247,175 @@ class F1RaceReplayWindow(arcade.Window):
             lap_str += f"/{self.total_laps}"
 
         # Draw HUD - Top Left                         
-        arcade.Text(lap_str,
-                          20, self.height - 40, 
-                          arcade.color.WHITE, 24, anchor_y="top").draw()
+        self.hud_texts.draw("lap", lap_str,
+                            20, self.height - 40, 
+                            arcade.color.WHITE, 24, anchor_y="top")
         
-        arcade.Text(f"Race Time: {time_str} (x{self.playback_speed})", 
-                         20, self.height - 80, 
-                         arcade.color.WHITE, 20, anchor_y="top").draw()
+        self.hud_texts.draw("time", f"Race Time: {time_str} (x{self.playback_speed})", 
+                            20, self.height - 80, 
+                            arcade.color.WHITE, 20, anchor_y="top")
         
-        if current_track_status == "2":
-            status_text = "YELLOW FLAG"
-            arcade.Text(status_text, 
-                             20, self.height - 120,
-                             arcade.color.YELLOW, 24, bold=True, anchor_y="top").draw()
-        elif current_track_status == "5":
-            status_text = "RED FLAG"
-            arcade.Text(status_text, 
-                             20, self.height - 120, 
-                             arcade.color.RED, 24, bold=True, anchor_y="top").draw()
-        elif current_track_status == "6":
-            status_text = "VIRTUAL SAFETY CAR"
-            arcade.Text(status_text, 
-                             20, self.height - 120, 
-                             arcade.color.ORANGE, 24, bold=True, anchor_y="top").draw()
-        elif current_track_status == "4":
-            status_text = "SAFETY CAR"
-            arcade.Text(status_text, 
-                             20, self.height - 120, 
-                             arcade.color.BROWN, 24, bold=True, anchor_y="top").draw()
+        status_label = self.track_status_index.label_at(current_time)
+        if status_label:
+            status_text, status_color = status_label
+            self.hud_texts.draw("status", status_text,
+                                20, self.height - 120,
+                                status_color, 24, bold=True, anchor_y="top")
 
         # Weather component (set info then draw)
-        weather_info = frame.get("weather") if frame else None
+        weather_info = self.frames.weather.at(t) if self.frames.weather else None
         self.weather_comp.set_info(weather_info)
         self.weather_comp.draw(self)
         # optionally expose weather_bottom for driver info layout
         self.weather_bottom = self.height - 170 - 130 if (weather_info or self.has_weather) else None
 
         # Draw leaderboard via component
+        codes = self.frames.driver_codes
+        drivers = frame["drivers"]
         driver_list = []
-        for code, pos in frame["drivers"].items():
+        for col in running_order:
+            code = codes[col]
+            pos = drivers[code]
             color = self.driver_colors.get(code, arcade.color.WHITE)
-            progress_m = driver_progress.get(code, float(pos.get("dist", 0.0)))
-            driver_list.append((code, color, pos, progress_m))
-        driver_list.sort(key=lambda x: x[3], reverse=True)
+            driver_list.append((code, color, pos, pos.get("progress_m", pos["dist"])))
         self.leaderboard_comp.set_entries(driver_list)
         self.leaderboard_comp.draw(self)
         # expose rects for existing hit test compatibility if needed
         self.leaderboard_rects = self.leaderboard_comp.rects
 
-        # Controls Legend - Bottom Left (keeps small offset from left UI edge)
-        legend_x = max(12, self.left_ui_margin - 320) if hasattr(self, "left_ui_margin") else 20
-        legend_y = 150 # Height of legend block
-        legend_lines = [
-            "Controls:",
-            "[SPACE]  Pause/Resume",
-            "[←/→]    Rewind / FastForward",
-            "[↑/↓]    Speed +/- (0.5x, 1x, 2x, 4x)",
-            "[R]       Restart",
-            "[B]       Toggle Progress Bar",
-        ]
-        
-        for i, line in enumerate(legend_lines):
-            arcade.Text(
-                line,
-                legend_x,
-                legend_y - (i * 25),
-                arcade.color.LIGHT_GRAY if i > 0 else arcade.color.WHITE,
-                14,
-                bold=(i == 0)
-            ).draw()
+        # Controls Legend - Bottom Left (pre-rendered once, one batched draw)
+        self.legend_comp.draw(self)
         
         # Selected driver info component
         self.driver_info_comp.draw(self)
         
         # Race Progress Bar with event markers (DNF, flags, leader changes)
         self.progress_bar_comp.draw(self)
+
+        if self.seek_input is not None:
+            self.hud_texts.draw("seek_input", f"Go to lap or time (h:mm:ss): {self.seek_input}_",
+                                20, self.height - 160, arcade.color.WHITE, 16, anchor_y="top")
+            if self.seek_error is not None:
+                self.hud_texts.draw("seek_error", self.seek_error,
+                                    20, self.height - 185, arcade.color.RED, 14, anchor_y="top")
+
+        if self.show_text_stats:
+            self.hud_texts.draw("text_stats", f"Text allocations/frame: {self.text_allocations_per_frame}",
+                                self.width - 20, 20, arcade.color.LIGHT_GRAY, 12, anchor_x="right")
+        self.text_allocations_per_frame = TextCache.allocations - allocations_before
                     
+    def _build_race_index(self):
+        # Extract race events for the progress bar
+        race_events = extract_race_events(self.frames, self.track_status_index, self.total_laps or 0)
+
+        # DRS zones from every driver's DRS openings (edge detection on the drs channel)
+        self.drs_zones = race_drs_zones(self.frames, self.reference)
+
+        # Lap / time / event lookups for seeking (binary searches over precomputed frames)
+        self.seek_index = SeekIndex.from_store(self.frames, [event["frame"] for event in race_events])
+        self._indexed_frames = self.frames.ready_frames
+
+        self.progress_bar_comp.set_race_data(
+            total_frames=self.n_frames,
+            total_laps=self.total_laps or 0,
+            events=race_events,
+            lap_frames=self.seek_index.lap_frames(),
+        )
+
+    @property
+    def last_frame(self):
+        """Last frame that can be shown (frames still being computed are out of reach)."""
+        return max(0, self.frames.ready_frames - 1)
+
+    def seek_frame(self, frame):
+        """Jump to an exact frame (clamped to the frames that are ready)."""
+        self.frame_index = float(min(max(int(frame), 0), self.last_frame))
+
+    def seek_lap(self, lap, driver=None):
+        """Jump to the first frame of the leader's (or `driver`'s) lap `lap`."""
+        self.seek_frame(self.seek_index.frame_for_lap(lap, driver))
+
+    def seek_time(self, seconds):
+        """Jump to race time `seconds` (as shown in the HUD)."""
+        self.seek_frame(self.seek_index.frame_at_time(seconds))
+
+    def seek_event(self, step):
+        """Jump to the next (step > 0) or previous (step < 0) progress bar event."""
+        current = int(self.frame_index)
+        frame = self.seek_index.next_event(current) if step > 0 else self.seek_index.previous_event(current)
+        if frame is not None:
+            self.seek_frame(frame)
+
+    def _step_lap(self, step):
+        # Lap steps follow the selected driver if there is one, otherwise the leader
+        driver = self.selected_driver if self.selected_driver in self.seek_index.driver_laps else None
+        current = int(self.frame_index)
+        lap = self.seek_index.lap_at(current, driver)
+        if step < 0 and current > self.seek_index.frame_for_lap(lap, driver):
+            # Going back from mid-lap first returns to the start of this lap
+            step = 0
+        self.seek_lap(max(1, lap + step), driver)
+
+    def _submit_seek_input(self):
+        text, self.seek_input, self.seek_error = self.seek_input, None, None
+        if not text:
+            return
+        if ":" in text:
+            seconds = parse_time_string(text)
+            if seconds is None:
+                # Keep the prompt open with the rejected text so it can be corrected
+                self.seek_input = text
+                self.seek_error = f"'{text}' is not a time (h:mm:ss or mm:ss)"
+                return
+            self.seek_time(seconds)
+        else:
+            driver = self.selected_driver if self.selected_driver in self.seek_index.driver_laps else None
+            self.seek_lap(int(text), driver)
+
+    def _handle_seek_input(self, symbol):
+        """Keys while a [G] seek target is being typed. Returns True if the key was used."""
+        digits = {getattr(arcade.key, f"KEY_{n}"): str(n) for n in range(10)}
+        digits.update({getattr(arcade.key, f"NUM_{n}"): str(n) for n in range(10)})
+        if symbol in digits:
+            self.seek_input += digits[symbol]
+        elif symbol in (arcade.key.COLON, arcade.key.SEMICOLON):
+            self.seek_input += ":"
+        elif symbol == arcade.key.BACKSPACE:
+            self.seek_input = self.seek_input[:-1]
+        elif symbol in (arcade.key.ENTER, arcade.key.RETURN, arcade.key.NUM_ENTER, arcade.key.G):
+            # Pressing [G] again submits too, rather than restarting the input
+            self._submit_seek_input()
+        elif symbol == arcade.key.ESCAPE:
+            self.seek_input = self.seek_error = None
+        else:
+            return False
+        return True
+
     def on_update(self, delta_time: float):
+        # A progressive build that failed never publishes more frames: report it and stop waiting
+        if self.frames_error is None and self.frames.ready_frames < self.n_frames:
+            self.frames_error = self.frames.build_error()
+            if self.frames_error is not None:
+                print(f"Telemetry processing failed: {self.frames_error}")
+                self.progress_bar_comp.visible = True
+        if self.frames.ready_frames != self._indexed_frames:
+            self._build_race_index()
+            self._update_drs_geometry()
         if self.paused:
             return
-        self.frame_index += delta_time * FPS * self.playback_speed
-        if self.frame_index >= self.n_frames:
-            self.frame_index = float(self.n_frames - 1)
+        self.frame_index += delta_time * self.frames.fps * self.playback_speed
+        if self.frame_index >= self.last_frame:
+            self.frame_index = float(self.last_frame)
 
     def on_key_press(self, symbol: int, modifiers: int):
+        if self.seek_input is not None and self._handle_seek_input(symbol):
+            return
         if symbol == arcade.key.SPACE:
             self.paused = not self.paused
         elif symbol == arcade.key.RIGHT:
-            self.frame_index = min(self.frame_index + 10.0, self.n_frames - 1)
+            self.frame_index = min(self.frame_index + ARROW_STEP_SECONDS * self.frames.fps, float(self.last_frame))
         elif symbol == arcade.key.LEFT:
-            self.frame_index = max(self.frame_index - 10.0, 0.0)
+            self.frame_index = max(self.frame_index - ARROW_STEP_SECONDS * self.frames.fps, 0.0)
         elif symbol == arcade.key.UP:
             self.playback_speed *= 2.0
         elif symbol == arcade.key.DOWN:
@@ -442,6 +433,20 @@ class F1RaceReplayWindow(arcade.Window):
             self.playback_speed = 1.0
         elif symbol == arcade.key.B:
             self.progress_bar_comp.toggle_visibility() # toggle progress bar visibility
+        elif symbol == arcade.key.T:
+            self.show_text_stats = not self.show_text_stats
+        elif symbol == arcade.key.D:
+            self.show_drs_zones = not self.show_drs_zones
+        elif symbol == arcade.key.BRACKETRIGHT:
+            self._step_lap(1)
+        elif symbol == arcade.key.BRACKETLEFT:
+            self._step_lap(-1)
+        elif symbol == arcade.key.PERIOD:
+            self.seek_event(1)
+        elif symbol == arcade.key.COMMA:
+            self.seek_event(-1)
+        elif symbol == arcade.key.G:
+            self.seek_input = ""
 
     def on_mouse_press(self, x: float, y: float, button: int, modifiers: int):
         # forward to components; stop at first that handled it
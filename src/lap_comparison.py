@@ -0,0 +1,180 @@
+import numpy as np
+
+from src.f1_data import FPS, Resampler
+
+# Channels put on the shared distance grid; gear is held (step), the rest interpolated
+COMPARISON_LINEAR_CHANNELS = ("t", "speed", "throttle", "brake")
+COMPARISON_STEP_CHANNELS = ("gear",)
+
+# Grid points per compared lap pair
+COMPARISON_POINTS = 1000
+
+# Channels of the ghost laps, resampled on a shared lap-time grid
+GHOST_CHANNELS = ("x", "y", "dist")
+
+
+class LapComparison:
+    """
+    Two laps on a shared distance grid (`distance`, metres from the lap start).
+
+    `reference` and `other` map every compared channel to its values along the
+    grid. Deltas are other minus reference, so a positive `delta_time` means
+    the other lap is behind at that point of the lap.
+    """
+
+    def __init__(self, distance, reference, other):
+        self.distance = distance
+        self.reference = reference
+        self.other = other
+        self.delta_time = other["t"] - reference["t"]
+        self.speed_delta = other["speed"] - reference["speed"]
+        self.throttle_delta = other["throttle"] - reference["throttle"]
+        self.brake_delta = other["brake"] - reference["brake"]
+
+    def delta_at(self, dist):
+        """Cumulative time delta (s) at a distance into the lap."""
+        return float(np.interp(dist, self.distance, self.delta_time))
+
+
+def _pair_grid(reference, other, n_points):
+    # Only the stretch both laps cover, so neither is extrapolated
+    ref_dist = reference.channel("dist")
+    other_dist = other.channel("dist")
+    start = max(float(ref_dist.min()), float(other_dist.min()))
+    stop = min(float(ref_dist.max()), float(other_dist.max()))
+    return np.linspace(start, max(start, stop), n_points)
+
+
+def _resample_batch(segments, axis="dist", linear_channels=COMPARISON_LINEAR_CHANNELS,
+                    step_channels=COMPARISON_STEP_CHANNELS):
+    """
+    Resample every (lap, grid) pair in one go: the laps are laid end to end on
+    one `axis` channel (each offset past the previous one), so a single
+    Resampler search covers all of them.
+    """
+    axes = [np.asarray(lap.channel(axis), dtype=float) for lap, _ in segments]
+    stride = max(a.max() for a in axes) - min(a.min() for a in axes) + 1.0
+    offsets = stride * np.arange(len(segments))
+
+    # Grid points outside a lap are clamped to it (held at its ends, as np.interp does)
+    resampler = Resampler(
+        np.concatenate([a + offset for a, offset in zip(axes, offsets)]),
+        np.concatenate([
+            np.clip(grid, a[0], a[-1]) + offset for a, (_, grid), offset in zip(axes, segments, offsets)
+        ]),
+    )
+
+    def stacked(names):
+        return np.vstack([np.concatenate([lap.channel(name) for lap, _ in segments]) for name in names])
+
+    linear = resampler.linear(stacked(linear_channels)) if linear_channels else None
+    step = resampler.step(stacked(step_channels)) if step_channels else None
+
+    bounds = np.cumsum([0] + [len(grid) for _, grid in segments])
+    resampled = []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        values = dict(zip(linear_channels, linear[:, lo:hi])) if linear is not None else {}
+        if step is not None:
+            values.update(zip(step_channels, step[:, lo:hi]))
+        resampled.append(values)
+    return resampled
+
+
+def compare_laps(reference, others, n_points=COMPARISON_POINTS):
+    """
+    Compare a lap (LapFrames) with each lap in `others`. All pairs are
+    resampled in one vectorised batch; returns a LapComparison per other lap.
+    """
+    if not others:
+        return []
+    grids = [_pair_grid(reference, other, n_points) for other in others]
+    segments = [(lap, grid) for other, grid in zip(others, grids) for lap in (reference, other)]
+    resampled = _resample_batch(segments)
+    return [
+        LapComparison(grid, resampled[2 * i], resampled[2 * i + 1])
+        for i, grid in enumerate(grids)
+    ]
+
+
+class LapComparer:
+    """
+    Lap comparisons cached per (reference, other) lap pair. Laps are keyed by
+    the caller (e.g. (driver, segment)); only pairs not seen before are
+    computed, in one batch per call.
+    """
+
+    def __init__(self, n_points=COMPARISON_POINTS):
+        self.n_points = n_points
+        self._pairs = {}
+
+    def __len__(self):
+        return len(self._pairs)
+
+    def compare(self, reference_key, reference, others):
+        """{key: LapComparison} of `reference` against every lap in `others` ({key: LapFrames})."""
+        missing = [key for key in others if (reference_key, key) not in self._pairs]
+        if missing:
+            comparisons = compare_laps(reference, [others[key] for key in missing], self.n_points)
+            for key, comparison in zip(missing, comparisons):
+                self._pairs[(reference_key, key)] = comparison
+        return {key: self._pairs[(reference_key, key)] for key in others}
+
+
+class GhostLaps:
+    """
+    Several drivers' laps played at once, aligned on lap time.
+
+    `x`, `y` and `dist` are [n_drivers, n_samples] arrays on a shared grid of
+    `fps` samples per second from the start of the lap; a driver who has
+    finished stays at the line. `order` holds the running classification at
+    every sample ([n_samples, n_drivers] row indices): finished laps by lap
+    time, then the laps still running by distance covered. Everything is
+    worked out up front, so playback only indexes these arrays.
+    """
+
+    def __init__(self, codes, lap_times, t, x, y, dist):
+        self.codes = list(codes)
+        self.lap_times = lap_times
+        self.t = t
+        self.x = x
+        self.y = y
+        self.dist = dist
+
+        finished = t[None, :] >= lap_times[:, None]
+        # Finished laps sort before running ones, by lap time; running ones by distance (further first)
+        offset = float(np.abs(dist).max()) + float(t[-1]) + 1.0
+        key = np.where(finished, lap_times[:, None] - offset, -dist)
+        self.order = np.argsort(key, axis=0, kind="stable").T.astype(np.int16)
+        self.finished = finished.sum(axis=0)
+
+    @classmethod
+    def from_telemetry(cls, telemetry, segment, fps=FPS):
+        """
+        Ghosts of every driver's fastest lap in `segment`, from the qualifying
+        telemetry ({code: {segment: {"frames": LapFrames, ...}}}). Drivers
+        without a lap in the segment are left out; returns None if nobody has one.
+        """
+        laps = {
+            code: block[segment]["frames"]
+            for code, block in telemetry.items()
+            if block.get(segment) and len(block[segment].get("frames", [])) > 1
+        }
+        if not laps:
+            return None
+
+        codes = list(laps)
+        lap_times = np.array([float(laps[code].channel("t")[-1] - laps[code].channel("t")[0]) for code in codes])
+        t = np.arange(0.0, lap_times.max() + 1.0 / fps, 1.0 / fps)
+        resampled = _resample_batch(
+            [(laps[code], t + float(laps[code].channel("t")[0])) for code in codes],
+            axis="t", linear_channels=GHOST_CHANNELS, step_channels=(),
+        )
+        x, y, dist = (np.vstack([values[name] for values in resampled]) for name in GHOST_CHANNELS)
+        return cls(codes, lap_times, t, x, y, dist)
+
+    def __len__(self):
+        return len(self.t)
+
+    def sample_at(self, t):
+        """Grid index at a time into the lap (clamped to the grid)."""
+        return int(min(max(np.searchsorted(self.t, t, side="right") - 1, 0), len(self.t) - 1))
@@ -0,0 +1,98 @@
+import numpy as np
+
+# FastF1 DRS codes 10, 12 and 14 mean the flap is open (8 = eligible, lower = closed)
+DRS_OPEN = 10
+
+
+def drs_edges(values, threshold=DRS_OPEN):
+  """
+  (opened, closed) index arrays of every run where `values` >= threshold: the
+  first open sample and the first closed sample after it (-1 if the run lasts
+  to the end). A run that is already open at the first sample is skipped, like
+  the frame-by-frame check this replaces. One np.diff over the thresholded
+  channel, so it works as well on a 150k-frame race as on a single lap.
+  """
+  is_open = np.asarray(values) >= threshold
+  edges = np.diff(is_open.astype(np.int8))
+  opened = np.flatnonzero(edges == 1) + 1
+  if not opened.size:
+    return opened, opened.copy()
+  closed = np.flatnonzero(edges == -1) + 1
+  closed = closed[closed > opened[0]]
+  return opened, np.concatenate([closed, np.full(opened.size - closed.size, -1, dtype=closed.dtype)])
+
+
+def detect_drs_zones(drs, dist, threshold=DRS_OPEN):
+  """DRS zones of a lap as [{"zone_start": dist, "zone_end": dist or None}, ...]."""
+  opened, closed = drs_edges(drs, threshold)
+  dist = np.asarray(dist, dtype=float)
+  return [
+    {"zone_start": float(dist[o]), "zone_end": float(dist[c]) if c >= 0 else None}
+    for o, c in zip(opened, closed)
+  ]
+
+
+def race_drs_zones(store, reference, min_share=0.5):
+  """
+  DRS zones of a race as (start, end) vertex indices on `reference` (a
+  ReferencePolyline); end < start means the zone crosses the line.
+
+  Every driver's DRS openings come from the drs channel's change points (a
+  StepChannel) or its dense column, are projected onto the reference lap and
+  accumulated per vertex. Stretches used by at least `min_share` of the
+  busiest point's openings are the zones.
+  """
+  drs = store.channels["drs"]
+  n_frames = store.ready_frames
+  open_frames, close_frames, cols = [], [], []
+  for col in range(store.n_drivers):
+    if hasattr(drs, "column"):
+      frames, values = drs.column(col)
+    else:
+      frames, values = np.arange(n_frames), drs[:n_frames, col]
+    opened, closed = drs_edges(values)
+    keep = closed >= 0
+    opened, closed = frames[opened[keep]], frames[closed[keep]]
+    keep = closed < n_frames
+    open_frames.append(opened[keep])
+    close_frames.append(closed[keep])
+    cols.append(np.full(keep.sum(), col))
+
+  if not cols:
+    return []
+  open_frames = np.concatenate(open_frames).astype(np.int64)
+  close_frames = np.concatenate(close_frames).astype(np.int64)
+  cols = np.concatenate(cols).astype(np.int64)
+  if not cols.size:
+    return []
+
+  def along(frames):
+    xs = store.decode("x", store.channels["x"][frames, cols])
+    ys = store.decode("y", store.channels["y"][frames, cols])
+    return np.searchsorted(reference.cumdist, reference.project(xs, ys))
+
+  n_points = len(reference.cumdist)
+  start, end = along(open_frames), along(close_frames)
+
+  # Drop implausible openings (more than half a lap long, e.g. a car stopping with the flap open)
+  length = (end - start) % n_points
+  keep = (length > 0) & (length < n_points // 2)
+  start, end = start[keep], end[keep]
+  if not start.size:
+    return []
+
+  # Coverage per vertex via a difference array; wrapping zones also cover from vertex 0
+  coverage = np.zeros(n_points + 1)
+  np.add.at(coverage, start, 1)
+  np.add.at(coverage, end, -1)
+  coverage[0] += np.count_nonzero(end < start)
+  coverage = np.cumsum(coverage)[:n_points]
+
+  active = np.concatenate([[0], coverage >= min_share * coverage.max(), [0]])
+  opened, closed = drs_edges(active, threshold=1)
+  zones = [(int(o) - 1, int(c) - 1) for o, c in zip(opened, closed)]
+
+  # A zone that runs through the last vertex continues from the first one
+  if len(zones) > 1 and zones[0][0] == 0 and zones[-1][1] == n_points:
+    zones = [(zones[-1][0], zones[0][1])] + zones[1:-1]
+  return zones
@@ -0,0 +1,49 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class ReferencePolyline:
+  """
+  A lap's X/Y trace resampled to evenly spaced points, used to measure how far
+  along the lap any position is. Units follow the input (FastF1 X/Y are 1/10 m).
+  """
+
+  def __init__(self, xs, ys, n_points=4000):
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    param = np.linspace(0.0, 1.0, len(xs))
+    samples = np.linspace(0.0, 1.0, n_points)
+    self.xs = np.interp(samples, param, xs)
+    self.ys = np.interp(samples, param, ys)
+
+    seg_len = np.hypot(np.diff(self.xs), np.diff(self.ys))
+    self.cumdist = np.concatenate(([0.0], np.cumsum(seg_len)))
+    self.total_length = float(self.cumdist[-1])
+    self._tree = cKDTree(np.column_stack([self.xs, self.ys]))
+
+  def project(self, xs, ys):
+    """
+    Distance along the polyline of each (x, y): nearest vertex, then projected
+    onto the segment that starts there (clamped to the segment). Vectorised
+    over any number of points.
+    """
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    _, idx = self._tree.query(np.column_stack([xs.ravel(), ys.ravel()]))
+    idx = np.minimum(idx, len(self.xs) - 2)
+
+    x1, y1 = self.xs[idx], self.ys[idx]
+    dx = self.xs[idx + 1] - x1
+    dy = self.ys[idx + 1] - y1
+    seg_len_sq = dx * dx + dy * dy
+    with np.errstate(invalid="ignore", divide="ignore"):
+      t = ((xs.ravel() - x1) * dx + (ys.ravel() - y1) * dy) / seg_len_sq
+    t = np.clip(np.nan_to_num(t), 0.0, 1.0)
+
+    along = self.cumdist[idx] + t * np.sqrt(seg_len_sq)
+    return along.reshape(xs.shape)
+
+  def progress(self, laps, xs, ys):
+    """Race progress: completed laps × reference length + distance into the current lap."""
+    completed = np.maximum(np.asarray(laps, dtype=float), 1.0) - 1.0
+    return completed * self.total_length + self.project(xs, ys)
@@ -0,0 +1,102 @@
+import numpy as np
+
+# FastF1 track status codes
+GREEN = "1"
+YELLOW = "2"
+SAFETY_CAR = "4"
+RED = "5"
+VSC_DEPLOYED = "6"
+VSC_ENDING = "7"
+
+# Track outline colour per status (anything not listed draws as normal grey)
+DEFAULT_TRACK_COLOR = (150, 150, 150)
+STATUS_TRACK_COLORS = {
+  YELLOW: (220, 180, 0),       # caution
+  SAFETY_CAR: (180, 100, 30),  # safety car (darker brown)
+  RED: (200, 30, 30),          # red-flag
+  VSC_DEPLOYED: (200, 130, 50),  # virtual safety car / amber-brown
+  VSC_ENDING: (200, 130, 50),
+}
+
+# HUD banner (text, colour) per status
+STATUS_LABELS = {
+  YELLOW: ("YELLOW FLAG", (255, 255, 0)),
+  RED: ("RED FLAG", (255, 0, 0)),
+  VSC_DEPLOYED: ("VIRTUAL SAFETY CAR", (255, 165, 0)),
+  SAFETY_CAR: ("SAFETY CAR", (165, 42, 42)),
+}
+
+
+class TrackStatusIndex:
+  """
+  Track status periods as sorted interval arrays.
+
+  Built once from the pipeline's `track_statuses` list (dicts with status,
+  start_time and end_time in timeline seconds; end_time None = until the end).
+  `index_at(t)` is a binary search, short-circuited while playback stays
+  inside the previously found interval, so per-frame lookups are amortised O(1).
+  """
+
+  def __init__(self, starts, ends, codes):
+    self.starts = np.asarray(starts, dtype=float)
+    self.ends = np.asarray(ends, dtype=float)
+    self.codes = [str(code) for code in codes]
+    self._last = -1
+
+  @classmethod
+  def from_statuses(cls, track_statuses):
+    statuses = sorted(track_statuses or [], key=lambda s: s.get("start_time", 0))
+    starts = [s.get("start_time", 0) for s in statuses]
+    ends = [np.inf if s.get("end_time") is None else s["end_time"] for s in statuses]
+    codes = [s.get("status", "") for s in statuses]
+    return cls(starts, ends, codes)
+
+  def __len__(self):
+    return len(self.codes)
+
+  def __iter__(self):
+    # (code, start_time, end_time or None) per period, in time order
+    for code, start, end in zip(self.codes, self.starts, self.ends):
+      yield code, float(start), None if np.isinf(end) else float(end)
+
+  def index_at(self, t):
+    """Index of the status period active at time `t`, or -1 if none is."""
+    last = self._last
+    if last >= 0 and self.starts[last] <= t < self.ends[last]:
+      return last
+    i = int(np.searchsorted(self.starts, t, side="right")) - 1
+    if i < 0 or t >= self.ends[i]:
+      return -1
+    self._last = i
+    return i
+
+  def code_at(self, t):
+    i = self.index_at(t)
+    return self.codes[i] if i >= 0 else GREEN
+
+  def track_color_at(self, t):
+    return STATUS_TRACK_COLORS.get(self.code_at(t), DEFAULT_TRACK_COLOR)
+
+  def label_at(self, t):
+    """(text, colour) for the HUD banner, or None when there's nothing to show."""
+    return STATUS_LABELS.get(self.code_at(t))
+
+  def frame_ranges(self, timeline, n_frames=None, default_seconds=10):
+    """
+    (code, start_frame, end_frame) per period, located on the frames' own
+    `timeline` (race seconds per frame), so a store sliced to a range of laps
+    gets frames relative to its first one. Open-ended periods last
+    `default_seconds`; frames are clamped to [0, n_frames] (the whole timeline
+    by default) and periods entirely outside it are left out.
+    """
+    timeline = np.asarray(timeline, dtype=float)
+    n_frames = len(timeline) if n_frames is None else min(n_frames, len(timeline))
+    ends = np.where(np.isinf(self.ends), self.starts + default_seconds, self.ends)
+    # Each time maps to the frame at or just before it, like int(t * fps) on a full race
+    start_frames = np.clip(np.searchsorted(timeline, self.starts, side="right") - 1, 0, n_frames)
+    end_frames = np.clip(np.searchsorted(timeline, ends, side="right") - 1, 0, n_frames)
+    return [
+      (code, int(start), int(end))
+      for code, start, end in zip(self.codes, start_frames, end_frames)
+      if end > start
+    ]
@@ -0,0 +1,68 @@
+import numpy as np
+
+
+class ScreenTransform:
+  """
+  World-to-screen mapping as a 2×3 affine matrix: rotate about the track centre,
+  then scale and translate. `apply` maps whole coordinate arrays in one call.
+  """
+
+  def __init__(self, matrix=None):
+    self.matrix = np.array(matrix if matrix is not None else [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], dtype=float)
+
+  @classmethod
+  def fit(cls, xs, ys, left, bottom, width, height, rotation=0.0, center=None, padding=0.05):
+    """
+    Fit the (rotated) points inside the screen rectangle, keeping the aspect
+    ratio and `padding` (fraction of each side) free. Rotation is in degrees
+    about `center` (the points' bounding-box centre by default); the centre
+    lands in the middle of the rectangle.
+    """
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    if center is None:
+      center = ((xs.min() + xs.max()) / 2, (ys.min() + ys.max()) / 2) if xs.size else (0.0, 0.0)
+    cx, cy = center
+
+    rad = np.deg2rad(rotation) if rotation else 0.0
+    cos_r, sin_r = np.cos(rad), np.sin(rad)
+    rotation_only = cls([[cos_r, -sin_r, cx - cos_r * cx + sin_r * cy],
+                         [sin_r, cos_r, cy - sin_r * cx - cos_r * cy]])
+
+    if xs.size:
+      rx, ry = rotation_only.apply(xs, ys)
+      world_w = max(1.0, float(rx.max() - rx.min()))
+      world_h = max(1.0, float(ry.max() - ry.min()))
+    else:
+      world_w = world_h = 1.0
+
+    usable_w = width * (1 - 2 * padding)
+    usable_h = height * (1 - 2 * padding)
+    scale = min(usable_w / world_w, usable_h / world_h)
+
+    # The rotation keeps the centre fixed, so it maps straight to the rectangle's centre
+    tx = left + width / 2 - scale * cx
+    ty = bottom + height / 2 - scale * cy
+    scaled = scale * rotation_only.matrix
+    scaled[:, 2] += (tx, ty)
+    return cls(scaled)
+
+  @property
+  def scale(self):
+    return float(np.hypot(self.matrix[0, 0], self.matrix[1, 0]))
+
+  def apply(self, xs, ys):
+    """Map world coordinate arrays to screen coordinate arrays."""
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    (a, b, c), (d, e, f) = self.matrix
+    return a * xs + b * ys + c, d * xs + e * ys + f
+
+  def apply_point(self, x, y):
+    (a, b, c), (d, e, f) = self.matrix
+    return a * x + b * y + c, d * x + e * y + f
+
+  def apply_points(self, xs, ys):
+    """Screen points as an (n, 2) array, ready for line strips."""
+    sx, sy = self.apply(xs, ys)
+    return np.column_stack([sx, sy])
@@ -0,0 +1,78 @@
+import numpy as np
+
+# Replay weather fields and the FastF1 weather_data columns they come from
+WEATHER_COLUMNS = {
+  "track_temp": "TrackTemp",
+  "air_temp": "AirTemp",
+  "humidity": "Humidity",
+  "wind_speed": "WindSpeed",
+  "wind_direction": "WindDirection",
+  "rainfall": "Rainfall",
+}
+
+WEATHER_CHANNELS = tuple(WEATHER_COLUMNS)
+
+
+class WeatherSeries:
+  """
+  Weather samples at their native rate (FastF1 reports about once a minute),
+  looked up by replay time. Values are linearly interpolated between the two
+  neighbouring samples and held at the ends, like the old per-frame resampling.
+  """
+
+  def __init__(self, times, channels):
+    self.times = np.asarray(times, dtype=float)
+    # Channels FastF1 didn't provide are simply absent (reported as None)
+    self.channels = {
+      name: np.asarray(values, dtype=float)
+      for name, values in channels.items()
+      if values is not None
+    }
+
+  @classmethod
+  def from_session_weather(cls, weather, t_offset=0.0):
+    """
+    Build from FastF1 weather columns (a dict with "Time" in session seconds
+    plus WEATHER_COLUMNS names). `t_offset` is subtracted so times line up with
+    the replay timeline. Returns None if there are no samples.
+    """
+    if weather is None or len(weather.get("Time", ())) == 0:
+      return None
+    times = np.asarray(weather["Time"], dtype=float) - t_offset
+    order = np.argsort(times, kind="stable")
+    channels = {}
+    for name, column in WEATHER_COLUMNS.items():
+      if column in weather:
+        channels[name] = np.asarray(weather[column]).astype(float)[order]
+    return cls(times[order], channels)
+
+  def __len__(self):
+    return len(self.times)
+
+  def __bool__(self):
+    return len(self.times) > 0
+
+  def at(self, t):
+    """Weather dict (the WeatherComponent format) at replay time `t`."""
+    last = len(self.times) - 1
+    hi = int(np.searchsorted(self.times, t, side="right"))
+    lo = min(max(hi - 1, 0), last)
+    hi = min(hi, last)
+    span = self.times[hi] - self.times[lo]
+    weight = min(max((t - self.times[lo]) / span, 0.0), 1.0) if span > 0 else 0.0
+
+    def _value(name):
+      values = self.channels.get(name)
+      if values is None:
+        return None
+      return float(values[lo] + (values[hi] - values[lo]) * weight)
+
+    rain_val = _value("rainfall") or 0.0
+    return {
+      "track_temp": _value("track_temp"),
+      "air_temp": _value("air_temp"),
+      "humidity": _value("humidity"),
+      "wind_speed": _value("wind_speed"),
+      "wind_direction": _value("wind_direction"),
+      "rain_state": "RAINING" if rain_val >= 0.5 else "DRY",
+    }
@@ -0,0 +1,114 @@
+import queue
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from src.frame_store import FrameStore
+
+
+class SharedArrays:
+    """
+    Named NumPy arrays backed by multiprocessing shared memory.
+
+    The background pipeline creates them and passes `spec` (block name, shape
+    and dtype per array) to the replay process, which attaches to the same
+    memory. The attaching side owns the blocks and unlinks them on close().
+    """
+
+    def __init__(self, blocks, spec):
+        self._blocks = blocks
+        self.spec = spec
+        self.arrays = {
+            name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=blocks[name].buf)
+            for name, (_, shape, dtype) in spec.items()
+        }
+
+    @classmethod
+    def create(cls, layout):
+        """Allocate zeroed arrays for a {name: (shape, dtype)} layout."""
+        blocks, spec = {}, {}
+        for name, (shape, dtype) in layout.items():
+            size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            block = shared_memory.SharedMemory(create=True, size=size)
+            # The replay process cleans up; don't let this process's tracker unlink it on exit
+            resource_tracker.unregister(block._name, "shared_memory")
+            blocks[name] = block
+            spec[name] = (block.name, tuple(shape), np.dtype(dtype).str)
+        shared = cls(blocks, spec)
+        for array in shared.arrays.values():
+            array.fill(0)
+        return shared
+
+    @classmethod
+    def attach(cls, spec):
+        blocks = {name: shared_memory.SharedMemory(name=block_name) for name, (block_name, _, _) in spec.items()}
+        return cls(blocks, spec)
+
+    def close(self, unlink=False):
+        self.arrays = {}
+        for block in self._blocks.values():
+            try:
+                block.close()
+            except BufferError:
+                # Something still holds a view; the mapping goes away with the process
+                pass
+            if unlink:
+                try:
+                    block.unlink()
+                except FileNotFoundError:
+                    pass
+        self._blocks = {}
+
+
+class ProgressiveFrameStore(FrameStore):
+    """
+    A FrameStore that is still being filled by a background process.
+
+    Channels are dense shared-memory arrays (step channels included) in the
+    CHANNEL_SCHEMA encoding. Frames before `ready_frames` hold data; the worker
+    advances that counter after each chunk it publishes. If it fails instead,
+    it puts {"error": ...} on `messages` and `build_error()` reports it.
+    """
+
+    def __init__(self, timeline, driver_codes, shared, ready, fps, weather=None, scales=None, worker=None,
+                 messages=None):
+        channels = {name: array for name, array in shared.arrays.items() if name != "order"}
+        super().__init__(
+            timeline, driver_codes, channels, fps,
+            weather=weather, order=shared.arrays["order"], scales=scales,
+        )
+        self._shared = shared
+        self._ready = ready
+        self._worker = worker
+        self._messages = messages
+        self._error = None
+
+    @property
+    def ready_frames(self):
+        return min(int(self._ready.value), len(self))
+
+    def build_error(self):
+        """
+        The worker's error once it has stopped short of the last frame, else
+        None. Never blocks, so the replay window can poll it every update.
+        """
+        if self._error is not None or self.ready_frames >= len(self):
+            return self._error
+        if self._messages is not None:
+            try:
+                message = self._messages.get_nowait()
+            except queue.Empty:
+                message = None
+            if message and "error" in message:
+                self._error = message["error"]
+        if self._error is None and self._worker is not None and self._worker.exitcode is not None:
+            self._error = f"worker exited with code {self._worker.exitcode}"
+        return self._error
+
+    def close(self):
+        if self._worker is not None and self._worker.is_alive():
+            print("Finishing the telemetry cache in the background...")
+            self._worker.join()
+        self.channels = {}
+        self.order = None
+        self._shared.close(unlink=True)
@@ -0,0 +1,235 @@
+import arcade
+import numpy as np
+import pyglet
+from arcade.gl import BufferDescription
+from arcade.shape_list import ShapeElementList, create_line_strip
+from arcade.types import Color
+
+
+class TrackRenderer:
+    """
+    Track outlines kept as GPU geometry.
+
+    Polylines are uploaded once per layout (`set_polylines`) and the resulting
+    ShapeElementList is reused every frame. Geometry is cached per colour, so a
+    track-status change costs one rebuild and switching back is free; a new
+    layout (resize, rotation) drops the cache.
+    """
+
+    def __init__(self, line_width=4):
+        self.line_width = line_width
+        self.key = None
+        self._polylines = []
+        self._shapes = {}
+
+    def set_polylines(self, polylines, key=None):
+        """
+        Replace the screen-space polylines (sequences of (x, y) or (n, 2) arrays).
+        Passing the current `key` again is a no-op.
+        """
+        if key is not None and key == self.key:
+            return
+        self.key = key
+        self._polylines = [
+            list(map(tuple, np.asarray(points, dtype=float).tolist()))
+            for points in polylines
+            if len(points) > 1
+        ]
+        self._shapes.clear()
+
+    def _build(self, color):
+        shapes = ShapeElementList()
+        for points in self._polylines:
+            shapes.append(create_line_strip(points, color, self.line_width))
+        return shapes
+
+    def draw(self, color):
+        if not self._polylines:
+            return
+        color = Color.from_iterable(color)
+        shapes = self._shapes.get(color)
+        if shapes is None:
+            shapes = self._shapes[color] = self._build(color)
+        shapes.draw()
+
+
+class CarSprites:
+    """
+    One circle sprite per driver in a single SpriteList. Positions are updated
+    in place each frame and the whole field is drawn in one call.
+    """
+
+    def __init__(self, codes, colors, radius=6):
+        self.codes = list(codes)
+        self.sprite_list = arcade.SpriteList(capacity=max(1, len(self.codes)))
+        self.sprites = []
+        for code in self.codes:
+            sprite = arcade.SpriteCircle(radius, Color.from_iterable(colors.get(code, arcade.color.WHITE)))
+            self.sprites.append(sprite)
+            self.sprite_list.append(sprite)
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def update_positions(self, xs, ys):
+        for sprite, x, y in zip(self.sprites, xs, ys):
+            sprite.position = (float(x), float(y))
+
+    def draw(self):
+        self.sprite_list.draw()
+
+
+class GhostMarkers:
+    """
+    Round markers for a whole field, drawn with one instanced render call.
+
+    The marker shape (a triangle fan) and the per-marker colours are uploaded
+    once. Each draw only writes the centres, straight from the coordinate
+    arrays, into a buffer allocated up front, so moving twenty cars costs no
+    per-car Python work and creates no GPU objects.
+    """
+
+    VERTEX_SHADER = """
+    #version 330
+
+    uniform WindowBlock {
+        mat4 projection;
+        mat4 view;
+    } window;
+
+    in vec2 in_offset;
+    in vec2 in_centre;
+    in vec4 in_color;
+
+    out vec4 v_color;
+
+    void main() {
+        gl_Position = window.projection * window.view * vec4(in_centre + in_offset, 0.0, 1.0);
+        v_color = in_color;
+    }
+    """
+
+    FRAGMENT_SHADER = """
+    #version 330
+
+    in vec4 v_color;
+    out vec4 f_color;
+
+    void main() {
+        f_color = v_color;
+    }
+    """
+
+    def __init__(self, colors, radius=6, segments=10, alpha=200):
+        self.radius = radius
+        self.n_markers = len(colors)
+        self._centres = np.zeros((self.n_markers, 2), dtype=np.float32)
+        if not self.n_markers:
+            return
+
+        # Triangle fan around the centre: (centre, rim[i], rim[i + 1]) per segment
+        angles = np.linspace(0.0, 2 * np.pi, segments + 1)
+        rim = np.column_stack([np.cos(angles), np.sin(angles)]) * radius
+        fan = np.stack([np.zeros((segments, 2)), rim[:-1], rim[1:]], axis=1).reshape(-1, 2)
+        rgba = np.array([tuple(Color.from_iterable(color)[:3]) + (alpha,) for color in colors], dtype=np.uint8)
+
+        self._ctx = arcade.get_window().ctx
+        self._centre_buffer = self._ctx.buffer(reserve=self._centres.nbytes, usage="stream")
+        self._program = self._ctx.program(vertex_shader=self.VERTEX_SHADER, fragment_shader=self.FRAGMENT_SHADER)
+        self._geometry = self._ctx.geometry(
+            [
+                BufferDescription(self._ctx.buffer(data=fan.astype(np.float32)), "2f", ["in_offset"]),
+                BufferDescription(self._centre_buffer, "2f", ["in_centre"], instanced=True),
+                BufferDescription(self._ctx.buffer(data=rgba), "4f1", ["in_color"], normalized=["in_color"], instanced=True),
+            ],
+            mode=self._ctx.TRIANGLES,
+        )
+
+    def __len__(self):
+        return self.n_markers
+
+    def draw(self, xs, ys):
+        if not self.n_markers:
+            return
+        self._centres[:, 0] = xs
+        self._centres[:, 1] = ys
+        self._centre_buffer.write(self._centres)
+        with self._ctx.enabled(self._ctx.BLEND):
+            self._geometry.render(self._program, instances=self.n_markers)
+
+
+class TextCache:
+    """
+    Retained arcade.Text labels keyed by slot (any hashable, e.g. ("row", 3)).
+
+    A label is created the first time its slot is drawn; after that only the
+    attributes that actually changed (text, position, colour) are written back,
+    so glyphs are laid out again only when the text itself changes. Font size,
+    weight and anchors are part of the label's style: changing them replaces it.
+    """
+
+    # Text objects created by every cache, for the per-frame allocation counter
+    allocations = 0
+
+    def __init__(self):
+        self._labels = {}
+
+    def __len__(self):
+        return len(self._labels)
+
+    def get(self, slot, text, x, y, color=arcade.color.WHITE, font_size=12, **style):
+        text = str(text)
+        color = Color.from_iterable(color)
+        style_key = (font_size, tuple(sorted(style.items())))
+
+        entry = self._labels.get(slot)
+        if entry is None or entry[1] != style_key:
+            label = arcade.Text(text, x, y, color, font_size, **style)
+            self._labels[slot] = (label, style_key)
+            TextCache.allocations += 1
+            return label
+
+        label = entry[0]
+        if label.text != text:
+            label.text = text
+        if label.x != x or label.y != y:
+            label.position = (x, y)
+        if label.color != color:
+            label.color = color
+        return label
+
+    def draw(self, slot, text, x, y, color=arcade.color.WHITE, font_size=12, **style):
+        label = self.get(slot, text, x, y, color, font_size, **style)
+        label.draw()
+        return label
+
+
+class TextBlock:
+    """
+    Static lines of text (legends, key help) laid out once into a pyglet batch
+    and drawn with a single call. Moving the block only shifts the labels.
+    Each line is (text, color, font_size, bold); lines stack downwards from (x, y).
+    """
+
+    def __init__(self, lines, x, y, line_height=25, **style):
+        self.batch = pyglet.graphics.Batch()
+        self.x = x
+        self.y = y
+        self.line_height = line_height
+        self.labels = []
+        for i, (text, color, font_size, bold) in enumerate(lines):
+            self.labels.append(arcade.Text(
+                text, x, y - i * line_height, color, font_size,
+                bold=bold, batch=self.batch, **style
+            ))
+        TextCache.allocations += len(self.labels)
+
+    def move_to(self, x, y):
+        if (x, y) == (self.x, self.y):
+            return
+        self.x, self.y = x, y
+        for i, label in enumerate(self.labels):
+            label.position = (x, y - i * self.line_height)
+
+    def draw(self):
+        self.batch.draw()
@@ -0,0 +1,473 @@
+import os
+import re
+import sys
+import json
+import glob
+import shutil
+import pickle
+import hashlib
+
+import numpy as np
+
+from src.frame_store import (
+    QUALI_LAP_CHANNELS,
+    FrameStore,
+    LapFrames,
+    SeekIndex,
+    StepChannel,
+    lap_window,
+)
+from src.lib.weather import WEATHER_CHANNELS, WeatherSeries
+
+# On-disk format for computed telemetry.
+#
+# Each cache entry is a directory holding a small JSON manifest (drivers, colours,
+# track statuses, lap counts, ...) and one .npy file per array channel. Arrays are
+# opened with np.load(mmap_mode="r"), so opening a cache only reads the manifest
+# and the .npy headers; pages are read from disk when a frame is actually shown.
+# Discrete channels (lap, tyre, gear, DRS) are stored as StepChannel change
+# points under steps/<name>/ instead of dense per-frame arrays.
+#
+# Race manifests also index the first frame of every leader lap ("lap_frames").
+# Frames are stored frame-major, so a lap range is one contiguous block of each
+# array and loading only laps 40-55 reads only those pages.
+
+CACHE_DIR = "computed_data"
+FORMAT_VERSION = 6
+MANIFEST_NAME = "manifest.json"
+
+# Cache folder suffix per FastF1 session identifier
+CACHE_SUFFIXES = {"R": "race", "S": "sprint", "Q": "quali", "SQ": "sprintquali"}
+
+
+
+def cache_path(year, round_number, session_type):
+    """Cache location for a session, derived without loading anything from FastF1."""
+    return os.path.join(CACHE_DIR, f"{year}_R{int(round_number):02d}_{CACHE_SUFFIXES[session_type]}_telemetry")
+
+
+def legacy_pickle_path(event_name, session_type):
+    """Pickle file written by older versions (named after str(session))."""
+    return os.path.join(CACHE_DIR, f"{event_name}_{CACHE_SUFFIXES[session_type]}_telemetry.pkl")
+
+
+def _json_default(value):
+    # numpy scalars sneak in from pandas / numpy reductions
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _write_arrays(path, arrays):
+    for name, array in arrays.items():
+        file_path = os.path.join(path, f"{name}.npy")
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        np.save(file_path, np.ascontiguousarray(array))
+
+
+def _write_manifest(path, manifest):
+    tmp_manifest = os.path.join(path, MANIFEST_NAME + ".tmp")
+    with open(tmp_manifest, "w") as f:
+        json.dump(manifest, f, default=_json_default)
+    os.replace(tmp_manifest, os.path.join(path, MANIFEST_NAME))
+
+
+def _write_cache_dir(path, manifest, arrays):
+    """Write the manifest + arrays to a temp dir and swap it in, so a crash never leaves half a cache."""
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+
+    _write_arrays(tmp_path, arrays)
+    _write_manifest(tmp_path, manifest)
+
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+
+
+def _read_manifest(path, expected_format):
+    manifest_path = os.path.join(path, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != expected_format or manifest.get("version") != FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def _load_array(path, name, mmap=True):
+    return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+
+
+def _weather_arrays(arrays, prefix, weather):
+    """Add a WeatherSeries to `arrays` under `prefix`; returns the stored channel names (None if no weather)."""
+    if not weather:
+        return None
+    arrays[f"{prefix}/t"] = weather.times
+    for name, values in weather.channels.items():
+        arrays[f"{prefix}/{name}"] = values
+    return list(weather.channels)
+
+
+def _load_weather(path, prefix, channels):
+    if channels is None:
+        return None
+    # Weather is a few hundred samples per session, so it is read in full when asked for
+    return WeatherSeries(
+        _load_array(path, f"{prefix}/t", mmap=False),
+        {name: _load_array(path, f"{prefix}/{name}", mmap=False) for name in channels},
+    )
+
+
+# Per-driver shards
+#
+# Intermediate pipeline results are kept per driver and per stage under
+# <cache>_shards/<driver>/<stage>/, each a small cache directory whose manifest
+# records the content hash of the inputs it was computed from. A refresh
+# recomputes only the shards whose hash no longer matches.
+
+def shard_path(path):
+    """Shard directory that belongs to the cache directory `path` (kept beside it, not inside)."""
+    return path.rstrip(os.sep) + "_shards"
+
+
+def content_hash(*parts):
+    """Stable hex digest of nested dicts / lists / NumPy arrays / scalars."""
+    digest = hashlib.sha1()
+
+    def feed(value):
+        if isinstance(value, dict):
+            digest.update(b"{")
+            for key in sorted(value):
+                feed(key)
+                feed(value[key])
+        elif isinstance(value, (list, tuple)):
+            digest.update(f"[{len(value)}".encode())
+            for item in value:
+                feed(item)
+        elif isinstance(value, np.ndarray):
+            array = np.ascontiguousarray(value)
+            digest.update(f"{array.dtype.str}{array.shape}".encode())
+            digest.update(memoryview(array).cast("B"))
+        else:
+            digest.update(repr(value).encode())
+
+    for part in parts:
+        feed(part)
+    return digest.hexdigest()
+
+
+def save_shard(root, name, key, arrays, meta=None):
+    """Write one shard (`name` like "VER/merged") computed from inputs hashing to `key`."""
+    manifest = {
+        "format": "shard",
+        "version": FORMAT_VERSION,
+        "key": key,
+        "arrays": list(arrays),
+        "meta": meta or {},
+    }
+    _write_cache_dir(os.path.join(root, name), manifest, arrays)
+
+
+def load_shard(root, name, key, mmap=True):
+    """(arrays, meta) of a shard, or None if it is missing or was computed from other inputs."""
+    path = os.path.join(root, name)
+    manifest = _read_manifest(path, "shard")
+    if manifest is None or manifest["key"] != key:
+        return None
+    arrays = {array: _load_array(path, array, mmap) for array in manifest["arrays"]}
+    return arrays, manifest["meta"]
+
+
+def prune_shards(root, keys):
+    """
+    Delete every shard under `root` that `keys` ({name: key}, names like
+    "VER/merged") does not list with the same key, then any emptied driver folders.
+    """
+    if not os.path.isdir(root):
+        return
+    for driver in os.listdir(root):
+        driver_path = os.path.join(root, driver)
+        if not os.path.isdir(driver_path):
+            os.remove(driver_path)
+            continue
+        for stage in os.listdir(driver_path):
+            path = os.path.join(driver_path, stage)
+            manifest = _read_manifest(path, "shard") if os.path.isdir(path) else None
+            if manifest is not None and keys.get(os.path.join(driver, stage)) == manifest["key"]:
+                continue
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        if not os.listdir(driver_path):
+            os.rmdir(driver_path)
+
+
+# Race / sprint telemetry
+
+def save_race_telemetry(path, data):
+    frames = data["frames"]
+
+    arrays = {"timeline": frames.timeline, "order": frames.order}
+    dense_channels = []
+    step_channels = []
+    for name, channel in frames.channels.items():
+        if isinstance(channel, StepChannel):
+            arrays[f"steps/{name}/starts"] = channel.starts
+            arrays[f"steps/{name}/values"] = channel.values
+            arrays[f"steps/{name}/offsets"] = channel.offsets
+            step_channels.append(name)
+        else:
+            arrays[f"channels/{name}"] = channel
+            dense_channels.append(name)
+
+    weather_channels = _weather_arrays(arrays, "weather", frames.weather)
+
+    manifest = {
+        "format": "race",
+        "version": FORMAT_VERSION,
+        "fps": frames.fps,
+        "driver_codes": frames.driver_codes,
+        "channels": dense_channels,
+        "step_channels": step_channels,
+        "scales": frames.scales,
+        "weather_channels": weather_channels,
+        "driver_colors": {code: list(rgb) for code, rgb in data["driver_colors"].items()},
+        "track_statuses": data["track_statuses"],
+        "total_laps": int(data["total_laps"]),
+        "lap_frames": SeekIndex.from_store(frames).lap_frames(),
+    }
+    if "example_lap" in data:
+        manifest["session_info"] = _session_info_manifest(data)
+        arrays.update(_session_info_arrays(data))
+    _write_cache_dir(path, manifest, arrays)
+
+
+def _session_info_manifest(info):
+    return {
+        "event_name": info["event_name"],
+        "drivers": list(info["drivers"]),
+        "circuit_rotation": float(info["circuit_rotation"]),
+    }
+
+
+def _session_info_arrays(info):
+    return {f"example_lap/{axis}": np.asarray(info["example_lap"][axis], dtype=float) for axis in ("X", "Y")}
+
+
+def save_race_session_info(path, info):
+    """
+    Add the session details the replay window needs (event name, drivers,
+    circuit rotation, example-lap geometry) to an existing race cache.
+    """
+    manifest = _read_manifest(path, "race")
+    if manifest is None:
+        raise FileNotFoundError(f"No race telemetry cache at {path}")
+    _write_arrays(path, _session_info_arrays(info))
+    manifest["session_info"] = _session_info_manifest(info)
+    _write_manifest(path, manifest)
+
+
+def select_laps(data, laps, lap_frames=None, copy=True):
+    """
+    Narrow race telemetry to the leader laps `laps` = (first, last), inclusive.
+    `lap_frames` are (lap, first frame) pairs; they are rebuilt from the frames
+    when not given. With `copy` the window is copied out so the full arrays can
+    be freed; memory-mapped caches pass copy=False and keep views.
+    """
+    frames = data["frames"]
+    if lap_frames is None:
+        lap_frames = SeekIndex.from_store(frames).lap_frames()
+    start, stop = lap_window(lap_frames, laps[0], laps[1], len(frames))
+    data["frames"] = frames.slice(start, stop, copy=copy)
+    return data
+
+
+def load_race_telemetry(path, mmap=True, laps=None):
+    """
+    Open a race cache directory. Returns None if there is no (valid) cache at `path`.
+    With `laps` = (first, last) only those leader laps are kept; the arrays are
+    memory-mapped either way, so the rest of the race is never read.
+    """
+    manifest = _read_manifest(path, "race")
+    if manifest is None:
+        return None
+    if laps is not None:
+        mmap = True
+
+    timeline = _load_array(path, "timeline", mmap)
+    channels = {name: _load_array(path, f"channels/{name}", mmap) for name in manifest["channels"]}
+    for name in manifest["step_channels"]:
+        channels[name] = StepChannel(
+            _load_array(path, f"steps/{name}/starts", mmap),
+            _load_array(path, f"steps/{name}/values", mmap),
+            _load_array(path, f"steps/{name}/offsets", mmap),
+            n_frames=len(timeline),
+        )
+    weather = _load_weather(path, "weather", manifest["weather_channels"])
+
+    frames = FrameStore(
+        timeline=timeline,
+        driver_codes=manifest["driver_codes"],
+        channels=channels,
+        fps=manifest["fps"],
+        weather=weather,
+        order=_load_array(path, "order", mmap),
+        scales=manifest["scales"],
+    )
+    data = {
+        "frames": frames,
+        "driver_colors": {code: tuple(rgb) for code, rgb in manifest["driver_colors"].items()},
+        "track_statuses": manifest["track_statuses"],
+        "total_laps": manifest["total_laps"],
+    }
+
+    if laps is not None:
+        select_laps(data, laps, manifest.get("lap_frames"), copy=False)
+
+    # Caches converted from pickles don't know about the session until it has been loaded once
+    session_info = manifest.get("session_info")
+    if session_info:
+        data.update(session_info)
+        data["example_lap"] = {axis: _load_array(path, f"example_lap/{axis}", mmap) for axis in ("X", "Y")}
+    return data
+
+
+# Qualifying / sprint qualifying telemetry
+
+def save_quali_telemetry(path, data):
+    arrays = {}
+    laps = {}
+
+    for driver_code, segments in data["telemetry"].items():
+        laps[driver_code] = {}
+        for segment, seg_data in segments.items():
+            prefix = f"laps/{driver_code}_{segment}"
+            frames = seg_data.get("frames") or []
+            legacy_frames = isinstance(frames, list)
+            entry = {
+                "n_frames": len(frames),
+                "track_statuses": seg_data.get("track_statuses", []),
+                "drs_zones": seg_data.get("drs_zones", []),
+                "max_speed": seg_data.get("max_speed"),
+                "min_speed": seg_data.get("min_speed"),
+            }
+            weather = frames.weather if isinstance(frames, LapFrames) else seg_data.get("weather")
+            if weather is None and legacy_frames and frames and "weather" in frames[0]:
+                weather = _legacy_frame_weather(frames)
+            if frames:
+                if legacy_frames:
+                    frames = LapFrames.from_frame_dicts(frames)
+                for name in QUALI_LAP_CHANNELS:
+                    arrays[f"{prefix}/{name}"] = np.asarray(frames.channel(name), dtype=float)
+            entry["weather_channels"] = _weather_arrays(arrays, f"{prefix}/weather", weather)
+            laps[driver_code][segment] = entry
+
+    manifest = {
+        "format": "quali",
+        "version": FORMAT_VERSION,
+        "results": data["results"],
+        "max_speed": data["max_speed"],
+        "min_speed": data["min_speed"],
+        "laps": laps,
+    }
+    _write_cache_dir(path, manifest, arrays)
+
+
+def _quali_lap_frames(path, prefix, entry, mmap):
+    """The lap's LapFrames; its arrays are only opened when the lap is first used."""
+    if not entry["n_frames"]:
+        return []
+
+    def load():
+        return {name: _load_array(path, f"{prefix}/{name}", mmap) for name in QUALI_LAP_CHANNELS}
+
+    def load_weather():
+        return _load_weather(path, f"{prefix}/weather", entry["weather_channels"])
+
+    return LapFrames(n_frames=entry["n_frames"], loader=load, weather_loader=load_weather)
+
+
+def _legacy_frame_weather(frames):
+    # Old quali caches copied a weather dict into every frame; keep one sample per second of it
+    sampled = frames[::25]
+    channels = {}
+    for name in WEATHER_CHANNELS:
+        if name == "rainfall":
+            channels[name] = [1.0 if f["weather"]["rain_state"] == "RAINING" else 0.0 for f in sampled]
+        elif sampled[0]["weather"].get(name) is not None:
+            channels[name] = [f["weather"][name] for f in sampled]
+    return WeatherSeries([f["t"] for f in sampled], channels)
+
+
+def load_quali_telemetry(path, mmap=True):
+    """Open a qualifying cache directory. Returns None if there is no (valid) cache at `path`."""
+    manifest = _read_manifest(path, "quali")
+    if manifest is None:
+        return None
+
+    telemetry = {}
+    for driver_code, segments in manifest["laps"].items():
+        telemetry[driver_code] = {}
+        for segment, entry in segments.items():
+            prefix = f"laps/{driver_code}_{segment}"
+            seg_data = {
+                "frames": _quali_lap_frames(path, prefix, entry, mmap),
+                "track_statuses": entry["track_statuses"],
+            }
+            if entry["n_frames"]:
+                seg_data.update({
+                    "drs_zones": entry["drs_zones"],
+                    "max_speed": entry["max_speed"],
+                    "min_speed": entry["min_speed"],
+                })
+            telemetry[driver_code][segment] = seg_data
+
+    return {
+        "results": manifest["results"],
+        "telemetry": telemetry,
+        "max_speed": manifest["max_speed"],
+        "min_speed": manifest["min_speed"],
+    }
+
+
+# Conversion of the legacy pickle caches
+
+def _legacy_cache_path(pkl_path):
+    # "2025 Season Round 12: British Grand Prix - Race" -> year / round / session type
+    name = os.path.basename(pkl_path)
+    match = re.match(r"(\d{4})_Season_Round_(\d+):_.*_(race|sprint|quali|sprintquali)_telemetry\.pkl$", name)
+    if match is None:
+        return pkl_path[:-len(".pkl")] if pkl_path.endswith(".pkl") else pkl_path + "_converted"
+    year, round_number, suffix = match.groups()
+    session_type = next(k for k, v in CACHE_SUFFIXES.items() if v == suffix)
+    return cache_path(int(year), int(round_number), session_type)
+
+
+def convert_pickle_cache(pkl_path, path=None, fps=25):
+    """Convert a computed_data/*_telemetry.pkl file into the directory format. Returns the new path."""
+    with open(pkl_path, "rb") as f:
+        data = pickle.load(f)
+
+    path = path or _legacy_cache_path(pkl_path)
+    if "telemetry" in data:
+        save_quali_telemetry(path, data)
+    else:
+        if isinstance(data["frames"], list):
+            data["frames"] = FrameStore.from_frame_dicts(data["frames"], fps=fps)
+        save_race_telemetry(path, data)
+    return path
+
+
+if __name__ == "__main__":
+    # python -m src.telemetry_cache [file.pkl ...]  (defaults to every pickle in computed_data/)
+    pkl_paths = sys.argv[1:] or sorted(glob.glob(os.path.join(CACHE_DIR, "*_telemetry.pkl")))
+    if not pkl_paths:
+        print("No pickle caches found.")
+    for pkl_path in pkl_paths:
+        print(f"Converting {pkl_path}...")
+        print(f"  -> {convert_pickle_cache(pkl_path)}")
@@ -2,6 +2,9 @@ import arcade
 from typing import List, Tuple, Optional
 from typing import Sequence, Optional, Tuple
 from src.lib.time import format_time
+from src.frame_store import FrameStore
+from src.lib.track_status import TrackStatusIndex, YELLOW, SAFETY_CAR, RED, VSC_DEPLOYED, VSC_ENDING
+from src.renderer import TextCache, TextBlock
 import numpy as np
 import os
 
@@ -22,7 +25,7 @@ class BaseComponent:
     def on_mouse_press(self, window, x: float, y: float, button: int, modifiers: int): return False
 
 class LegendComponent(BaseComponent):
-    def __init__(self, x: int = 20, y: int = 150):
+    def __init__(self, x: int = 20, y: int = 150, extra_lines: Sequence[str] = ()):
         self.x = x
         self.y = y
         self.lines = [
@@ -31,17 +34,18 @@ class LegendComponent(BaseComponent):
             "[←/→]    Rewind / FastForward",
             "[↑/↓]    Speed +/- (0.5x, 1x, 2x, 4x)",
             "[R]       Restart",
+            *extra_lines,
         ]
+        self._block = None  # laid out on first draw, then only moved
     def draw(self, window):
-        for i, line in enumerate(self.lines):
-            arcade.Text(
-                line,
-                self.x,
-                self.y - (i * 25),
-                arcade.color.LIGHT_GRAY if i > 0 else arcade.color.WHITE,
-                14,
-                bold=(i == 0)
-            ).draw()
+        if self._block is None:
+            self._block = TextBlock(
+                [(line, arcade.color.LIGHT_GRAY if i > 0 else arcade.color.WHITE, 14, i == 0)
+                 for i, line in enumerate(self.lines)],
+                self.x, self.y, line_height=25,
+            )
+        self._block.move_to(self.x, self.y)
+        self._block.draw()
 
 class WeatherComponent(BaseComponent):
     def __init__(self, left=20, width=280, height=130, top_offset=170):
@@ -50,6 +54,7 @@ class WeatherComponent(BaseComponent):
         self.height = height
         self.top_offset = top_offset
         self.info = None
+        self.texts = TextCache()
         self._weather_icon_textures = {}
         # Load weather icons from images/weather folder (all files)
         weather_folder = os.path.join("images", "weather")
@@ -66,7 +71,7 @@ class WeatherComponent(BaseComponent):
         panel_top = window.height - self.top_offset
         if not self.info and not getattr(window, "has_weather", False):
             return
-        arcade.Text("Weather", self.left + 12, panel_top - 10, arcade.color.WHITE, 18, bold=True, anchor_y="top").draw()
+        self.texts.draw("title", "Weather", self.left + 12, panel_top - 10, arcade.color.WHITE, 18, bold=True, anchor_y="top")
         def _fmt(val, suffix="", precision=1):
             return f"{val:.{precision}f}{suffix}" if val is not None else "N/A"
         info = self.info or {}
@@ -98,7 +103,7 @@ class WeatherComponent(BaseComponent):
             
             # Draw text
             line_text = f"{label}: {value}"
-            arcade.Text(line_text, self.left + 38, line_y, arcade.color.LIGHT_GRAY, 14, anchor_y="top").draw()
+            self.texts.draw(("line", idx), line_text, self.left + 38, line_y, arcade.color.LIGHT_GRAY, 14, anchor_y="top")
 
 class LeaderboardComponent(BaseComponent):
     def __init__(self, x: int, right_margin: int = 260, width: int = 240):
@@ -108,6 +113,7 @@ class LeaderboardComponent(BaseComponent):
         self.rects = []    # clickable rects per entry
         self.selected = None
         self.row_height = 25
+        self.texts = TextCache()
         self._tyre_textures = {}
         # Import the tyre textures from the images/tyres folder (all files)
         tyres_folder = os.path.join("images", "tyres")
@@ -123,7 +129,7 @@ class LeaderboardComponent(BaseComponent):
         self.entries = entries
     def draw(self, window):
         leaderboard_y = window.height - 40
-        arcade.Text("Leaderboard", self.x, leaderboard_y, arcade.color.WHITE, 20, bold=True, anchor_x="left", anchor_y="top").draw()
+        self.texts.draw("title", "Leaderboard", self.x, leaderboard_y, arcade.color.WHITE, 20, bold=True, anchor_x="left", anchor_y="top")
         self.rects = []
         for i, (code, color, pos, progress_m) in enumerate(self.entries):
             current_pos = i + 1
@@ -139,7 +145,7 @@ class LeaderboardComponent(BaseComponent):
             else:
                 text_color = color
             text = f"{current_pos}. {code}" if pos.get("rel_dist",0) != 1 else f"{current_pos}. {code}   OUT"
-            arcade.Text(text, left_x, top_y, text_color, 16, anchor_x="left", anchor_y="top").draw()
+            self.texts.draw(("row", i), text, left_x, top_y, text_color, 16, anchor_x="left", anchor_y="top")
 
              # Tyre Icons
             tyre_texture = self._tyre_textures.get(str(pos.get("tyre", "?")).upper())
@@ -180,6 +186,7 @@ class LapTimeLeaderboardComponent(BaseComponent):
         self.rects = []    # clickable rects per entry
         self.selected = None
         self.row_height = 25
+        self.texts = TextCache()
 
     def set_entries(self, entries: List[dict]):
         """Accept a list of dicts with keys: pos, code, color, time"""
@@ -187,7 +194,7 @@ class LapTimeLeaderboardComponent(BaseComponent):
 
     def draw(self, window):
         leaderboard_y = window.height - 40
-        arcade.Text("Lap Times", self.x, leaderboard_y, arcade.color.WHITE, 20, bold=True, anchor_x="left", anchor_y="top").draw()
+        self.texts.draw("title", "Lap Times", self.x, leaderboard_y, arcade.color.WHITE, 20, bold=True, anchor_x="left", anchor_y="top")
         self.rects = []
         for i, entry in enumerate(self.entries):
             pos = entry.get('pos', i + 1)
@@ -212,8 +219,8 @@ class LapTimeLeaderboardComponent(BaseComponent):
                 text_color = tuple(color) if isinstance(color, (list, tuple)) else arcade.color.WHITE
 
             # Draw code on left, time right-aligned
-            arcade.Text(f"{pos}. {code}", left_x + 8, top_y, text_color, 16, anchor_x="left", anchor_y="top").draw()
-            arcade.Text(time_str, right_x - 8, top_y, text_color, 14, anchor_x="right", anchor_y="top").draw()
+            self.texts.draw(("code", i), f"{pos}. {code}", left_x + 8, top_y, text_color, 16, anchor_x="left", anchor_y="top")
+            self.texts.draw(("time", i), time_str, right_x - 8, top_y, text_color, 14, anchor_x="right", anchor_y="top")
 
     def on_mouse_press(self, window, x: float, y: float, button: int, modifiers: int):
         for code, left, bottom, right, top in self.rects:
@@ -233,6 +240,7 @@ class QualifyingSegmentSelectorComponent(BaseComponent):
         self.height = height
         self.driver_result = None
         self.selected_segment = None
+        self.texts = TextCache()
         
     def draw(self, window):
         if not getattr(window, "selected_driver", None):
@@ -256,8 +264,8 @@ class QualifyingSegmentSelectorComponent(BaseComponent):
         
         # Draw title
         title = f"Qualifying Sessions - {driver_result.get('code','')}"
-        arcade.Text(title, left + 20, top - 30, arcade.color.WHITE, 18, 
-               bold=True, anchor_x="left", anchor_y="center").draw()
+        self.texts.draw("title", title, left + 20, top - 30, arcade.color.WHITE, 18, 
+                        bold=True, anchor_x="left", anchor_y="center")
         
         # Draw segments
         segment_height = 50
@@ -303,16 +311,16 @@ class QualifyingSegmentSelectorComponent(BaseComponent):
             segment_text = f"{segment.upper()}"
             time_text = format_time(float(data.get('time', 'No Time')))
             
-            arcade.Text(segment_text, left + 30, segment_top - 20, 
-                       text_color, 16, bold=True, anchor_x="left", anchor_y="center").draw()
-            arcade.Text(time_text, right - 30, segment_top - 20, 
-                       text_color, 14, anchor_x="right", anchor_y="center").draw()
+            self.texts.draw(("segment", i), segment_text, left + 30, segment_top - 20, 
+                            text_color, 16, bold=True, anchor_x="left", anchor_y="center")
+            self.texts.draw(("time", i), time_text, right - 30, segment_top - 20, 
+                            text_color, 14, anchor_x="right", anchor_y="center")
         
         # Draw close button
         close_btn_rect = arcade.XYWH(right - 30, top - 30, 20, 20)
         arcade.draw_rect_filled(close_btn_rect, arcade.color.RED)
-        arcade.Text("×", right - 30, top - 30, arcade.color.WHITE, 16, 
-               bold=True, anchor_x="center", anchor_y="center").draw()
+        self.texts.draw("close", "×", right - 30, top - 30, arcade.color.WHITE, 16, 
+                        bold=True, anchor_x="center", anchor_y="center")
 
     def on_mouse_press(self, window, x: float, y: float, button: int, modifiers: int):        
         if not getattr(window, "selected_driver", None):
@@ -388,6 +396,7 @@ class DriverInfoComponent(BaseComponent):
         self.left = left
         self.width = width
         self.min_top = min_top
+        self.texts = TextCache()
 
     def draw(self, window):
         if not getattr(window, "selected_driver", None):
@@ -397,10 +406,8 @@ class DriverInfoComponent(BaseComponent):
         if not window.frames: return
 
         idx = min(int(window.frame_index), window.n_frames - 1)
-        frame = window.frames[idx]
-
-        if code not in frame["drivers"]: return
-        driver_pos = frame["drivers"][code]
+        driver_pos = window.frames[idx]["drivers"].get(code)
+        if driver_pos is None: return
 
         box_width = self.width
         box_height = 160
@@ -438,8 +445,8 @@ class DriverInfoComponent(BaseComponent):
         header_rect = arcade.XYWH(center_x, header_cy, box_width, header_height)
         arcade.draw_rect_filled(header_rect, team_color)
 
-        arcade.Text(f"Driver: {code}", left + 10, header_cy,
-                    arcade.color.BLACK, 14, anchor_y="center", bold=True).draw()
+        self.texts.draw("driver", f"Driver: {code}", left + 10, header_cy,
+                        arcade.color.BLACK, 14, anchor_y="center", bold=True)
 
         header_bottom = top - header_height
         cursor_y = header_bottom - 25
@@ -448,12 +455,12 @@ class DriverInfoComponent(BaseComponent):
 
         # (A) Speed
         speed = driver_pos.get('speed', 0)
-        arcade.Text(f"Speed: {speed:.0f} km/h", left_text_x, cursor_y, arcade.color.WHITE, 12, anchor_y="center").draw()
+        self.texts.draw("speed", f"Speed: {speed:.0f} km/h", left_text_x, cursor_y, arcade.color.WHITE, 12, anchor_y="center")
         cursor_y -= row_gap
 
         # (B) Gear
         gear = driver_pos.get('gear', '-')
-        arcade.Text(f"Gear: {gear}", left_text_x, cursor_y, arcade.color.WHITE, 12, anchor_y="center").draw()
+        self.texts.draw("gear", f"Gear: {gear}", left_text_x, cursor_y, arcade.color.WHITE, 12, anchor_y="center")
         cursor_y -= row_gap
 
         # (C) DRS
@@ -468,7 +475,7 @@ class DriverInfoComponent(BaseComponent):
             drs_str = "DRS: AVAIL"
             drs_color = arcade.color.YELLOW
 
-        arcade.Text(drs_str, left_text_x, cursor_y, drs_color, 12, anchor_y="center", bold=True).draw()
+        self.texts.draw("drs", drs_str, left_text_x, cursor_y, drs_color, 12, anchor_y="center", bold=True)
         cursor_y -= (row_gap + 5)
 
         # ---------------------------------------------------
@@ -497,7 +504,7 @@ class DriverInfoComponent(BaseComponent):
         th_x = right_section_center - 15
 
         # throttle label
-        arcade.Text("THR", th_x, bar_bottom_y - 20, arcade.color.WHITE, 10, anchor_x="center").draw()
+        self.texts.draw("thr", "THR", th_x, bar_bottom_y - 20, arcade.color.WHITE, 10, anchor_x="center")
 
         # throttle bg_color (grey) - XYWH는 중심점 기준이므로 계산 주의
         # center Y = bottom Y + (height / 2)
@@ -514,7 +521,7 @@ class DriverInfoComponent(BaseComponent):
         br_x = right_section_center + 15
 
         # brake label
-        arcade.Text("BRK", br_x, bar_bottom_y - 20, arcade.color.WHITE, 10, anchor_x="center").draw()
+        self.texts.draw("brk", "BRK", br_x, bar_bottom_y - 20, arcade.color.WHITE, 10, anchor_x="center")
 
         # brake bg_color (grey)
         arcade.draw_rect_filled(arcade.XYWH(br_x, bg_cy, bar_width, bar_max_height), arcade.color.DARK_GRAY)
@@ -563,6 +570,8 @@ class RaceProgressBarComponent(BaseComponent):
         "vsc": (255, 165, 0),
         "text": (220, 220, 220),
         "current_position": (255, 255, 255),
+        "pending": (70, 70, 70, 160),
+        "error": (220, 50, 50),
     }
     
     def __init__(self, 
@@ -593,6 +602,7 @@ class RaceProgressBarComponent(BaseComponent):
         self._events: List[dict] = []
         self._total_frames: int = 0
         self._total_laps: int = 0
+        self._lap_frames: List[Tuple[int, int]] = []
         self._bar_left: float = 0
         self._bar_width: float = 0
         
@@ -600,21 +610,34 @@ class RaceProgressBarComponent(BaseComponent):
         self._hover_event: Optional[dict] = None
         self._mouse_x: float = 0
         self._mouse_y: float = 0
+
+        # Retained labels (lap numbers, tooltip, legend)
+        self.texts = TextCache()
         
     def set_race_data(self, 
                       total_frames: int, 
                       total_laps: int,
-                      events: List[dict]):
+                      events: List[dict],
+                      lap_frames: Optional[List[Tuple[int, int]]] = None):
         """
         set the race data for the progress bar so the calc for markers can be done once time
         
         - total_frames: Total number of frames in the race
         - total_laps: Total number of laps in the race
         - events: List of event dictionaries with keys
+        - lap_frames: (lap, first frame) of each leader lap; without it lap ticks
+          are spread evenly over the race
         """
         self._total_frames = max(1, total_frames)
         self._total_laps = total_laps or 1
         self._events = sorted(events, key=lambda e: e.get("frame", 0))
+        if lap_frames:
+            self._lap_frames = [(lap, frame) for lap, frame in lap_frames if 1 <= lap <= self._total_laps]
+        else:
+            self._lap_frames = [
+                (lap, int((lap / self._total_laps) * self._total_frames))
+                for lap in range(1, self._total_laps + 1)
+            ]
     
     @property
     def visible(self) -> bool:
@@ -654,11 +677,12 @@ class RaceProgressBarComponent(BaseComponent):
         return self._bar_left + (progress * self._bar_width)
     
     def _x_to_frame(self, x: float) -> int:
-        # reverse of _frame_to_x
+        # reverse of _frame_to_x: the nearest frame, within the race
         if self._bar_width <= 0:
             return 0
         progress = (x - self._bar_left) / self._bar_width
-        return int(progress * self._total_frames)
+        frame = int(round(progress * self._total_frames))
+        return max(0, min(frame, self._total_frames - 1))
         
     def on_resize(self, window):
         self._calculate_bar_dimensions(window)
@@ -698,11 +722,31 @@ class RaceProgressBarComponent(BaseComponent):
                 )
                 arcade.draw_rect_filled(progress_rect, self.COLORS["progress_fill"])
         
-        # 3. Draw lap markers (vertical lines)
+        # 2b. Frames still being computed (progressive startup): dim the rest of the bar
+        ready_frames = window.frames.ready_frames if getattr(window, "frames", None) is not None else self._total_frames
+        if ready_frames < self._total_frames:
+            ready_x = self._frame_to_x(ready_frames)
+            pending_width = self._bar_left + self._bar_width - ready_x
+            if pending_width > 0:
+                pending_rect = arcade.XYWH(ready_x + pending_width / 2, bar_center_y, pending_width, self.height - 4)
+                arcade.draw_rect_filled(pending_rect, self.COLORS["pending"])
+            # The build may have failed; then the replay is limited to the frames that are ready
+            build_error = getattr(window, "frames_error", None)
+            if build_error:
+                status, status_color = f"Computing frames failed at {100 * ready_frames / self._total_frames:.0f}%: {build_error}", self.COLORS["error"]
+            else:
+                status, status_color = f"Computing frames... {100 * ready_frames / self._total_frames:.0f}%", self.COLORS["text"]
+            self.texts.draw(
+                "computing",
+                status,
+                self._bar_left + self._bar_width, self.bottom + self.height + self.marker_height + 4,
+                status_color, 10,
+                anchor_x="right", anchor_y="bottom"
+            )
+
+        # 3. Draw lap markers (vertical lines at the leader's lap starts)
         if self._total_laps > 1:
-            for lap in range(1, self._total_laps + 1):
-                # Approximate frame for lap transition
-                lap_frame = int((lap / self._total_laps) * self._total_frames)
+            for lap, lap_frame in self._lap_frames:
                 lap_x = self._frame_to_x(lap_frame)
                 
                 # Draw subtle vertical line
@@ -714,12 +758,13 @@ class RaceProgressBarComponent(BaseComponent):
                 
                 # Draw lap number below for major laps (every 5 laps or first/last)
                 if lap == 1 or lap == self._total_laps or lap % 10 == 0:
-                    arcade.Text(
+                    self.texts.draw(
+                        ("lap", lap),
                         str(lap),
                         lap_x, self.bottom - 4,
                         self.COLORS["text"], 9,
                         anchor_x="center", anchor_y="top"
-                    ).draw()
+                    )
         
         # 4. Draw event markers
         for event in self._events:
@@ -838,9 +883,15 @@ class RaceProgressBarComponent(BaseComponent):
         tooltip_x = min(max(event_x, 100), window.width - 100)
         tooltip_y = self.bottom + self.height + self.marker_height + 20
         
-        # Draw tooltip background
+        # Draw tooltip background (sized from the retained label)
         padding = 8
-        text_obj = arcade.Text(tooltip_text, 0, 0, (255, 255, 255), 12)
+        text_obj = self.texts.get(
+            "tooltip",
+            tooltip_text,
+            tooltip_x, tooltip_y,
+            (255, 255, 255), 12,
+            anchor_x="center", anchor_y="center"
+        )
         text_width = text_obj.content_width
         
         bg_rect = arcade.XYWH(
@@ -853,12 +904,7 @@ class RaceProgressBarComponent(BaseComponent):
         arcade.draw_rect_outline(bg_rect, (100, 100, 100), 1)
         
         # Draw text
-        arcade.Text(
-            tooltip_text,
-            tooltip_x, tooltip_y,
-            (255, 255, 255), 12,
-            anchor_x="center", anchor_y="center"
-        ).draw()
+        text_obj.draw()
         
     def _draw_legend(self, window):
         """Draw a small legend explaining the markers."""
@@ -874,18 +920,20 @@ class RaceProgressBarComponent(BaseComponent):
         
         for i, (color, symbol, label) in enumerate(legend_items):
             x = legend_x + (i * 45)
-            arcade.Text(
+            self.texts.draw(
+                ("legend_symbol", i),
                 symbol,
                 x, legend_y + 2,
                 color, 10, bold=True,
                 anchor_x="center", anchor_y="center"
-            ).draw()
-            arcade.Text(
+            )
+            self.texts.draw(
+                ("legend_label", i),
                 label,
                 x, legend_y - 10,
                 self.COLORS["text"], 8,
                 anchor_x="center", anchor_y="top"
-            ).draw()
+            )
         
     def on_mouse_motion(self, window, x: float, y: float, dx: float, dy: float):
         """Handle mouse motion for hover effects."""
@@ -923,26 +971,28 @@ class RaceProgressBarComponent(BaseComponent):
         if (self._bar_left <= x <= self._bar_left + self._bar_width and
             self.bottom - 5 <= y <= self.bottom + self.height + 5):
             
-            # Seek to clicked position
+            # Seek to the exact frame under the cursor
             target_frame = self._x_to_frame(x)
-            if hasattr(window, 'frame_index'):
-                window.frame_index = float(max(0, min(target_frame, self._total_frames - 1)))
+            if hasattr(window, 'seek_frame'):
+                window.seek_frame(target_frame)
+            elif hasattr(window, 'frame_index'):
+                window.frame_index = float(target_frame)
             return True
         return False
 
 
-def extract_race_events(frames: List[dict], track_statuses: List[dict], total_laps: int) -> List[dict]:
+def extract_race_events(frames: FrameStore, track_status_index: TrackStatusIndex, total_laps: int) -> List[dict]:
     """
     Extract race events from frame data for the progress bar.
     
     This function analyzes the telemetry frames to identify:
     - DNF events (when a driver stops appearing)
     - Leader changes (when the P1 position changes hands)
-    - Flag events (from track_statuses)
+    - Flag events (from the track status periods)
     
     Args:
-        frames: List of frame dictionaries from telemetry
-        track_statuses: List of track status events
+        frames: FrameStore holding the race telemetry
+        track_status_index: TrackStatusIndex built from the race's track statuses
         total_laps: Total number of laps in the race
         
     Returns:
@@ -953,27 +1003,27 @@ def extract_race_events(frames: List[dict], track_statuses: List[dict], total_la
     if not frames:
         return events
         
-    n_frames = len(frames)
+    # Only frames that hold data yet (a progressive store fills up while the replay runs)
+    n_frames = frames.ready_frames
     
     # Track drivers present in each frame
     prev_drivers = set()
     
-    # Sample frames at regular intervals for performance (every 25 frames = 1 second)
-    sample_rate = 25
+    # Sample frames at regular intervals for performance (one frame per second)
+    fps = frames.fps
+    sample_rate = max(1, int(round(fps)))
     
     for i in range(0, n_frames, sample_rate):
-        frame = frames[i]
-        drivers_data = frame.get("drivers", {})
-        current_drivers = set(drivers_data.keys())
+        current_drivers = set(frames[i]["drivers"].keys())
         
         # Detect DNFs (drivers who disappeared)
         if prev_drivers:
             dnf_drivers = prev_drivers - current_drivers
             for driver_code in dnf_drivers:
                 # Get the lap from previous frame if available
-                prev_frame = frames[max(0, i - sample_rate)]
-                driver_info = prev_frame.get("drivers", {}).get(driver_code, {})
-                lap = driver_info.get("lap", "?")
+                prev_index = max(0, i - sample_rate)
+                col = frames.driver_index(driver_code)
+                lap = int(frames.row("lap", prev_index)[col]) if col is not None else "?"
                 
                 events.append({
                     "type": RaceProgressBarComponent.EVENT_DNF,
@@ -984,37 +1034,19 @@ def extract_race_events(frames: List[dict], track_statuses: List[dict], total_la
         
         prev_drivers = current_drivers
     
-    # Add flag events from track_statuses
-    for status in track_statuses:
-        status_code = str(status.get("status", ""))
-        start_time = status.get("start_time", 0)
-        end_time = status.get("end_time")
-        
-        # Convert time to frame (assuming 25 FPS)
-        fps = 25
-        start_frame = int(start_time * fps)
-        end_frame = int(end_time * fps) if end_time else start_frame + 250  # Default 10 seconds
-        
-        # This prevents rendering artifacts from pre-race track status events
-        # that shouldn't appear on the timeline... Events that span frame 0
-        # (start < 0 but end > 0) are kept; the drawing code will clamp them
-        if end_frame <= 0:
-            continue
-        
-        # Note: The drawing code also clamps, but normalizing here improves data quality
-        if n_frames > 0:
-            end_frame = min(end_frame, n_frames)
-        
-        event_type = None
-        if status_code == "2":  # Yellow flag
-            event_type = RaceProgressBarComponent.EVENT_YELLOW_FLAG
-        elif status_code == "4":  # Safety Car
-            event_type = RaceProgressBarComponent.EVENT_SAFETY_CAR
-        elif status_code == "5":  # Red flag
-            event_type = RaceProgressBarComponent.EVENT_RED_FLAG
-        elif status_code in ("6", "7"):  # VSC
-            event_type = RaceProgressBarComponent.EVENT_VSC
-            
+    # Add flag events from the track status periods
+    flag_event_types = {
+        YELLOW: RaceProgressBarComponent.EVENT_YELLOW_FLAG,
+        SAFETY_CAR: RaceProgressBarComponent.EVENT_SAFETY_CAR,
+        RED: RaceProgressBarComponent.EVENT_RED_FLAG,
+        VSC_DEPLOYED: RaceProgressBarComponent.EVENT_VSC,
+        VSC_ENDING: RaceProgressBarComponent.EVENT_VSC,
+    }
+    # Periods are placed on the store's timeline: pre-race periods (and any outside
+    # a --laps slice) are dropped, ones spanning the first frame start at frame 0
+    for status_code, start_frame, end_frame in track_status_index.frame_ranges(frames.timeline, n_frames):
+
+        event_type = flag_event_types.get(status_code)
         if event_type:
             events.append({
                 "type": event_type,